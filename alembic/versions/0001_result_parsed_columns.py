@@ -0,0 +1,124 @@
+"""Add parsed result columns to game_results and backfill them
+
+Revision ID: 0001_result_parsed_columns
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_result_parsed_columns"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("open_panna", sa.SmallInteger()),
+    ("open_ank", sa.SmallInteger()),
+    ("jodi", sa.SmallInteger()),
+    ("close_ank", sa.SmallInteger()),
+    ("close_panna", sa.SmallInteger()),
+    ("open_panna_type", sa.String(6)),
+    ("close_panna_type", sa.String(6)),
+]
+
+INDEXES = [
+    ("ix_game_results_jodi", ["jodi"]),
+    ("idx_result_market_date_jodi", ["market_id", "result_date", "jodi"]),
+    ("idx_result_market_date_panna", ["market_id", "result_date", "open_panna", "close_panna"]),
+]
+
+BACKFILL_BATCH = 2000
+
+
+# Frozen copy of app.core.result_parser as of this revision, so later parser
+# changes cannot alter what this migration backfills
+
+
+def _digits(part, length):
+    part = part.strip()
+    if len(part) == length and part.isdigit():
+        return part
+    return None
+
+
+def _panna_type(panna):
+    return {1: "triple", 2: "double"}.get(len(set(panna)), "single")
+
+
+def _panna_ank(panna):
+    return sum(int(c) for c in panna) % 10
+
+
+def parse_result(raw):
+    """Parsed column values of a result string such as ``123-45-678``"""
+    parts = (raw or "").split("-")
+    open_panna = _digits(parts[0], 3) if len(parts) >= 1 else None
+    middle = parts[1].strip() if len(parts) >= 2 else ""
+    close_panna = _digits(parts[2], 3) if len(parts) >= 3 else None
+
+    open_ank = close_ank = None
+    if middle[:1].isdigit():
+        open_ank = int(middle[0])
+    elif open_panna:
+        open_ank = _panna_ank(open_panna)
+    if len(middle) == 2 and middle[1].isdigit():
+        close_ank = int(middle[1])
+    elif close_panna:
+        close_ank = _panna_ank(close_panna)
+
+    return {
+        "open_panna": int(open_panna) if open_panna else None,
+        "open_ank": open_ank,
+        "jodi": open_ank * 10 + close_ank if open_ank is not None and close_ank is not None else None,
+        "close_ank": close_ank,
+        "close_panna": int(close_panna) if close_panna else None,
+        "open_panna_type": _panna_type(open_panna) if open_panna else None,
+        "close_panna_type": _panna_type(close_panna) if close_panna else None,
+    }
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # Tables created by create_all on a fresh install already have the columns
+    existing = {c["name"] for c in inspector.get_columns("game_results")}
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column("game_results", sa.Column(name, type_, nullable=True))
+    existing_indexes = {i["name"] for i in inspector.get_indexes("game_results")}
+    for name, columns in INDEXES:
+        if name not in existing_indexes:
+            op.create_index(name, "game_results", columns)
+
+    results = sa.table(
+        "game_results",
+        sa.column("sr_no", sa.Integer),
+        sa.column("result", sa.String),
+        *[sa.column(name, type_) for name, type_ in COLUMNS],
+    )
+    last_sr_no = 0
+    while True:
+        rows = bind.execute(
+            sa.select(results.c.sr_no, results.c.result)
+            .where(results.c.sr_no > last_sr_no)
+            .order_by(results.c.sr_no)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            results.update().where(results.c.sr_no == sa.bindparam("b_sr_no")),
+            [
+                {"b_sr_no": sr_no, **parse_result(result)}
+                for sr_no, result in rows
+            ],
+        )
+        last_sr_no = rows[-1][0]
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="game_results")
+    for name, _ in reversed(COLUMNS):
+        op.drop_column("game_results", name)
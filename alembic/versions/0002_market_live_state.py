@@ -0,0 +1,61 @@
+"""Add market_live_state and fill it from game and game_results
+
+Revision ID: 0002_market_live_state
+Revises: 0001_result_parsed_columns
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_market_live_state"
+down_revision = "0001_result_parsed_columns"
+branch_labels = None
+depends_on = None
+
+# Latest result per market, declared flags from the parsed columns of 0001.
+# Kept inline so later changes to the application cannot change this revision.
+BACKFILL = """
+INSERT INTO market_live_state (
+    market_id, game, open_time, close_time, market_status, result, result_date,
+    open_declared, close_declared, version, updated_at
+)
+SELECT
+    g.sr_no, g.game, g.open_time, g.close_time, g.status, r.result, r.result_date,
+    CASE WHEN r.open_ank IS NULL THEN 0 ELSE 1 END,
+    CASE WHEN r.close_ank IS NULL THEN 0 ELSE 1 END,
+    1, CURRENT_TIMESTAMP
+FROM game g
+LEFT JOIN (
+    SELECT market_id, MAX(result_date) AS result_date
+    FROM game_results
+    GROUP BY market_id
+) latest ON latest.market_id = g.sr_no
+LEFT JOIN game_results r ON r.market_id = latest.market_id AND r.result_date = latest.result_date
+WHERE g.sr_no NOT IN (SELECT market_id FROM market_live_state)
+"""
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Fresh installs get the table from create_all
+    if "market_live_state" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "market_live_state",
+            sa.Column("market_id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("game", sa.String(100), nullable=False),
+            sa.Column("open_time", sa.Time(), nullable=True),
+            sa.Column("close_time", sa.Time(), nullable=True),
+            sa.Column("market_status", sa.Integer(), nullable=True),
+            sa.Column("result", sa.String(20), nullable=True),
+            sa.Column("result_date", sa.Date(), nullable=True),
+            sa.Column("open_declared", sa.Boolean(), nullable=False),
+            sa.Column("close_declared", sa.Boolean(), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    bind.execute(sa.text(BACKFILL))
+
+
+def downgrade():
+    op.drop_table("market_live_state")
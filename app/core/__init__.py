@@ -1,5 +1,8 @@
 """Core application modules"""
-from app.core.database import engine, Base, get_db, SessionLocal
+from app.core.database import (
+    engine, Base, get_db, SessionLocal,
+    async_engine, get_async_db, AsyncSessionLocal
+)
 from app.core.security import (
     hash_password, verify_password, create_access_token,
     create_refresh_token, verify_token, get_current_user,
@@ -15,6 +18,9 @@ __all__ = [
     "Base",
     "get_db",
     "SessionLocal",
+    "async_engine",
+    "get_async_db",
+    "AsyncSessionLocal",
     "hash_password",
     "verify_password",
     "create_access_token",
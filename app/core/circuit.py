@@ -0,0 +1,97 @@
+"""Circuit breaker for the database read path"""
+import asyncio
+import threading
+import time
+from typing import Optional, Tuple, Type
+
+from sqlalchemy import exc as sa_exc
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Errors that mean the database is unreachable or saturated, as opposed to a
+# query that ran and failed (IntegrityError, a 404 raised by the loader, ...)
+DB_FAILURES: Tuple[Type[BaseException], ...] = (
+    sa_exc.OperationalError,
+    sa_exc.InterfaceError,
+    sa_exc.TimeoutError,
+    sa_exc.DisconnectionError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures
+
+    While open, ``allow`` refuses calls. After ``reset_after`` seconds one
+    trial call is let through (half open); its success closes the circuit
+    and its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_after: float = 10.0,
+        failures: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = failures
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return CLOSED
+            if time.monotonic() - self._opened_at < self.reset_after:
+                return OPEN
+            return HALF_OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_after:
+                return False
+            # A trial whose outcome was never recorded does not block forever
+            if self._trial_at is not None and now - self._trial_at < self.reset_after:
+                return False
+            self._trial_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            half_open = self._opened_at is not None
+            self._trial_at = None
+            if half_open or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+db_circuit = CircuitBreaker(
+    "database",
+    failure_threshold=settings.DB_CIRCUIT_FAILURES,
+    reset_after=settings.DB_CIRCUIT_RESET_SECONDS,
+    failures=DB_FAILURES,
+)
@@ -17,6 +17,12 @@ class Settings(BaseSettings):
     DB_USER: str = os.getenv("DB_USER", "root")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
     SQL_ECHO: bool = os.getenv("SQL_ECHO", "False") == "True"
+    DB_CIRCUIT_FAILURES: int = int(os.getenv("DB_CIRCUIT_FAILURES", "5"))
+    DB_CIRCUIT_RESET_SECONDS: float = float(os.getenv("DB_CIRCUIT_RESET_SECONDS", "10"))
+    # Per-request query counts and N+1 warnings (Server-Timing headers need DEBUG too)
+    SQL_PROFILE: bool = os.getenv("SQL_PROFILE", "False") == "True"
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -32,9 +38,53 @@ class Settings(BaseSettings):
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
     REDIS_DB: int = 0
     
+    # Cache
+    CACHE_PREFIX: str = os.getenv("CACHE_PREFIX", "smboss")
+    CACHE_DEFAULT_TTL: int = int(os.getenv("CACHE_DEFAULT_TTL", "60"))
+    CACHE_LOCAL_MAX_ENTRIES: int = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "2048"))
+    CACHE_LOCAL_MAX_BYTES: int = int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_WARM_TTL: int = int(os.getenv("CACHE_WARM_TTL", "3900"))
+    CACHE_REDIS_ENABLED: bool = os.getenv("CACHE_REDIS_ENABLED", "True") == "True"
+    CACHE_STALE_TTL: int = int(os.getenv("CACHE_STALE_TTL", "30"))
+    CACHE_STALE_IF_ERROR_TTL: int = int(os.getenv("CACHE_STALE_IF_ERROR_TTL", "86400"))
+    CACHE_VERSION_LOCAL_TTL: float = float(os.getenv("CACHE_VERSION_LOCAL_TTL", "1.0"))
+    # Invalidated by tags on every input write; the TTL is only a backstop
+    PUBLIC_HOME_TTL: int = int(os.getenv("PUBLIC_HOME_TTL", "3600"))
+    ADMIN_TOTAL_TTL: int = int(os.getenv("ADMIN_TOTAL_TTL", "30"))
+    
+    # Compression
+    COMPRESS_MIN_BYTES: int = int(os.getenv("COMPRESS_MIN_BYTES", "512"))
+    # On-the-fly levels; cached views are compressed once at higher settings
+    COMPRESS_GZIP_LEVEL: int = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY: int = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+    
+    # Batch endpoint
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    BATCH_TIMEOUT_SECONDS: float = float(os.getenv("BATCH_TIMEOUT_SECONDS", "10"))
+    
+    # On-demand request profiling (admins send X-Profile: 1)
+    REQUEST_PROFILE_DIR: str = os.getenv("REQUEST_PROFILE_DIR", "logs/profiles")
+    REQUEST_PROFILE_INTERVAL_MS: float = float(os.getenv("REQUEST_PROFILE_INTERVAL_MS", "2"))
+    REQUEST_PROFILE_MAX_SECONDS: float = float(os.getenv("REQUEST_PROFILE_MAX_SECONDS", "30"))
+    REQUEST_PROFILE_PER_MINUTE: int = int(os.getenv("REQUEST_PROFILE_PER_MINUTE", "6"))
+    REQUEST_PROFILE_KEEP: int = int(os.getenv("REQUEST_PROFILE_KEEP", "20"))
+    
+    # Prometheus scrape endpoint: client addresses allowed without a token
+    METRICS_ALLOWED_CLIENTS: str = os.getenv("METRICS_ALLOWED_CLIENTS", "127.0.0.1,::1")
+    # Bearer token that lets scrapers on other hosts in; empty disables it
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    
+    # Analysis
+    ANALYSIS_AGGREGATE_TTL: int = int(os.getenv("ANALYSIS_AGGREGATE_TTL", "300"))
+    ANALYSIS_MAX_PERIOD_DAYS: int = int(os.getenv("ANALYSIS_MAX_PERIOD_DAYS", "5490"))
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = "logs/app.log"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # json or text
+    # Keep rates for noisy loggers below WARNING, e.g. "app.services.cache_service=0.1"
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
     
     # External sync
     EXTERNAL_SYNC_SOURCE: str = os.getenv("EXTERNAL_SYNC_SOURCE", "")
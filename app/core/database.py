@@ -1,9 +1,13 @@
 """Database connection and session management"""
+import asyncio
+from fastapi import Request
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from typing import AsyncGenerator, Generator
 import os
 from app.core.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_samples, registry
 from app.models import Base
 
 # Database URL
@@ -12,6 +16,10 @@ if settings.DATABASE_TYPE == "mysql":
         f"mysql+mysqlconnector://{settings.DB_USER}:{settings.DB_PASSWORD}"
         f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
     )
+    ASYNC_DATABASE_URL = (
+        f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}"
+        f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+    )
 else:
     raise ValueError(f"Unsupported database type: {settings.DATABASE_TYPE}")
 
@@ -19,6 +27,7 @@ else:
 engine = create_engine(
     DATABASE_URL,
     echo=settings.SQL_ECHO,
+    poolclass=TimedQueuePool,
     pool_size=10,
     max_overflow=20,
     pool_pre_ping=True,
@@ -31,6 +40,31 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine (used by the hot read paths so queries don't block the event loop)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.SQL_ECHO,
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+)
+
+registry.callback(
+    "db_pool_connections",
+    "Pooled connections by state (checked_out, overflow, size)",
+    pool_samples([("sync", engine), ("async", async_engine)]),
+    ("engine", "state"),
+)
+
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Database dependency
 def get_db() -> Generator:
     db = SessionLocal()
@@ -39,6 +73,54 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+# Scope key under which a batch request hands its session to sub-requests
+SHARED_SESSION_SCOPE_KEY = "smboss.shared_session"
+
+class SharedSessionAbandoned(Exception):
+    """A statement on a SharedAsyncSession was cancelled; the session is unusable"""
+
+class SharedAsyncSession:
+    """One AsyncSession used by concurrent sub-requests, one statement at a time
+    
+    An AsyncSession must not run two operations at once; reads are buffered
+    by ``execute``, so holding the lock per call is enough for read paths.
+    A statement cancelled half way (a sub-request timeout) leaves the
+    connection in an unknown state, so every later call raises
+    ``SharedSessionAbandoned`` and the owner must invalidate the session.
+    """
+    
+    _GUARDED = {"execute", "scalar", "scalars", "get", "refresh"}
+    
+    def __init__(self, session: AsyncSession):
+        self._session = session
+        self._lock = asyncio.Lock()
+        self.abandoned = False
+    
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if name not in self._GUARDED:
+            return attr
+        
+        async def guarded(*args, **kwargs):
+            async with self._lock:
+                if self.abandoned:
+                    raise SharedSessionAbandoned("Batch session abandoned after a timed out statement")
+                try:
+                    return await attr(*args, **kwargs)
+                except asyncio.CancelledError:
+                    self.abandoned = True
+                    raise
+        return guarded
+
+# Async database dependency
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    shared = request.scope.get(SHARED_SESSION_SCOPE_KEY)
+    if shared is not None:
+        yield shared
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Health check
 def check_database_connection() -> bool:
     try:
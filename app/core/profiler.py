@@ -0,0 +1,185 @@
+"""On-demand sampling profiler for single requests, exported as speedscope JSON
+
+The sampler thread reads ``sys._current_frames()`` every few milliseconds.
+The event loop thread is always sampled, so time spent awaiting I/O shows
+up under the selector and other requests interleaved on the loop appear
+too. Worker threads (sync views, ``run_in_threadpool``) are only sampled
+while application code is on their stack, which drops idle pool threads.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.encoding import dumps
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+PROFILE_SUFFIX = ".speedscope.json"
+
+# (function, file, first line): one speedscope frame
+FrameKey = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """Samples the stacks of the starting (event loop) thread and busy worker threads"""
+
+    def __init__(self, interval: float, max_seconds: float, on_finish: Optional[Callable[[], None]] = None):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        # Called once when sampling ends: on stop() or after max_seconds
+        self._on_finish = on_finish
+        self._finish_lock = threading.Lock()
+        self._frames: Dict[FrameKey, int] = {}
+        # thread id -> (stacks of frame indexes, root first; weights in seconds)
+        self._samples: Dict[int, Tuple[List[List[int]], List[float]]] = {}
+        self._names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._main = 0
+        self.started = self.ended = 0.0
+
+    def start(self) -> None:
+        self._main = threading.get_ident()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.ended = time.perf_counter()
+        self._finish()
+
+    def _finish(self) -> None:
+        with self._finish_lock:
+            on_finish, self._on_finish = self._on_finish, None
+        if on_finish is not None:
+            on_finish()
+
+    def _run(self) -> None:
+        last = self.started
+        try:
+            while not self._stop.wait(self.interval):
+                now = time.perf_counter()
+                if now - self.started > self.max_seconds:
+                    break
+                self._sample(now - last)
+                last = now
+        finally:
+            self._finish()
+
+    def _frame(self, frame) -> int:
+        code = frame.f_code
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        index = self._frames.get(key)
+        if index is None:
+            index = self._frames[key] = len(self._frames)
+        return index
+
+    def _sample(self, weight: float) -> None:
+        own = threading.get_ident()
+        names = None
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            in_app = False
+            while frame is not None:
+                stack.append(frame)
+                in_app = in_app or frame.f_code.co_filename.startswith(APP_ROOT)
+                frame = frame.f_back
+            if ident != self._main and not in_app:
+                continue
+            if ident not in self._samples:
+                if names is None:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                self._names[ident] = names.get(ident, str(ident))
+                self._samples[ident] = ([], [])
+            stacks, weights = self._samples[ident]
+            stacks.append([self._frame(f) for f in reversed(stack)])
+            weights.append(weight)
+
+    def speedscope(self, name: str) -> dict:
+        """The samples as a speedscope file, one sampled profile per thread"""
+        frames = [{"name": n, "file": f, "line": line} for (n, f, line) in self._frames]
+        duration = max(self.ended - self.started, 0.0)
+        profiles = []
+        for ident, (stacks, weights) in self._samples.items():
+            thread = self._names[ident] + (" (event loop)" if ident == self._main else "")
+            profiles.append({
+                "type": "sampled",
+                "name": f"{name} - {thread}",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": duration,
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": settings.APP_NAME,
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class ProfileRateLimiter:
+    """At most ``per_minute`` profiles per worker, and one at a time"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._started: deque = deque()
+        self._running = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] >= 60:
+                self._started.popleft()
+            if self._running or len(self._started) >= self.per_minute:
+                return False
+            self._started.append(now)
+            self._running = True
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._running = False
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile, or None for unknown (or malformed) ids"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(settings.REQUEST_PROFILE_DIR, profile_id + PROFILE_SUFFIX)
+    return path if os.path.exists(path) else None
+
+
+def save_profile(profile_id: str, document: dict) -> str:
+    """Write a profile and drop the oldest beyond REQUEST_PROFILE_KEEP"""
+    directory = settings.REQUEST_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile_id + PROFILE_SUFFIX)
+    with open(path, "wb") as f:
+        f.write(dumps(document))
+    stored = sorted(
+        (os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(PROFILE_SUFFIX)),
+        key=os.path.getmtime,
+    )
+    for old in stored[:-settings.REQUEST_PROFILE_KEEP]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+    return path
@@ -1,7 +1,98 @@
-from typing import List
+"""Result string parsing
+
+A declared result looks like ``"123-45-678"``: open panna, jodi (open ank
+followed by close ank) and close panna. Half-declared results such as
+``"123-4"`` carry only the open side. Placeholder characters (``*``) and
+malformed parts are treated as not yet declared.
+"""
+from dataclasses import dataclass, asdict, fields
+from typing import List, Optional
+
+SINGLE = "single"
+DOUBLE = "double"
+TRIPLE = "triple"
 
 
 def parse_result_lines(raw: str) -> List[str]:
     """Basic parser stub that splits on newlines."""
     return [line.strip() for line in raw.splitlines() if line.strip()]
 
+
+@dataclass(frozen=True)
+class ParsedResult:
+    open_panna: Optional[int] = None
+    open_ank: Optional[int] = None
+    jodi: Optional[int] = None
+    close_ank: Optional[int] = None
+    close_panna: Optional[int] = None
+    open_panna_type: Optional[str] = None
+    close_panna_type: Optional[str] = None
+
+    def as_columns(self) -> dict:
+        """Values for the parsed columns on ``game_results``"""
+        return asdict(self)
+
+
+PARSED_COLUMNS = tuple(f.name for f in fields(ParsedResult))
+
+
+def panna_type(panna: str) -> str:
+    """Classify a three digit panna as single, double or triple"""
+    distinct = len(set(panna))
+    if distinct == 1:
+        return TRIPLE
+    if distinct == 2:
+        return DOUBLE
+    return SINGLE
+
+
+def panna_ank(panna: str) -> int:
+    """Ank of a panna: last digit of the digit sum"""
+    return sum(int(c) for c in panna) % 10
+
+
+def format_jodi(jodi: Optional[int]) -> Optional[str]:
+    return None if jodi is None else f"{jodi:02d}"
+
+
+def format_panna(panna: Optional[int]) -> Optional[str]:
+    return None if panna is None else f"{panna:03d}"
+
+
+def _digits(part: str, length: int) -> Optional[str]:
+    part = part.strip()
+    if len(part) == length and part.isdigit():
+        return part
+    return None
+
+
+def parse_result(raw: Optional[str]) -> ParsedResult:
+    """Split a result string into its pannas, anks and jodi"""
+    parts = (raw or "").split("-")
+    open_panna = _digits(parts[0], 3) if len(parts) >= 1 else None
+    middle = parts[1].strip() if len(parts) >= 2 else ""
+    close_panna = _digits(parts[2], 3) if len(parts) >= 3 else None
+
+    open_ank = close_ank = None
+    if middle[:1].isdigit():
+        open_ank = int(middle[0])
+    elif open_panna:
+        open_ank = panna_ank(open_panna)
+    if len(middle) == 2 and middle[1].isdigit():
+        close_ank = int(middle[1])
+    elif close_panna:
+        close_ank = panna_ank(close_panna)
+
+    jodi = None
+    if open_ank is not None and close_ank is not None:
+        jodi = open_ank * 10 + close_ank
+
+    return ParsedResult(
+        open_panna=int(open_panna) if open_panna else None,
+        open_ank=open_ank,
+        jodi=jodi,
+        close_ank=close_ank,
+        close_panna=int(close_panna) if close_panna else None,
+        open_panna_type=panna_type(open_panna) if open_panna else None,
+        close_panna_type=panna_type(close_panna) if close_panna else None,
+    )
@@ -0,0 +1,138 @@
+"""Opt-in SQL instrumentation: per-request query counts, DB time, N+1 and slow queries
+
+Cursor events on every Engine (sync and the async engines' sync side) add
+to the ``QueryProfile`` of the current context, which the profiling
+middleware opens per request and ``profile_queries`` opens in tests.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_QUOTED = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_SPACE = re.compile(r"\s+")
+
+_current: ContextVar[Optional["QueryProfile"]] = ContextVar("sql_profile", default=None)
+
+# Connection.info key for start times of statements in flight
+_STARTS = "sql_profiler_starts"
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals, placeholders and IN-list lengths erased"""
+    shape = _QUOTED.sub("?", statement)
+    shape = shape.replace("%s", "?").replace("%(", "?(")
+    shape = _NUMBER.sub("?", shape)
+    shape = _POSTCOMPILE.sub("(?+)", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?+)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Statements run in one request (or test block)"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self.slow: List[Tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Shapes run at least ``threshold`` times: the signature of an N+1 loop"""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTS, []).append(time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_STARTS)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        shape = fingerprint(statement)
+        if profile is not None:
+            profile.slow.append((shape, elapsed))
+        logger.warning(
+            "Slow query",
+            extra={
+                "sql": shape,
+                "duration_ms": round(elapsed * 1000, 2),
+                "request": profile.label if profile is not None else None,
+                "executemany": executemany,
+            },
+        )
+
+
+def _failed(context) -> None:
+    # after_cursor_execute never runs for a statement that raised
+    connection = context.connection
+    starts = connection.info.get(_STARTS) if connection is not None and not connection.closed else None
+    if starts:
+        starts.pop()
+
+
+def install() -> None:
+    """Register the cursor listeners on every Engine (idempotent)"""
+    if not event.contains(Engine, "before_cursor_execute", _before):
+        event.listen(Engine, "before_cursor_execute", _before)
+        event.listen(Engine, "after_cursor_execute", _after)
+        event.listen(Engine, "handle_error", _failed)
+
+
+def start_profile(label: str = ""):
+    """Open a profile for the current context; returns (profile, reset token)"""
+    profile = QueryProfile(label)
+    return profile, _current.set(profile)
+
+
+def end_profile(token) -> None:
+    _current.reset(token)
+
+
+def report(profile: QueryProfile) -> None:
+    """Log repeated statement shapes of a finished request"""
+    for shape, n in profile.repeated().items():
+        logger.warning(
+            "Possible N+1 query",
+            extra={"sql": shape, "executions": n, "request": profile.label, "queries": profile.count},
+        )
+
+
+@contextmanager
+def profile_queries(label: str = "") -> Iterator[QueryProfile]:
+    """Profile the statements run inside the block, e.g. to assert on N+1 in tests"""
+    install()
+    profile, token = start_profile(label)
+    try:
+        yield profile
+    finally:
+        end_profile(token)
@@ -1,7 +1,20 @@
 """Cache warming job"""
+import time
+from sqlalchemy import func
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.game import Game
 from app.models.result import Result
+from app.models.rashi import Rashi
+from app.models.offer import Offer
+from app.services.cache_service import cache_service, market_tag, date_tag, rashi_tag
+from app.services.response_builder import (
+    DEFAULT_HISTORY_LIMIT,
+    public_markets_key, public_results_key, live_results_key,
+    market_results_key, public_rashi_key, public_offers_key, public_home_key,
+    build_public_markets, build_public_results, build_live_results,
+    build_market_results, build_public_rashi, build_public_offers, build_public_home,
+)
 from app.utils.logger import setup_logger
 from datetime import datetime, date
 
@@ -9,27 +22,135 @@ logger = setup_logger(__name__)
 
 class CacheWarmer:
     """Background job to warm cache"""
-    
+
     @staticmethod
-    def warm_cache():
-        """Warm application cache"""
+    def _store(report: list, key: str, build, tags: list, before: dict):
+        """Build one payload, store it and record what it cost
+
+        ``before`` holds the versions of the tags the payload depends on,
+        read before its rows were queried. If a write has bumped any of them
+        since, the rows may predate it and nothing is stored.
+        """
+        started = time.perf_counter()
+        payload = build()
+        if cache_service.tag_versions_blocking(before, memoized=False) != before:
+            logger.info(f"Skipped warming {key}: its data changed while warming")
+            return
+        entry = cache_service.set_blocking(key, payload, ttl=settings.CACHE_WARM_TTL, tags=tags)
+        report.append({
+            "key": key,
+            "version": entry.version,
+            "bytes": len(entry.body),
+            "build_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+
+    @staticmethod
+    def _recent_results(db, market_ids: list, limit: int) -> dict:
+        """Latest ``limit`` results per market in a single windowed query"""
+        if not market_ids:
+            return {}
+        rank = func.row_number().over(
+            partition_by=Result.market_id,
+            order_by=Result.result_date.desc(),
+        ).label("rank")
+        ranked = db.query(Result.sr_no, rank).filter(
+            Result.market_id.in_(market_ids)
+        ).subquery()
+        rows = db.query(Result).join(
+            ranked, Result.sr_no == ranked.c.sr_no
+        ).filter(ranked.c.rank <= limit).order_by(
+            Result.market_id, Result.result_date.desc()
+        ).all()
+        by_market = {market_id: [] for market_id in market_ids}
+        for r in rows:
+            by_market[r.market_id].append(r)
+        return by_market
+
+    @staticmethod
+    def warm_cache() -> list:
+        """Precompute and store the hottest public response bodies"""
         db = SessionLocal()
-        
+        report = []
+
         try:
             logger.info("Starting cache warming")
-            
-            # Get all active markets
-            markets = db.query(Game).filter(Game.status == 1).all()
-            logger.info(f"Cached {len(markets)} markets")
-            
-            # Get today's results
+            started = time.perf_counter()
             today = datetime.now().date()
+            home_tags = ["markets", date_tag(today), rashi_tag(today), "offers"]
+            versions = cache_service.tag_versions_blocking(home_tags, memoized=False)
+
+            def before(*tags):
+                return {tag: versions[tag] for tag in tags}
+
+            markets = db.query(Game).filter(Game.status == 1).all()
+            CacheWarmer._store(
+                report, public_markets_key(),
+                lambda: build_public_markets(markets), ["markets"], before("markets"),
+            )
+
             results = db.query(Result).filter(Result.result_date == today).all()
-            logger.info(f"Cached {len(results)} results for today")
-            
-            logger.info("Cache warming completed successfully")
-            
+            CacheWarmer._store(
+                report, public_results_key(today),
+                lambda: build_public_results(results, today), [date_tag(today)],
+                before(date_tag(today)),
+            )
+            CacheWarmer._store(
+                report, live_results_key(today),
+                lambda: build_live_results(results, today), [date_tag(today)],
+                before(date_tag(today)),
+            )
+
+            # Market edits also bump "markets", read before the market rows were
+            versions.update(cache_service.tag_versions_blocking(
+                [market_tag(m.sr_no) for m in markets], memoized=False
+            ))
+            history = CacheWarmer._recent_results(
+                db, [m.sr_no for m in markets], DEFAULT_HISTORY_LIMIT
+            )
+            for market in markets:
+                CacheWarmer._store(
+                    report, market_results_key(market.sr_no),
+                    lambda: build_market_results(market, history[market.sr_no]),
+                    [market_tag(market.sr_no)], before("markets", market_tag(market.sr_no)),
+                )
+
+            rashi = db.query(Rashi).filter(Rashi.result_date == today).all()
+            CacheWarmer._store(
+                report, public_rashi_key(today),
+                lambda: build_public_rashi(rashi, today), [rashi_tag(today)],
+                before(rashi_tag(today)),
+            )
+
+            offers = db.query(Offer).filter(
+                Offer.status == 1,
+                Offer.valid_from <= today,
+                Offer.valid_till >= today
+            ).all()
+            CacheWarmer._store(
+                report, public_offers_key(today),
+                lambda: build_public_offers(offers), ["offers"], before("offers"),
+            )
+            # Same rows as the views above, so the snapshot costs no extra queries
+            CacheWarmer._store(
+                report, public_home_key(today),
+                lambda: build_public_home(markets, results, rashi, offers, today),
+                home_tags, before(*home_tags),
+            )
+
+            for item in report:
+                logger.info(
+                    f"Warmed {item['key']} v={item['version']} "
+                    f"{item['bytes']} bytes in {item['build_ms']} ms"
+                )
+            logger.info(
+                f"Cache warming completed: {len(report)} payloads, "
+                f"{sum(i['bytes'] for i in report)} bytes in "
+                f"{round((time.perf_counter() - started) * 1000, 2)} ms"
+            )
+
         except Exception as e:
             logger.error(f"Error in cache warmer job: {str(e)}")
         finally:
             db.close()
+
+        return report
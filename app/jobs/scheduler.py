@@ -1,8 +1,12 @@
 """Background job scheduler"""
+import threading
+import time
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from app.jobs.sync_results import ResultSyncJob
 from app.jobs.cache_warmer import CacheWarmer
+from app.core.metrics import job_duration
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -10,6 +14,26 @@ logger = setup_logger(__name__)
 # Create scheduler
 scheduler = BackgroundScheduler()
 
+# (job id, scheduled run time) -> submission time of runs in progress
+_job_starts = {}
+_job_starts_lock = threading.Lock()
+
+def _record_job_event(event):
+    """Time each run from submission to its executed/error event"""
+    if event.code == EVENT_JOB_SUBMITTED:
+        now = time.perf_counter()
+        with _job_starts_lock:
+            for run_time in event.scheduled_run_times:
+                _job_starts[(event.job_id, run_time)] = now
+        return
+    with _job_starts_lock:
+        started = _job_starts.pop((event.job_id, event.scheduled_run_time), None)
+    if started is not None:
+        outcome = "error" if event.code == EVENT_JOB_ERROR else "ok"
+        job_duration.observe(time.perf_counter() - started, event.job_id, outcome)
+
+scheduler.add_listener(_record_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
 # Add jobs
 def configure_jobs():
     """Configure background jobs"""
@@ -34,5 +58,14 @@ def configure_jobs():
     
     logger.info("Background jobs configured")
 
+def schedule_startup_warm():
+    """Warm the cache once right after start so a deploy doesn't begin cold"""
+    scheduler.add_job(
+        CacheWarmer.warm_cache,
+        id='cache_warmer_startup',
+        name='Cache Warmer Startup',
+        replace_existing=True
+    )
+
 # Configure on import
 configure_jobs()
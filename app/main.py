@@ -8,12 +8,21 @@ import logging
 from datetime import datetime
 
 # Import all routes
-from app.routes import health, auth, markets, results, admin, public
-from app.core.database import engine, Base, get_db
+from app.routes import health, auth, markets, results, admin, public, analysis, batch
+from app.core.database import engine, async_engine, Base, get_db
 from app.core.exceptions import HTTPException, ValidationError, DatabaseError
 from app.core.config import settings
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiler import RequestProfilerMiddleware
+from app.middleware.sql_profiler import SQLProfilerMiddleware
 from app.utils.logger import setup_logger
-from app.jobs.scheduler import scheduler
+from app.jobs.scheduler import scheduler, schedule_startup_warm
+from app.services.event_broker import event_broker
+from app.services.invalidation_bus import invalidation_bus
+from app.services import cache_tags  # noqa: F401 - registers ORM write invalidation
+from app.services import live_state  # noqa: F401 - maintains market_live_state on writes
+from app.services import analysis_service  # noqa: F401 - keeps the frequency aggregates current on writes
 
 # Setup logging
 logger = setup_logger(__name__)
@@ -28,8 +37,13 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created")
     
+    # Start live result fan-out and the cache invalidation relay
+    await event_broker.start()
+    invalidation_bus.start()
+    
     # Start background scheduler
     scheduler.start()
+    schedule_startup_warm()
     logger.info("Background jobs scheduler started")
     
     yield
@@ -38,6 +52,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down SMBOSS Application")
     scheduler.shutdown()
     logger.info("Background jobs scheduler stopped")
+    await event_broker.stop()
+    invalidation_bus.stop()
+    await async_engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -47,6 +64,24 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Compression (cached views arrive precompressed and pass through)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESS_MIN_BYTES,
+    gzip_level=settings.COMPRESS_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESS_BROTLI_QUALITY,
+)
+
+# Admin-triggered request profiling (wraps compression, so encoding time is sampled too)
+app.add_middleware(RequestProfilerMiddleware)
+
+# SQL profiling (opt-in)
+if settings.SQL_PROFILE:
+    app.add_middleware(SQLProfilerMiddleware, server_timing=settings.DEBUG)
+
+# Metrics (outermost of ours, so latency includes compression)
+app.add_middleware(MetricsMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -120,6 +155,8 @@ app.include_router(markets.router, prefix="/markets", tags=["Markets"])
 app.include_router(results.router, prefix="/results", tags=["Results"])
 app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 app.include_router(public.router, prefix="/public", tags=["Public"])
+app.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
+app.include_router(batch.router, prefix="/batch", tags=["Batch"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,140 @@
+"""Negotiated gzip / brotli response compression"""
+import zlib
+from typing import Iterable, Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.encoding import BROTLI, IDENTITY, compress, select_encoding
+
+# Already compressed formats; compressing them again only burns CPU
+SKIP_MEDIA_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "font/woff")
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk
+
+    Each chunk is decodable as soon as it arrives, so server-sent events and
+    exports reach the client as they are produced instead of when a
+    compression block fills up.
+    """
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Compress responses in the best coding the client accepts
+
+    A complete body is compressed in one go when it reaches ``minimum_size``.
+    A streamed body (``more_body``) is compressed chunk by chunk with a flush
+    after each one. Responses that already carry a Content-Encoding, such as
+    cached views sent from their stored variants, pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 512,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        skip_media_types: Iterable[str] = SKIP_MEDIA_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.skip_media_types = tuple(skip_media_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding == IDENTITY:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedSend(self, encoding, send).run(scope, receive)
+
+
+class _CompressedSend:
+    """Per-response state: holds the start message until the body shape is known"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.stream: Optional[_StreamCompressor] = None
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.wrapped)
+
+    def _compressible(self, message: Message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "")
+        return not media_type.startswith(self.middleware.skip_media_types)
+
+    async def wrapped(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None and not more_body:
+            await self._send_whole(body)
+            return
+        if self.stream is None:
+            self.stream = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            await self.send(self.start)
+        data = self.stream.chunk(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) >= self.middleware.minimum_size:
+            packed = compress(body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            if len(packed) < len(body):
+                headers = self._encoded_headers()
+                headers["content-length"] = str(len(packed))
+                body = packed
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": body, "more_body": False})
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        return headers
@@ -0,0 +1,42 @@
+"""Per-route request count, latency and in-flight metrics"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import http_in_flight, http_latency, http_requests
+
+# Label for requests no route matched, so scanners cannot explode cardinality
+UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware:
+    """Records each HTTP request under its route template, e.g. /markets/{market_id}"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED
+            method = scope["method"]
+            http_requests.inc(method, template, str(status))
+            http_latency.observe(elapsed, method, template)
@@ -0,0 +1,96 @@
+"""Admin-triggered profiling of a single request
+
+Send ``X-Profile: 1`` with an admin bearer token. The response carries
+``X-Profile-Id`` and ``X-Profile-Url``; the speedscope file can be
+downloaded from that URL once the response has finished.
+"""
+import asyncio
+import uuid
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.profiler import ProfileRateLimiter, SamplingProfiler, save_profile
+from app.core.security import get_current_admin, verify_token
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+# Responses that stay open indefinitely; their profile would only be saved on disconnect
+UNPROFILED_PREFIXES = ("/results/stream",)
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"http_status": status_code, "success": False, "message": message, "data": {"error": message}},
+    )
+
+
+def _admin(headers: Headers) -> dict:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return get_current_admin(verify_token(token))
+
+
+class RequestProfilerMiddleware:
+    """Runs requests flagged by an admin under the sampling profiler"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiter = ProfileRateLimiter(settings.REQUEST_PROFILE_PER_MINUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+        try:
+            admin = _admin(headers)
+        except HTTPException as exc:
+            await _error(exc.status_code, str(exc.detail))(scope, receive, send)
+            return
+        if scope["path"].startswith(UNPROFILED_PREFIXES):
+            await _error(400, "Streaming responses cannot be profiled")(scope, receive, send)
+            return
+        if not self.limiter.acquire():
+            await _error(429, "Profiling rate limit exceeded")(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        name = f"{scope['method']} {scope['path']}"
+
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append("X-Profile-Id", profile_id)
+                response_headers.append("X-Profile-Url", f"/admin/profiles/{profile_id}")
+            await send(message)
+
+        # The slot frees when sampling ends, even if the response runs on past the cap
+        profiler = SamplingProfiler(
+            settings.REQUEST_PROFILE_INTERVAL_MS / 1000,
+            settings.REQUEST_PROFILE_MAX_SECONDS,
+            on_finish=self.limiter.release,
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            # Joining the sampler thread can take an interval; not on the loop
+            await asyncio.to_thread(profiler.stop)
+            try:
+                await run_in_threadpool(save_profile, profile_id, profiler.speedscope(name))
+                logger.info(f"Profiled {name} as {profile_id} for admin {admin.get('sub')}")
+            except Exception as e:
+                logger.error(f"Saving profile {profile_id} of {name} failed: {e}")
@@ -0,0 +1,36 @@
+"""Per-request SQL profile: query count, DB time and N+1 warnings"""
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import sql_profiler
+
+
+class SQLProfilerMiddleware:
+    """Opens a query profile per HTTP request and reports it when the response starts
+
+    With ``server_timing`` the profile is also sent as a ``Server-Timing``
+    header, which browser dev tools show next to the request.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+        sql_profiler.install()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile, token = sql_profiler.start_profile(f"{scope['method']} {scope['path']}")
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                # Streaming bodies may query after this point; the header covers the handler
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            sql_profiler.end_profile(token)
+            sql_profiler.report(profile)
@@ -10,6 +10,7 @@ from app.models.counter import Counter
 from app.models.color import GameColor
 from app.models.offer import Offer
 from app.models.auditlog import AuditLog
+from app.models.live_state import MarketLiveState
 
 __all__ = [
     "Base",
@@ -24,4 +25,5 @@ __all__ = [
     "GameColor",
     "Offer",
     "AuditLog",
+    "MarketLiveState",
 ]
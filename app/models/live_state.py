@@ -0,0 +1,26 @@
+"""Latest result per market, maintained with every result write"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, Time, Boolean
+from datetime import datetime
+from app.models.base import Base
+
+class MarketLiveState(Base):
+    """One row per market for the live board; written by app.services.live_state"""
+    __tablename__ = "market_live_state"
+    
+    # No foreign key: the row is dropped in the same flush that deletes the market
+    market_id = Column(Integer, primary_key=True, autoincrement=False)
+    # Copied from game so the board needs no join
+    game = Column(String(100), nullable=False)
+    open_time = Column(Time, nullable=True)
+    close_time = Column(Time, nullable=True)
+    market_status = Column(Integer, default=1)
+    # Latest result of the market, whatever its date
+    result = Column(String(20), nullable=True)
+    result_date = Column(Date, nullable=True)
+    open_declared = Column(Boolean, default=False, nullable=False)
+    close_declared = Column(Boolean, default=False, nullable=False)
+    version = Column(Integer, default=1, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    class Config:
+        from_attributes = True
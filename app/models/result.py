@@ -1,8 +1,9 @@
 """Result model - Normalized from game_[market] tables"""
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from app.models.base import BaseModel
+from app.core.result_parser import parse_result
 
 class Result(BaseModel):
     __tablename__ = "game_results"
@@ -14,13 +15,30 @@ class Result(BaseModel):
     date = Column(DateTime, default=datetime.utcnow)
     status = Column(Integer, default=0)
     
+    # Parsed from ``result`` on write so analytics can group on integers
+    open_panna = Column(SmallInteger, nullable=True)
+    open_ank = Column(SmallInteger, nullable=True)
+    jodi = Column(SmallInteger, nullable=True, index=True)
+    close_ank = Column(SmallInteger, nullable=True)
+    close_panna = Column(SmallInteger, nullable=True)
+    open_panna_type = Column(String(6), nullable=True)
+    close_panna_type = Column(String(6), nullable=True)
+    
     game = relationship("Game")
     
     __table_args__ = (
         UniqueConstraint('market_id', 'result_date', name='uq_market_date'),
         Index('idx_result_date', 'result_date'),
         Index('idx_market_status', 'market_id', 'status'),
+        Index('idx_result_market_date_jodi', 'market_id', 'result_date', 'jodi'),
+        Index('idx_result_market_date_panna', 'market_id', 'result_date', 'open_panna', 'close_panna'),
     )
     
+    @validates('result')
+    def _parse_result(self, key, value):
+        for column, parsed in parse_result(value).as_columns().items():
+            setattr(self, column, parsed)
+        return value
+    
     class Config:
         from_attributes = True
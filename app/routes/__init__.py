@@ -6,6 +6,7 @@ from app.routes import (
     results,
     public,
     admin,
+    analysis,
 )
 
-__all__ = ["health", "auth", "markets", "results", "public", "admin"]
+__all__ = ["health", "auth", "markets", "results", "public", "admin", "analysis"]
@@ -1,9 +1,11 @@
 """Admin endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 from app.core.database import get_db
 from app.core.security import get_current_admin
+from app.core.profiler import PROFILE_SUFFIX, profile_path
 from app.models.user import User
 from app.models.game import Game
 from app.models.result import Result
@@ -15,6 +17,7 @@ from app.schemas.user import UserRegisterRequest
 from pydantic import BaseModel, Field
 from typing import Optional
 from app.jobs.sync_results import ResultSyncJob
+from app.utils.pagination import cached_total, paginate
 
 router = APIRouter()
 
@@ -51,18 +54,20 @@ async def admin_dashboard(
 @router.get(
     "/users",
     responses={
-        200: {"content": {"application/json": {"example": {"status": "success", "users": [{"id": 1, "username": "user1", "mobile": "9999999999", "email": None, "status": 1, "created_at": "2025-12-01T12:00:00Z"}], "total": 1, "limit": 50, "offset": 0}}}},
+        200: {"content": {"application/json": {"example": {"status": "success", "users": [{"id": 1, "username": "user1", "mobile": "9999999999", "email": None, "status": 1, "created_at": "2025-12-01T12:00:00Z"}], "total": 1, "limit": 50, "offset": 0, "next_cursor": None}}}},
         403: {"content": {"application/json": {"example": {"detail": "Admin privileges required"}}}},
     },
 )
 async def list_users(
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    users = db.query(User).limit(limit).offset(offset).all()
-    total = db.query(User).count()
+    """List users by id; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    users, next_cursor = paginate(db.query(User), [User.id], [int], limit, offset, cursor, descending=False)
+    total = await cached_total("users", "all", db.query(User).count)
     
     return {
         "http_status": 200,
@@ -82,7 +87,8 @@ async def list_users(
             ],
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": None if cursor else offset,
+            "next_cursor": next_cursor
         }
     }
 
@@ -262,22 +268,23 @@ async def deactivate_user(
 @router.get(
     "/rashi",
     responses={
-        200: {"content": {"application/json": {"example": {"status": "success", "results": [{"sr_no": 1, "rashi_name": "Aries", "result": "Lucky", "result_date": "2025-12-06"}], "total": 1, "limit": 50, "offset": 0}}}},
+        200: {"content": {"application/json": {"example": {"status": "success", "results": [{"sr_no": 1, "rashi_name": "Aries", "result": "Lucky", "result_date": "2025-12-06"}], "total": 1, "limit": 50, "offset": 0, "next_cursor": None}}}},
         403: {"content": {"application/json": {"example": {"detail": "Admin privileges required"}}}},
     },
 )
 async def admin_get_rashi(
     target_date: Optional[date] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     query = db.query(Rashi)
     if target_date:
         query = query.filter(Rashi.result_date == target_date)
-    items = query.order_by(Rashi.result_date.desc()).limit(limit).offset(offset).all()
-    total = query.count()
+    items, next_cursor = paginate(query, [Rashi.result_date, Rashi.sr_no], [date, int], limit, offset, cursor)
+    total = await cached_total("rashi", str(target_date), query.count)
     return {
         "http_status": 200,
         "success": True,
@@ -294,7 +301,8 @@ async def admin_get_rashi(
             ],
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": None if cursor else offset,
+            "next_cursor": next_cursor
         }
     }
 
@@ -325,15 +333,16 @@ async def admin_add_rashi(
 @router.get(
     "/starline",
     responses={
-        200: {"content": {"application/json": {"example": {"status": "success", "results": [{"sr_no": 1, "market_id": 1, "number": "12", "result_date": "2025-12-06"}], "total": 1, "limit": 50, "offset": 0}}}},
+        200: {"content": {"application/json": {"example": {"status": "success", "results": [{"sr_no": 1, "market_id": 1, "number": "12", "result_date": "2025-12-06"}], "total": 1, "limit": 50, "offset": 0, "next_cursor": None}}}},
         403: {"content": {"application/json": {"example": {"detail": "Admin privileges required"}}}},
     },
 )
 async def admin_get_starline(
     market_id: Optional[int] = None,
     target_date: Optional[date] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
@@ -342,8 +351,8 @@ async def admin_get_starline(
         query = query.filter(StarLine.market_id == market_id)
     if target_date:
         query = query.filter(StarLine.result_date == target_date)
-    items = query.order_by(StarLine.result_date.desc()).limit(limit).offset(offset).all()
-    total = query.count()
+    items, next_cursor = paginate(query, [StarLine.result_date, StarLine.sr_no], [date, int], limit, offset, cursor)
+    total = await cached_total("starline", f"{market_id}:{target_date}", query.count)
     return {
         "http_status": 200,
         "success": True,
@@ -360,7 +369,8 @@ async def admin_get_starline(
         ],
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": None if cursor else offset,
+            "next_cursor": next_cursor
         }
     }
 
@@ -411,22 +421,24 @@ async def admin_sync_results(
 @router.get(
     "/logs",
     responses={
-        200: {"content": {"application/json": {"example": {"status": "success", "logs": [{"sr_no": 1, "user_id": 1, "action": "update", "entity_type": "result", "entity_id": 10, "timestamp": "2025-12-06T12:00:00Z"}], "total": 1, "limit": 50, "offset": 0}}}},
+        200: {"content": {"application/json": {"example": {"status": "success", "logs": [{"sr_no": 1, "user_id": 1, "action": "update", "entity_type": "result", "entity_id": 10, "timestamp": "2025-12-06T12:00:00Z"}], "total": 1, "limit": 50, "offset": 0, "next_cursor": None}}}},
         403: {"content": {"application/json": {"example": {"detail": "Admin privileges required"}}}},
     },
 )
 async def admin_get_logs(
     user_id: Optional[int] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
     query = db.query(AuditLog)
     if user_id:
         query = query.filter(AuditLog.user_id == user_id)
-    logs = query.order_by(AuditLog.timestamp.desc()).limit(limit).offset(offset).all()
-    total = query.count()
+    logs, next_cursor = paginate(query, [AuditLog.timestamp, AuditLog.sr_no], [datetime, int], limit, offset, cursor)
+    # Audit rows are written outside the API, so this total is TTL-bounded only
+    total = await cached_total("logs", str(user_id), query.count)
     return {
         "http_status": 200,
         "success": True,
@@ -445,6 +457,21 @@ async def admin_get_logs(
             ],
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": None if cursor else offset,
+            "next_cursor": next_cursor
         }
     }
+
+@router.get(
+    "/profiles/{profile_id}",
+    responses={
+        200: {"content": {"application/json": {"example": {"$schema": "https://www.speedscope.app/file-format-schema.json", "profiles": []}}}},
+        404: {"content": {"application/json": {"example": {"detail": "Profile not found"}}}},
+    },
+)
+async def download_profile(profile_id: str, current_user: dict = Depends(get_current_admin)):
+    """Speedscope file of a request profiled with the X-Profile header"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=profile_id + PROFILE_SUFFIX)
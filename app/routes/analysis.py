@@ -1,10 +1,16 @@
+"""Analysis endpoints"""
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, datetime, timedelta
-from collections import Counter
-from app.core.database import get_db
-from app.models.result import Result
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.result_parser import format_jodi, format_panna
 from app.models.game import Game
+from app.services.analysis_service import (
+    frequency_aggregator, ensure_market_loaded, ranked, summarize_markets,
+)
 from app.schemas.analysis import (
     JodiFrequencyItem,
     JodiAnalysisResponse,
@@ -14,30 +20,30 @@ from app.schemas.analysis import (
 
 router = APIRouter()
 
+# Per-market routes read the in-memory history, so multi-year periods are cheap
+MAX_PERIOD_DAYS = settings.ANALYSIS_MAX_PERIOD_DAYS
+
+async def _require_market(db: AsyncSession, market_id: int) -> Game:
+    rows = await db.execute(select(Game).where(Game.sr_no == market_id))
+    market = rows.scalars().first()
+    if not market:
+        raise HTTPException(status_code=404, detail="Market not found")
+    return market
+
 @router.get("/jodi/{market_id}", response_model=JodiAnalysisResponse)
 async def jodi_frequency(
     market_id: int,
-    period_days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    period_days: int = Query(30, ge=1, le=MAX_PERIOD_DAYS),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    market = db.query(Game).filter(Game.sr_no == market_id).first()
-    if not market:
-        raise HTTPException(status_code=404, detail="Market not found")
+    await _require_market(db, market_id)
     start_date = datetime.now().date() - timedelta(days=period_days)
-    rows = db.query(Result).filter(
-        Result.market_id == market_id,
-        Result.result_date >= start_date,
-    ).all()
-    jodis = []
-    for r in rows:
-        parts = (r.result or "").split("-")
-        if len(parts) >= 2:
-            jodis.append(parts[1])
-    total = len(jodis)
-    counts = Counter(jodis)
+    await ensure_market_loaded(db, market_id, start_date)
+    counts = frequency_aggregator.jodi_counts(market_id, start_date)
+    total = sum(counts.values())
     items = [
-        JodiFrequencyItem(jodi=k, count=v, percentage=(v / total * 100 if total else 0.0))
-        for k, v in counts.most_common()
+        JodiFrequencyItem(jodi=format_jodi(k), count=v, percentage=(v / total * 100 if total else 0.0))
+        for k, v in ranked(counts)
     ]
     return JodiAnalysisResponse(
         market_id=market_id,
@@ -49,29 +55,17 @@ async def jodi_frequency(
 @router.get("/panel/{market_id}", response_model=PanelAnalysisResponse)
 async def panel_frequency(
     market_id: int,
-    period_days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    period_days: int = Query(30, ge=1, le=MAX_PERIOD_DAYS),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    market = db.query(Game).filter(Game.sr_no == market_id).first()
-    if not market:
-        raise HTTPException(status_code=404, detail="Market not found")
+    await _require_market(db, market_id)
     start_date = datetime.now().date() - timedelta(days=period_days)
-    rows = db.query(Result).filter(
-        Result.market_id == market_id,
-        Result.result_date >= start_date,
-    ).all()
-    panels = []
-    for r in rows:
-        parts = (r.result or "").split("-")
-        if len(parts) >= 1 and len(parts[0]) == 3:
-            panels.append(parts[0])
-        if len(parts) >= 3 and len(parts[2]) == 3:
-            panels.append(parts[2])
-    total = len(panels)
-    counts = Counter(panels)
+    await ensure_market_loaded(db, market_id, start_date)
+    counts = frequency_aggregator.panna_counts(market_id, start_date)
+    total = sum(counts.values())
     items = [
-        PanelFrequencyItem(panel=k, count=v, percentage=(v / total * 100 if total else 0.0))
-        for k, v in counts.most_common()
+        PanelFrequencyItem(panel=format_panna(k), count=v, percentage=(v / total * 100 if total else 0.0))
+        for k, v in ranked(counts)
     ]
     return PanelAnalysisResponse(
         market_id=market_id,
@@ -83,47 +77,78 @@ async def panel_frequency(
 @router.get("/trends/{market_id}")
 async def market_trends(
     market_id: int,
-    period_days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    period_days: int = Query(30, ge=1, le=MAX_PERIOD_DAYS),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    market = db.query(Game).filter(Game.sr_no == market_id).first()
-    if not market:
-        raise HTTPException(status_code=404, detail="Market not found")
+    await _require_market(db, market_id)
     start_date = datetime.now().date() - timedelta(days=period_days)
-    rows = db.query(Result).filter(
-        Result.market_id == market_id,
-        Result.result_date >= start_date,
-    ).all()
-    by_day = Counter([r.result_date for r in rows])
+    await ensure_market_loaded(db, market_id, start_date)
+    days = frequency_aggregator.day_counts(market_id, start_date)
     return {
         "status": "success",
         "market_id": market_id,
         "period_days": period_days,
         "days": [
             {"date": str(d), "count": c}
-            for d, c in sorted(by_day.items())
+            for d, c in days
         ],
-        "total": len(rows),
+        "total": sum(c for _, c in days),
+    }
+
+@router.get("/gaps/{market_id}")
+async def value_gaps(
+    market_id: int,
+    kind: str = Query("jodi", pattern="^(jodi|ank)$"),
+    period_days: int = Query(365, ge=1, le=MAX_PERIOD_DAYS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Hits, gaps and streaks per jodi or ank, most overdue first"""
+    await _require_market(db, market_id)
+    start_date = datetime.now().date() - timedelta(days=period_days)
+    await ensure_market_loaded(db, market_id, start_date)
+    stats = frequency_aggregator.occurrences(market_id, start_date, kind=kind)
+    stats.sort(key=lambda s: (-s["current_gap"], s["value"]))
+    for s in stats:
+        s["value"] = format_jodi(s["value"]) if kind == "jodi" else str(s["value"])
+        s["last_seen"] = str(s["last_seen"]) if s["last_seen"] else None
+    return {
+        "status": "success",
+        "market_id": market_id,
+        "kind": kind,
+        "period_days": period_days,
+        "values": stats,
+        "count": len(stats),
     }
 
 @router.get("/comparison")
 async def compare_markets(
     period_days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     start_date = datetime.now().date() - timedelta(days=period_days)
-    markets = db.query(Game).filter(Game.status == 1).all()
-    out = []
-    for m in markets:
-        cnt = db.query(Result).filter(
-            Result.market_id == m.sr_no,
-            Result.result_date >= start_date,
-        ).count()
-        out.append({"market_id": m.sr_no, "market_name": m.game, "count": cnt})
-    out.sort(key=lambda x: x["count"], reverse=True)
+    summaries = await summarize_markets(db, start_date, counts_only=True)
     return {
         "status": "success",
         "period_days": period_days,
-        "markets": out,
+        "markets": [
+            {"market_id": m["market_id"], "market_name": m["market_name"], "count": m["count"]}
+            for m in summaries
+        ],
     }
 
+@router.get("/markets/summary")
+async def markets_summary(
+    market_ids: Optional[List[int]] = Query(None),
+    period_days: int = Query(30, ge=1, le=365),
+    top: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Counts, top jodis, hot/cold digits and last-seen dates for many markets at once"""
+    start_date = datetime.now().date() - timedelta(days=period_days)
+    summaries = await summarize_markets(db, start_date, market_ids, top)
+    return {
+        "status": "success",
+        "period_days": period_days,
+        "markets": summaries,
+        "count": len(summaries),
+    }
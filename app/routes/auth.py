@@ -1,16 +1,17 @@
 """Authentication routes"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import (
-    hash_password, verify_password, create_access_token,
+    verify_password, create_access_token,
     create_refresh_token, verify_token, get_current_user
 )
-from app.models.user import User
 from app.schemas.user import (
     UserRegisterRequest, UserLoginRequest, UserLoginResponse, UserResponse
 )
+from app.services.user_service import AsyncUserService
 from app.core.config import settings
 
 router = APIRouter()
@@ -37,11 +38,12 @@ router = APIRouter()
         500: {"content": {"application/json": {"example": {"detail": "Internal server error"}}}},
     },
 )
-async def login(request: UserLoginRequest, db: Session = Depends(get_db)):
+async def login(request: UserLoginRequest, db: AsyncSession = Depends(get_async_db)):
     """User login"""
-    user = db.query(User).filter(User.username == request.username).first()
+    user = await AsyncUserService.get_user_by_username(db, request.username)
     
-    if not user or not verify_password(request.password, user.password):
+    # bcrypt is CPU-bound; keep it off the event loop
+    if not user or not await asyncio.to_thread(verify_password, request.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -97,21 +99,14 @@ async def login(request: UserLoginRequest, db: Session = Depends(get_db)):
         500: {"content": {"application/json": {"example": {"detail": "Internal server error"}}}},
     },
 )
-async def admin_login(request: UserLoginRequest, db: Session = Depends(get_db)):
+async def admin_login(request: UserLoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Admin login"""
-    user = db.query(User).filter(User.username == request.username).first()
+    user = await AsyncUserService.get_user_by_username(db, request.username)
     
     if not user and request.username.lower() == "admin":
-        user = User(
-            username="admin",
-            mobile="0000000000",
-            email=None,
-            password=hash_password("admin"),
-            status=1,
+        user = await AsyncUserService.create_user(
+            db, "admin", "0000000000", None, "admin", status=1
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     
     if not user or user.username.lower() != "admin":
         raise HTTPException(
@@ -119,7 +114,7 @@ async def admin_login(request: UserLoginRequest, db: Session = Depends(get_db)):
             detail="Admin account required"
         )
     
-    if not verify_password(request.password, user.password):
+    if not await asyncio.to_thread(verify_password, request.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
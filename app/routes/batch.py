@@ -0,0 +1,167 @@
+"""Batch endpoint: many GET sub-requests in one round trip"""
+import asyncio
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
+from starlette.middleware.exceptions import ExceptionMiddleware
+from starlette.types import ASGIApp, Message
+
+from app.core.config import settings
+from app.core.database import (
+    SHARED_SESSION_SCOPE_KEY, AsyncSessionLocal, SharedAsyncSession, SharedSessionAbandoned,
+)
+from app.schemas.batch import BatchRequest
+from app.utils.encoding import EncodedJSONResponse, dumps, loads
+
+router = APIRouter()
+
+# Sub-requests that never finish (streams) or would recurse
+EXCLUDED_PREFIXES = ("/batch", "/results/stream", "/results/export")
+
+# Parent headers a sub-request must not inherit: bodies are embedded as JSON,
+# so no content-coding, and no validators that would turn them into 304s
+SKIPPED_HEADERS = {b"accept-encoding", b"if-none-match", b"if-modified-since", b"content-length", b"content-type"}
+
+# Sub-request response headers worth passing back to the client
+FORWARDED_HEADERS = ("etag", "last-modified", "cache-control", "age", "warning")
+
+
+# Sub-requests failed because another one timed out while holding the session
+ABANDONED_DETAIL = "Sub-request cancelled: the batch's database session was abandoned"
+
+
+async def _abandoned(request: Request, exc: SharedSessionAbandoned) -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": ABANDONED_DETAIL})
+
+
+def _check_path(path: str) -> None:
+    parts = urlsplit(path)
+    if parts.scheme or parts.netloc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Not an internal path: {path}")
+    if parts.path.startswith(EXCLUDED_PREFIXES):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Path not allowed in a batch: {parts.path}")
+
+
+def _sub_scope(parent: dict, path: str, db: SharedAsyncSession) -> dict:
+    parts = urlsplit(path)
+    return {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": parts.path,
+        "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(),
+        "headers": [(k, v) for k, v in parent["headers"] if k not in SKIPPED_HEADERS],
+        "app": parent.get("app"),
+        "state": dict(parent.get("state") or {}),
+        SHARED_SESSION_SCOPE_KEY: db,
+    }
+
+
+async def dispatch(handler: ASGIApp, scope: dict) -> Dict[str, Any]:
+    """Run one sub-request through the routes (not the middleware stack) and capture it"""
+    start: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await handler(scope, receive, send)
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in start.get("headers", [])}
+    body = b"".join(chunks)
+    if headers.get("content-type", "").startswith("application/json") and body:
+        content = loads(body)
+    else:
+        content = body.decode("utf-8", "replace")
+    return {
+        "status": start.get("status", 500),
+        "headers": {k: headers[k] for k in FORWARDED_HEADERS if k in headers},
+        "body": content,
+    }
+
+
+@router.post(
+    "",
+    responses={
+        200: {"content": {"application/json": {"example": {"http_status": 200, "success": True, "message": "Batch executed", "data": {"responses": [{"id": "detail", "path": "/markets/1", "status": 200, "headers": {"etag": "\"9c1f...\""}, "body": {"http_status": 200, "success": True, "message": "Market fetched", "data": {"sr_no": 1, "game": "Market A"}}}], "count": 1}}}}},
+        400: {"content": {"application/json": {"example": {"detail": "Path not allowed in a batch: /results/stream"}}}},
+    },
+)
+async def run_batch(request: Request, batch: BatchRequest):
+    """Run internal GET sub-requests concurrently and return every response
+
+    Sub-requests carry the caller's headers (so the same auth) and go
+    through the same cache; a path repeated in the batch runs once. Each
+    gets its own status, so one failure does not fail the batch.
+    
+    Routes that take ``get_async_db`` share one database session for the
+    batch. Cached views still load through a session of their own, since a
+    background refresh can outlive the batch, and routes on the sync
+    ``get_db`` keep a session each.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_REQUESTS} sub-requests per batch"
+        )
+    for sub in batch.requests:
+        _check_path(sub.path)
+
+    # The innermost layers of the app's own stack: its exception handlers, so
+    # sub-request errors look like top-level ones, and the exit stack that
+    # yield dependencies need
+    handler = ExceptionMiddleware(
+        AsyncExitStackMiddleware(request.app.router),
+        handlers={**request.app.exception_handlers, SharedSessionAbandoned: _abandoned},
+    )
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+    paths = list(dict.fromkeys(sub.path for sub in batch.requests))
+
+    async with AsyncSessionLocal() as session:
+        db = SharedAsyncSession(session)
+
+        async def run(path: str) -> Dict[str, Any]:
+            async with semaphore:
+                if db.abandoned:
+                    return {"status": 503, "headers": {}, "body": {"detail": ABANDONED_DETAIL}}
+                try:
+                    return await asyncio.wait_for(
+                        dispatch(handler, _sub_scope(request.scope, path, db)),
+                        timeout=settings.BATCH_TIMEOUT_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    return {"status": 504, "headers": {}, "body": {"detail": "Sub-request timed out"}}
+
+        try:
+            outcomes = dict(zip(paths, await asyncio.gather(*[run(p) for p in paths])))
+        finally:
+            if db.abandoned:
+                # Never hand a connection cut off mid-statement back to the pool
+                await session.invalidate()
+
+    responses = [{"id": sub.id, "path": sub.path, **outcomes[sub.path]} for sub in batch.requests]
+    return EncodedJSONResponse(dumps({
+        "http_status": 200,
+        "success": True,
+        "message": "Batch executed",
+        "data": {"responses": responses, "count": len(responses)}
+    }))
@@ -1,8 +1,14 @@
 """Health check endpoints"""
-from fastapi import APIRouter, Depends
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from datetime import datetime
+from app.core.config import settings
 from app.core.database import get_db, check_database_connection
+from app.services.cache_service import cache_service
+from app.core.metrics import CONTENT_TYPE, registry
 
 router = APIRouter()
 
@@ -35,6 +41,37 @@ async def db_health_check(db: Session = Depends(get_db)):
         }
     }
 
+@router.get("/health/cache")
+async def cache_health_check():
+    """Cache hit, load and request-coalescing counters for this worker"""
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "OK",
+        "data": {
+            "stats": dict(cache_service.stats),
+            "local_entries": len(cache_service.local),
+            "local_bytes": cache_service.local.size_bytes,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    }
+
+def _may_scrape(request: Request) -> bool:
+    allowed = {c.strip() for c in settings.METRICS_ALLOWED_CLIENTS.split(",") if c.strip()}
+    if request.client is not None and request.client.host in allowed:
+        return True
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return bool(settings.METRICS_TOKEN) and scheme.lower() == "bearer" and hmac.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    )
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of this worker's metrics (local scrapers only)"""
+    if not _may_scrape(request):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 @router.get("/")
 async def root():
     """Root endpoint"""
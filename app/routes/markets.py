@@ -1,12 +1,18 @@
 """Market/Game endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import get_current_admin
 from app.models.game import Game
 from app.schemas.game import GameCreateRequest
-from app.services.result_service import ResultService
-from app.services.game_service import GameService
+from app.services.result_service import AsyncResultService
+from app.services.game_service import GameService, AsyncGameService
+from app.services.cache_service import market_tag
+from app.services.response_builder import (
+    markets_key, market_key, market_results_key, build_markets, build_market, build_market_results,
+)
+from app.utils.http_cache import conditional_view
 
 router = APIRouter()
 
@@ -18,10 +24,12 @@ router = APIRouter()
         500: {"content": {"application/json": {"example": {"detail": "Internal server error"}}}},
     },
 )
-async def get_all_markets(db: Session = Depends(get_db)):
+async def get_all_markets(request: Request):
     """Get all active markets"""
-    items = GameService.get_all_games(db)
-    return {"http_status": 200, "success": True, "message": "Markets fetched", "data": items}
+    async def load(db: AsyncSession):
+        return build_markets(await AsyncGameService.get_all_games(db))
+    
+    return await conditional_view(request, markets_key(), ["markets"], load)
 
 @router.get(
     "/{market_id}",
@@ -31,15 +39,18 @@ async def get_all_markets(db: Session = Depends(get_db)):
         404: {"content": {"application/json": {"example": {"detail": "Market not found"}}}},
     },
 )
-async def get_market(market_id: int, db: Session = Depends(get_db)):
+async def get_market(request: Request, market_id: int):
     """Get market details"""
-    market = GameService.get_game_by_id(db, market_id)
-    if not market:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Market not found"
-        )
-    return {"http_status": 200, "success": True, "message": "Market fetched", "data": market}
+    async def load(db: AsyncSession):
+        market = await AsyncGameService.get_game_by_id(db, market_id)
+        if not market:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Market not found"
+            )
+        return build_market(market)
+    
+    return await conditional_view(request, market_key(market_id), [market_tag(market_id)], load)
 
 @router.get(
     "/{market_id}/results",
@@ -49,36 +60,24 @@ async def get_market(market_id: int, db: Session = Depends(get_db)):
     },
 )
 async def get_market_results(
+    request: Request,
     market_id: int,
-    limit: int = 30,
-    db: Session = Depends(get_db)
+    limit: int = 30
 ):
     """Get public market results (latest first)"""
-    market = GameService.get_game_by_id(db, market_id)
-    if not market:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Market not found"
-        )
-    results = ResultService.get_market_history(db, market_id, limit)
-    return {
-        "http_status": 200,
-        "success": True,
-        "message": "Results fetched",
-        "data": {
-            "market_id": market_id,
-            "market_name": market.game,
-            "results": [
-            {
-                "result": r.result,
-                "result_date": str(r.result_date),
-                "timestamp": r.date.isoformat()
-            }
-            for r in results
-            ],
-            "count": len(results)
-        }
-    }
+    async def load(db: AsyncSession):
+        market = await AsyncGameService.get_game_by_id(db, market_id)
+        if not market:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Market not found"
+            )
+        results = await AsyncResultService.get_market_history(db, market_id, limit)
+        return build_market_results(market, results)
+    
+    return await conditional_view(
+        request, market_results_key(market_id, limit), [market_tag(market_id)], load
+    )
 
 @router.post(
     "",
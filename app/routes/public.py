@@ -1,15 +1,45 @@
 """Public endpoints (no authentication required)"""
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, datetime
-from app.core.database import get_db
 from app.models.result import Result
 from app.models.game import Game
 from app.models.rashi import Rashi
 from app.models.offer import Offer
+from app.services.cache_service import date_tag, rashi_tag
+from app.core.config import settings
+from app.services.response_builder import (
+    public_markets_key, public_results_key, public_rashi_key, public_offers_key, public_home_key,
+    build_public_markets, build_public_results, build_public_rashi, build_public_offers,
+    build_public_home,
+)
+from app.utils.http_cache import conditional_view
 
 router = APIRouter()
 
+# Row loaders shared by the single views and the homepage snapshot
+
+async def _active_markets(db: AsyncSession):
+    rows = await db.execute(select(Game).where(Game.status == 1))
+    return rows.scalars().all()
+
+async def _results_on(db: AsyncSession, target_date: date):
+    rows = await db.execute(select(Result).where(Result.result_date == target_date))
+    return rows.scalars().all()
+
+async def _rashi_on(db: AsyncSession, target_date: date):
+    rows = await db.execute(select(Rashi).where(Rashi.result_date == target_date))
+    return rows.scalars().all()
+
+async def _offers_on(db: AsyncSession, today: date):
+    rows = await db.execute(select(Offer).where(
+        Offer.status == 1,
+        Offer.valid_from <= today,
+        Offer.valid_till >= today
+    ))
+    return rows.scalars().all()
+
 @router.get(
     "/markets",
     responses={
@@ -17,27 +47,12 @@ router = APIRouter()
         500: {"content": {"application/json": {"example": {"detail": "Internal server error"}}}},
     },
 )
-async def get_public_markets(db: Session = Depends(get_db)):
+async def get_public_markets(request: Request):
     """Get list of all markets (public)"""
-    markets = db.query(Game).filter(Game.status == 1).all()
+    async def load(db: AsyncSession):
+        return build_public_markets(await _active_markets(db))
     
-    return {
-        "http_status": 200,
-        "success": True,
-        "message": "Markets retrieved",
-        "data": {
-            "markets": [
-            {
-                "sr_no": m.sr_no,
-                "game": m.game,
-                "open_time": str(m.open_time) if m.open_time else None,
-                "close_time": str(m.close_time) if m.close_time else None,
-            }
-            for m in markets
-            ],
-            "count": len(markets)
-        }
-    }
+    return await conditional_view(request, public_markets_key(), ["markets"], load)
 
 @router.get(
     "/results",
@@ -48,33 +63,20 @@ async def get_public_markets(db: Session = Depends(get_db)):
     },
 )
 async def get_public_results(
-    target_date: date = Query(None),
-    db: Session = Depends(get_db)
+    request: Request,
+    target_date: date = Query(None)
 ):
     """Get public results"""
     if not target_date:
         from datetime import datetime
         target_date = datetime.now().date()
     
-    results = db.query(Result).filter(Result.result_date == target_date).all()
+    async def load(db: AsyncSession):
+        return build_public_results(await _results_on(db, target_date), target_date)
     
-    return {
-        "http_status": 200,
-        "success": True,
-        "message": "Results retrieved",
-        "data": {
-            "results": [
-            {
-                "market_id": r.market_id,
-                "result": r.result,
-                "result_date": str(r.result_date)
-            }
-            for r in results
-            ],
-            "count": len(results),
-            "date": str(target_date)
-        }
-    }
+    return await conditional_view(
+        request, public_results_key(target_date), [date_tag(target_date)], load
+    )
 
 @router.get(
     "/rashi",
@@ -84,33 +86,20 @@ async def get_public_results(
     },
 )
 async def get_rashi_results(
-    target_date: date = Query(None),
-    db: Session = Depends(get_db)
+    request: Request,
+    target_date: date = Query(None)
 ):
     """Get Rashi results"""
     if not target_date:
         from datetime import datetime
         target_date = datetime.now().date()
     
-    rashi_results = db.query(Rashi).filter(Rashi.result_date == target_date).all()
+    async def load(db: AsyncSession):
+        return build_public_rashi(await _rashi_on(db, target_date), target_date)
     
-    return {
-        "http_status": 200,
-        "success": True,
-        "message": "Rashi results retrieved",
-        "data": {
-            "results": [
-            {
-                "rashi_name": r.rashi_name,
-                "result": r.result,
-                "result_date": str(r.result_date)
-            }
-            for r in rashi_results
-            ],
-            "count": len(rashi_results),
-            "date": str(target_date)
-        }
-    }
+    return await conditional_view(
+        request, public_rashi_key(target_date), [rashi_tag(target_date)], load
+    )
 
 @router.get(
     "/offers",
@@ -119,28 +108,43 @@ async def get_rashi_results(
         500: {"content": {"application/json": {"example": {"detail": "Internal server error"}}}},
     },
 )
-async def get_public_offers(db: Session = Depends(get_db)):
+async def get_public_offers(request: Request):
     today = datetime.now().date()
-    offers = db.query(Offer).filter(
-        Offer.status == 1,
-        Offer.valid_from <= today,
-        Offer.valid_till >= today
-    ).all()
-    return {
-        "http_status": 200,
-        "success": True,
-        "message": "Offers retrieved",
-        "data": {
-            "offers": [
-            {
-                "sr_no": o.sr_no,
-                "title": o.title,
-                "description": o.description,
-                "valid_from": str(o.valid_from),
-                "valid_till": str(o.valid_till)
-            }
-            for o in offers
-            ],
-            "count": len(offers)
-        }
-    }
+    
+    async def load(db: AsyncSession):
+        return build_public_offers(await _offers_on(db, today))
+    
+    return await conditional_view(request, public_offers_key(today), ["offers"], load)
+
+@router.get(
+    "/home",
+    responses={
+        200: {"content": {"application/json": {"example": {"http_status": 200, "success": True, "message": "Home retrieved", "data": {"date": "2025-12-06", "markets": {"markets": [], "count": 0}, "results": {"results": [], "count": 0, "date": "2025-12-06"}, "rashi": {"results": [], "count": 0, "date": "2025-12-06"}, "offers": {"offers": [], "count": 0}}}}}},
+        500: {"content": {"application/json": {"example": {"detail": "Internal server error"}}}},
+    },
+)
+async def get_public_home(request: Request):
+    """Markets, today's results and rashi, and active offers in one document
+    
+    Rebuilt only when a market, today's results or rashi, or an offer is
+    written (its tags) or the date rolls over (its key); the ETag is the
+    snapshot's version token.
+    """
+    today = datetime.now().date()
+    
+    async def load(db: AsyncSession):
+        return build_public_home(
+            await _active_markets(db),
+            await _results_on(db, today),
+            await _rashi_on(db, today),
+            await _offers_on(db, today),
+            today,
+        )
+    
+    return await conditional_view(
+        request,
+        public_home_key(today),
+        ["markets", date_tag(today), rashi_tag(today), "offers"],
+        load,
+        ttl=settings.PUBLIC_HOME_TTL,
+    )
@@ -1,13 +1,36 @@
 """Result endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from app.core.database import get_db
+from typing import List, Optional
+from app.core.database import get_db, get_async_db
 from app.core.security import get_current_admin
 from app.models.result import Result
 from app.models.game import Game
 from app.schemas.result import ResultCreateRequest
-from app.services.result_service import ResultService
+from app.services.result_service import ResultService, AsyncResultService
+from app.services.cache_service import date_tag
+from app.services.response_builder import live_results_key, live_board_key, build_live_results, build_live_board
+from app.services.cache_tags import LIVE_BOARD_TAG
+from app.models.live_state import MarketLiveState
+from app.utils.http_cache import conditional_view
+from app.services.event_broker import event_broker, result_event
+from app.services.export_service import (
+    EXPORT_FORMATS, encode_batches, export_filename, export_query, parse_columns, stream_rows,
+)
+
+# Comment line sent to idle SSE connections so proxies keep them open
+STREAM_HEARTBEAT_SECONDS = 15
+
+# Upper bound on rows accepted by POST /results/bulk
+BULK_MAX_ROWS = 5000
 
 router = APIRouter()
 
@@ -51,42 +74,108 @@ async def get_results_by_date(
     },
 )
 async def get_live_results(
-    target_date: date = Query(None),
-    db: Session = Depends(get_db)
+    request: Request,
+    target_date: date = Query(None)
 ):
     """Get live results for all markets"""
     if not target_date:
         from datetime import datetime
         target_date = datetime.now().date()
     
-    results = ResultService.get_live_results(db, target_date)
+    async def load(db: AsyncSession):
+        results = await AsyncResultService.get_live_results(db, target_date)
+        return build_live_results(results, target_date)
     
-    if not results:
-        return {
-            "http_status": 200,
-            "success": True,
-            "message": "Live results fetched",
-            "data": {"message": [], "count": 0, "date": str(target_date)}
-        }
+    return await conditional_view(
+        request, live_results_key(target_date), [date_tag(target_date)], load
+    )
+
+@router.get(
+    "/board",
+    responses={
+        200: {"content": {"application/json": {"example": {"http_status": 200, "success": True, "message": "Live board fetched", "data": {"markets": [{"market_id": 1, "market_name": "Market A", "open_time": "09:00:00", "close_time": "21:00:00", "result": "123-6", "result_date": "2025-12-06", "open_declared": True, "close_declared": False, "pending": True, "version": 14}], "count": 1, "date": "2025-12-06"}}}}},
+    },
+)
+async def get_live_board(request: Request):
+    """Every active market with its latest result and declaration status"""
+    from datetime import datetime
+    today = datetime.now().date()
     
-    return {
-        "http_status": 200,
-        "success": True,
-        "message": "Live results fetched",
-        "data": {
-            "message": [
-            {
-                "market_id": r.market_id,
-                "result": r.result,
-                "result_date": str(r.result_date),
-                "timestamp": r.date.isoformat()
-            }
-            for r in results
-            ],
-            "count": len(results),
-            "date": str(target_date)
-        }
-    }
+    async def load(db: AsyncSession):
+        # Primary key walk over the market_live_state projection, no join
+        rows = await db.execute(
+            select(MarketLiveState)
+            .where(MarketLiveState.market_status == 1)
+            .order_by(MarketLiveState.market_id)
+        )
+        return build_live_board(rows.scalars().all(), today)
+    
+    return await conditional_view(request, live_board_key(today), [LIVE_BOARD_TAG], load)
+
+@router.get(
+    "/stream",
+    responses={
+        200: {"content": {"text/event-stream": {"example": "event: created\ndata: {\"type\": \"created\", \"sr_no\": 1, \"market_id\": 1, \"result\": \"123-45-678\", \"result_date\": \"2025-12-06\"}\n\n"}}},
+    },
+)
+async def stream_results(request: Request, market_id: int = Query(None)):
+    """Server-Sent Events stream of result writes, optionally for one market"""
+    queue = event_broker.subscribe()
+    
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if market_id is not None and event.get("market_id") != market_id:
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_broker.unsubscribe(queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get(
+    "/export",
+    responses={
+        200: {"content": {"text/csv": {"example": "market_id,market_name,result_date,result\n1,Market A,2025-12-06,123-45-678\n"}}},
+        400: {"content": {"application/json": {"example": {"detail": "Unknown export columns: foo"}}}},
+        403: {"content": {"application/json": {"example": {"detail": "Admin privileges required"}}}},
+    },
+)
+async def export_results(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    market_id: Optional[List[int]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    columns: Optional[str] = Query(None, description="Comma separated, e.g. market_id,result_date,jodi"),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Stream full result history as CSV or NDJSON without buffering it"""
+    try:
+        selected = parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if start_date and end_date and end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date is before start_date")
+    
+    query = export_query(selected, market_id, start_date, end_date)
+    filename = export_filename(format, start_date, end_date)
+    return StreamingResponse(
+        encode_batches(format, selected, stream_rows(query)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.get(
     "/{market_id}/history",
@@ -146,39 +235,131 @@ async def get_market_history(
 async def create_result(
     request: ResultCreateRequest,
     current_user: dict = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new result (admin only)"""
     # Verify market exists
-    market = db.query(Game).filter(Game.sr_no == request.market_id).first()
-    if not market:
+    market = await db.scalar(select(Game.sr_no).where(Game.sr_no == request.market_id))
+    if market is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Market not found"
         )
     
     # Check if result already exists
-    existing = db.query(Result).filter(
+    existing = await db.scalar(select(Result.sr_no).where(
         Result.market_id == request.market_id,
         Result.result_date == request.result_date
-    ).first()
+    ))
     
-    if existing:
+    if existing is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Result already exists for this date"
         )
     
-    # Create result
-    result = ResultService.create_result(
-        db,
-        request.market_id,
-        request.result,
-        request.result_date
-    )
+    # Create result; the unique constraint still guards concurrent inserts
+    try:
+        result = await AsyncResultService.create_result(
+            db,
+            request.market_id,
+            request.result,
+            request.result_date
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Result already exists for this date"
+        )
     
     return {"http_status": 201, "success": True, "message": "Result created", "data": {"result_id": result.sr_no}}
 
+@router.post(
+    "/bulk",
+    response_model=dict,
+    responses={
+        200: {"content": {"application/json": {"example": {"http_status": 200, "success": True, "message": "Bulk results processed", "data": {"created": 1, "updated": 1, "failed": 1, "results": [{"index": 0, "market_id": 1, "result_date": "2025-12-06", "status": "created"}, {"index": 1, "market_id": 2, "result_date": "2025-12-06", "status": "updated"}, {"index": 2, "market_id": 99, "result_date": "2025-12-06", "status": "market_not_found"}]}}}}},
+        400: {"content": {"application/json": {"example": {"detail": "Expected a JSON array or NDJSON body"}}}},
+        403: {"content": {"application/json": {"example": {"detail": "Admin privileges required"}}}},
+        413: {"content": {"application/json": {"example": {"detail": "Too many rows"}}}},
+    },
+)
+async def bulk_create_results(
+    request: Request,
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create or overwrite many results in one batch (admin only)
+    
+    Body is a JSON array of ResultCreateRequest objects, or one object per
+    line with Content-Type application/x-ndjson. Existing results for the
+    same market and date are overwritten.
+    """
+    raw = await request.body()
+    outcomes = []
+    items = []
+    if "ndjson" in request.headers.get("content-type", ""):
+        for line in raw.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+    else:
+        try:
+            items = json.loads(raw or b"null")
+        except ValueError:
+            items = None
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array or NDJSON body"
+            )
+    if len(items) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many rows (max {BULK_MAX_ROWS})"
+        )
+    
+    rows = []
+    positions = []
+    for i, item in enumerate(items):
+        try:
+            parsed = ResultCreateRequest.model_validate(item)
+        except PydanticValidationError as e:
+            outcomes.append({"index": i, "status": "invalid", "error": e.errors()[0]["msg"]})
+            continue
+        outcomes.append({
+            "index": i,
+            "market_id": parsed.market_id,
+            "result_date": str(parsed.result_date),
+        })
+        rows.append(parsed.model_dump())
+        positions.append(i)
+    
+    if rows:
+        statuses = await AsyncResultService.bulk_upsert(db, rows)
+        for i, row_status in zip(positions, statuses):
+            outcomes[i]["status"] = row_status
+    
+    counts = {"created": 0, "updated": 0}
+    for o in outcomes:
+        if o["status"] in counts:
+            counts[o["status"]] += 1
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Bulk results processed",
+        "data": {
+            "created": counts["created"],
+            "updated": counts["updated"],
+            "failed": len(outcomes) - counts["created"] - counts["updated"],
+            "results": outcomes
+        }
+    }
+
 @router.put(
     "/{result_id}",
     response_model=dict,
@@ -204,6 +385,7 @@ async def update_result(
     
     result.result = request.result
     db.commit()
+    event_broker.publish(result_event("updated", result))
     
     return {"http_status": 200, "success": True, "message": "Result updated", "data": {}}
 
@@ -231,5 +413,6 @@ async def delete_result(
     
     db.delete(result)
     db.commit()
+    event_broker.publish(result_event("deleted", result))
     
     return {"http_status": 200, "success": True, "message": "Result deleted", "data": {}}
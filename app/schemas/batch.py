@@ -0,0 +1,10 @@
+"""Batch request schemas"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = Field(None, max_length=64)
+    path: str = Field(..., min_length=1, max_length=2048, pattern="^/")
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
@@ -1,6 +1,13 @@
 """Services package"""
-from app.services.user_service import UserService
-from app.services.game_service import GameService
-from app.services.result_service import ResultService
+from app.services.user_service import UserService, AsyncUserService
+from app.services.game_service import GameService, AsyncGameService
+from app.services.result_service import ResultService, AsyncResultService
 
-__all__ = ["UserService", "GameService", "ResultService"]
+__all__ = [
+    "UserService",
+    "GameService",
+    "ResultService",
+    "AsyncUserService",
+    "AsyncGameService",
+    "AsyncResultService",
+]
@@ -0,0 +1,477 @@
+"""Array-backed per-market result history and the statistics computed on it
+
+Each loaded market holds one NumPy column per digest field, indexed by day
+ordinal relative to the market's load horizon, so a window of any length is
+a slice and frequency, gap and streak statistics are vectorised. Session
+events apply committed result writes to the loaded markets; importing this
+module registers them.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, event, func, inspect, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.result_parser import format_jodi, parse_result
+from app.models.game import Game
+from app.models.result import Result
+from app.services.cache_service import market_from_tag
+from app.services.invalidation_bus import invalidation_bus
+
+# Loads retried when a write races them; the last attempt is kept regardless
+LOAD_ATTEMPTS = 3
+
+# A first load reaches back this far so every period up to a year is served
+LOAD_HORIZON_DAYS = 366
+
+# Marks a digest field that is not declared for the day
+MISSING = -1
+
+# Value range of each kind of occurrence statistic
+OCCURRENCE_KINDS = {"jodi": 100, "ank": 10}
+
+
+class DayDigest(NamedTuple):
+    """Everything one day's result contributes to the frequency tables"""
+    jodi: Optional[int]
+    open_panna: Optional[int]
+    close_panna: Optional[int]
+    open_ank: Optional[int]
+    close_ank: Optional[int]
+
+    @classmethod
+    def from_result(cls, raw: Optional[str]) -> "DayDigest":
+        parsed = parse_result(raw)
+        return cls(parsed.jodi, parsed.open_panna, parsed.close_panna, parsed.open_ank, parsed.close_ank)
+
+
+class _MarketHistory:
+    """One market's digests as int16 columns indexed by ``day ordinal - base``"""
+
+    def __init__(self, horizon: date):
+        self.horizon = horizon
+        self.base = horizon.toordinal()
+        self.loaded_at = time.monotonic()
+        self.present = np.zeros(0, dtype=bool)
+        self.columns = {name: np.zeros(0, dtype=np.int16) for name in DayDigest._fields}
+
+    def _reserve(self, size: int) -> None:
+        have = len(self.present)
+        if size <= have:
+            return
+        grow = max(size, 2 * have, 64) - have
+        self.present = np.concatenate([self.present, np.zeros(grow, dtype=bool)])
+        for name, column in self.columns.items():
+            self.columns[name] = np.concatenate([column, np.full(grow, MISSING, dtype=np.int16)])
+
+    def load(self, rows: Iterable[Tuple[date, DayDigest]]) -> None:
+        rows = [(day.toordinal() - self.base, digest) for day, digest in rows if day >= self.horizon]
+        if not rows:
+            return
+        index = np.fromiter((i for i, _ in rows), dtype=np.int64, count=len(rows))
+        self._reserve(int(index.max()) + 1)
+        self.present[index] = True
+        for pos, name in enumerate(DayDigest._fields):
+            self.columns[name][index] = [MISSING if d[pos] is None else d[pos] for _, d in rows]
+
+    def put(self, day: date, digest: Optional[DayDigest]) -> None:
+        i = day.toordinal() - self.base
+        if i < 0:
+            return
+        if digest is None:
+            if i < len(self.present):
+                self.present[i] = False
+                for column in self.columns.values():
+                    column[i] = MISSING
+            return
+        self._reserve(i + 1)
+        self.present[i] = True
+        for name, value in zip(DayDigest._fields, digest):
+            self.columns[name][i] = MISSING if value is None else value
+
+    def window(self, start: date, end: Optional[date], names: Iterable[str]) -> Tuple[np.ndarray, ...]:
+        """Day indexes of declared days in ``[start, end)`` followed by copies of the named columns"""
+        size = len(self.present)
+        lo = min(max(start.toordinal() - self.base, 0), size)
+        hi = size if end is None else min(max(end.toordinal() - self.base, lo), size)
+        days = lo + np.flatnonzero(self.present[lo:hi])
+        return (days,) + tuple(self.columns[name][days] for name in names)
+
+
+def _counter(*columns: np.ndarray) -> Counter:
+    values = np.concatenate(columns) if len(columns) > 1 else columns[0]
+    values = values[values != MISSING]
+    if not len(values):
+        return Counter()
+    bins = np.bincount(values)
+    seen = np.flatnonzero(bins)
+    return Counter(dict(zip(seen.tolist(), bins[seen].tolist())))
+
+
+def occurrence_stats(keys: np.ndarray, draws: np.ndarray, total: int, size: int) -> Dict[str, np.ndarray]:
+    """Per-value hit, gap and streak statistics over ``total`` draws
+
+    ``keys[j]`` was drawn at draw position ``draws[j]``; a value drawn twice
+    in one draw (e.g. both anks) counts once. Gaps are in draws: the current
+    gap is the number of draws since the value last came, the max gap also
+    counts the run before its first appearance in the window.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    draws = np.asarray(draws, dtype=np.int64)
+    order = np.lexsort((draws, keys))
+    keys, draws = keys[order], draws[order]
+    if len(keys):
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = (keys[1:] != keys[:-1]) | (draws[1:] != draws[:-1])
+        keys, draws = keys[distinct], draws[distinct]
+
+    hits = np.bincount(keys, minlength=size)
+    last = np.full(size, -1, dtype=np.int64)
+    np.maximum.at(last, keys, draws)
+    first = np.full(size, total, dtype=np.int64)
+    np.minimum.at(first, keys, draws)
+
+    new_key = np.ones(len(keys), dtype=bool)
+    new_key[1:] = keys[1:] != keys[:-1]
+    step = np.diff(draws, prepend=-1)
+    current_gap = np.where(last >= 0, total - 1 - last, total)
+    max_gap = np.maximum(first, current_gap)
+    np.maximum.at(max_gap, keys[~new_key], step[~new_key] - 1)
+
+    run_start = new_key | (step != 1)
+    run_length = np.bincount(np.cumsum(run_start) - 1) if len(keys) else np.zeros(0, dtype=np.int64)
+    run_key = keys[run_start]
+    run_last = draws[np.flatnonzero(np.append(run_start[1:], True))] if len(keys) else draws
+    longest_streak = np.zeros(size, dtype=np.int64)
+    np.maximum.at(longest_streak, run_key, run_length)
+    current_streak = np.zeros(size, dtype=np.int64)
+    live = run_last == total - 1
+    current_streak[run_key[live]] = run_length[live]
+
+    return {
+        "hits": hits,
+        "last": last,
+        "current_gap": current_gap,
+        "max_gap": max_gap,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+    }
+
+
+class FrequencyAggregator:
+    """Per-market result history held as arrays and summarised on demand
+
+    Markets are loaded lazily from the parsed result columns and then kept
+    current by ``apply``, which the Session hooks below call for every
+    committed result write on this worker.
+    Writes on other workers drop the market through the invalidation bus;
+    ``max_age`` remains as a backstop for missed messages.
+    """
+
+    def __init__(self, max_age: float = 300):
+        self.max_age = max_age
+        self._markets: Dict[int, _MarketHistory] = {}
+        self._generation: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def covers(self, market_id: int, start: date) -> bool:
+        with self._lock:
+            market = self._markets.get(market_id)
+            if market is None:
+                return False
+            if time.monotonic() - market.loaded_at > self.max_age:
+                del self._markets[market_id]
+                return False
+            return market.horizon <= start
+
+    def begin_load(self, market_id: int) -> int:
+        with self._lock:
+            return self._generation.get(market_id, 0)
+
+    def finish_load(self, market_id: int, token: int, horizon: date, rows: Iterable[tuple], force: bool = False) -> bool:
+        """Install loaded ``(result_date, DayDigest)`` rows unless a write raced the load"""
+        market = _MarketHistory(horizon)
+        market.load(rows)
+        with self._lock:
+            if self._generation.get(market_id, 0) != token and not force:
+                return False
+            self._markets[market_id] = market
+            return True
+
+    def apply(self, market_id: int, result_date: date, result: Optional[str]) -> None:
+        """Record the current result for a market and day (None when deleted)"""
+        digest = DayDigest.from_result(result) if result is not None else None
+        with self._lock:
+            self._generation[market_id] = self._generation.get(market_id, 0) + 1
+            market = self._markets.get(market_id)
+            if market is not None:
+                market.put(result_date, digest)
+
+    def drop(self, market_id: Optional[int] = None) -> None:
+        with self._lock:
+            if market_id is None:
+                self._markets.clear()
+            else:
+                self._markets.pop(market_id, None)
+
+    def _window(self, market_id: int, start: date, end: Optional[date], *names: str) -> Tuple[Optional[int], Tuple[np.ndarray, ...]]:
+        with self._lock:
+            market = self._markets.get(market_id)
+            if market is None:
+                empty = np.zeros(0, dtype=np.int16)
+                return None, (np.zeros(0, dtype=np.int64),) + (empty,) * len(names)
+            return market.base, market.window(start, end, names)
+
+    def jodi_counts(self, market_id: int, start: date, end: Optional[date] = None) -> Counter:
+        _, (_, jodi) = self._window(market_id, start, end, "jodi")
+        return _counter(jodi)
+
+    def panna_counts(self, market_id: int, start: date, end: Optional[date] = None) -> Counter:
+        _, (_, open_panna, close_panna) = self._window(market_id, start, end, "open_panna", "close_panna")
+        return _counter(open_panna, close_panna)
+
+    def ank_counts(self, market_id: int, start: date, end: Optional[date] = None) -> Counter:
+        _, (_, open_ank, close_ank) = self._window(market_id, start, end, "open_ank", "close_ank")
+        return _counter(open_ank, close_ank)
+
+    def day_counts(self, market_id: int, start: date, end: Optional[date] = None) -> List[tuple]:
+        base, (days,) = self._window(market_id, start, end)
+        return [(date.fromordinal(base + d), 1) for d in days.tolist()]
+
+    def occurrences(self, market_id: int, start: date, end: Optional[date] = None, kind: str = "jodi") -> List[dict]:
+        """Hits, last seen date, gaps and streaks for every jodi or ank value"""
+        size = OCCURRENCE_KINDS[kind]
+        if kind == "jodi":
+            base, (days, jodi) = self._window(market_id, start, end, "jodi")
+            draws = np.flatnonzero(jodi != MISSING)
+            keys = jodi[draws]
+        else:
+            base, (days, open_ank, close_ank) = self._window(market_id, start, end, "open_ank", "close_ank")
+            positions = np.arange(len(days))
+            keys = np.concatenate([open_ank, close_ank])
+            draws = np.concatenate([positions, positions])
+            declared = keys != MISSING
+            keys, draws = keys[declared], draws[declared]
+        stats = occurrence_stats(keys, draws, len(days), size)
+        last_days = days[np.maximum(stats["last"], 0)] if len(days) else stats["last"]
+        out = []
+        for value in range(size):
+            seen = stats["last"][value] >= 0
+            out.append({
+                "value": value,
+                "hits": int(stats["hits"][value]),
+                "last_seen": date.fromordinal(base + int(last_days[value])) if seen else None,
+                "current_gap": int(stats["current_gap"][value]),
+                "max_gap": int(stats["max_gap"][value]),
+                "current_streak": int(stats["current_streak"][value]),
+                "longest_streak": int(stats["longest_streak"][value]),
+            })
+        return out
+
+
+def ranked(counts: Counter) -> List[tuple]:
+    """Most common first; ties broken by value so output is stable"""
+    return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+async def ensure_market_loaded(db: AsyncSession, market_id: int, start: date) -> None:
+    """Load a market's digests back to ``start`` unless already held"""
+    if frequency_aggregator.covers(market_id, start):
+        return
+    start = min(start, date.today() - timedelta(days=LOAD_HORIZON_DAYS))
+    for attempt in range(LOAD_ATTEMPTS):
+        token = frequency_aggregator.begin_load(market_id)
+        rows = (await db.execute(
+            select(
+                Result.result_date, Result.jodi, Result.open_panna,
+                Result.close_panna, Result.open_ank, Result.close_ank,
+            ).where(
+                Result.market_id == market_id,
+                Result.result_date >= start,
+            )
+        )).all()
+        digests = [(r[0], DayDigest(*r[1:])) for r in rows]
+        last = attempt == LOAD_ATTEMPTS - 1
+        if frequency_aggregator.finish_load(market_id, token, start, digests, force=last):
+            return
+        if frequency_aggregator.covers(market_id, start):
+            return
+
+
+frequency_aggregator = FrequencyAggregator(max_age=settings.ANALYSIS_AGGREGATE_TTL)
+
+# session.info keys: (market_id, result_date) -> result (None when removed),
+# and markets to reload, from the current transaction
+PENDING_RESULTS = "analysis_results"
+PENDING_DROPS = "analysis_drops"
+
+
+def record_results_on_commit(session: Session, changes: Dict[Tuple[int, date], Optional[str]]) -> None:
+    """Queue result writes the ORM does not see, such as Core INSERT statements"""
+    session.info.setdefault(PENDING_RESULTS, {}).update(changes)
+
+
+def _keep_previous(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+# Load the old market and day when they change, even on an expired instance,
+# so moving a result can clear where it was
+for _attribute in (Result.market_id, Result.result_date):
+    event.listen(_attribute, "set", _keep_previous, active_history=True)
+
+
+def _previous(obj, name: str):
+    history = inspect(obj).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(obj, name)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_results(session: Session, flush_context) -> None:
+    changes = {}
+    drops = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Result):
+            # Moving a result to another market or day clears where it was
+            changes[(_previous(obj, "market_id"), _previous(obj, "result_date"))] = None
+            if obj not in session.deleted:
+                changes[(obj.market_id, obj.result_date)] = obj.result
+        elif isinstance(obj, Game) and obj in session.deleted:
+            # Its results go with it in the database, out of the ORM's sight
+            drops.add(obj.sr_no)
+    if changes:
+        record_results_on_commit(session, changes)
+    if drops:
+        session.info.setdefault(PENDING_DROPS, set()).update(drops)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    changes = session.info.pop(PENDING_RESULTS, None) or {}
+    for (market_id, result_date), result in changes.items():
+        frequency_aggregator.apply(market_id, result_date, result)
+    for market_id in session.info.pop(PENDING_DROPS, None) or ():
+        frequency_aggregator.drop(market_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_results(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_RESULTS, None)
+        session.info.pop(PENDING_DROPS, None)
+
+
+def _drop_invalidated_markets(tags: tuple, versions: dict) -> None:
+    """A peer wrote results for these markets; reload them on next use"""
+    for tag in tags:
+        market_id = market_from_tag(tag)
+        if market_id is not None:
+            frequency_aggregator.drop(market_id)
+
+
+invalidation_bus.subscribe(_drop_invalidated_markets)
+
+
+def build_market_summaries(
+    markets: Iterable[tuple],
+    totals: Iterable[tuple],
+    jodis: Iterable[tuple] = (),
+    digits: Iterable[tuple] = (),
+    top_n: int = 5,
+) -> List[dict]:
+    """Per-market statistics from grouped rows
+
+    ``markets`` is ``(market_id, name)``, ``totals`` is ``(market_id, count,
+    last date)``, ``jodis`` is ``(market_id, jodi, count)`` and ``digits`` is
+    ``(market_id, ank, count, last date)``. Markets without results in the
+    window report a zero count.
+    """
+    names = dict(markets)
+    counts = {m: (n, last) for m, n, last in totals}
+    jodi_counts: Dict[int, Counter] = {}
+    for market_id, jodi, n in jodis:
+        jodi_counts.setdefault(market_id, Counter())[jodi] = n
+    digit_counts: Dict[int, Counter] = {}
+    digit_seen: Dict[int, dict] = {}
+    for market_id, ank, n, last in digits:
+        digit_counts.setdefault(market_id, Counter())[ank] += n
+        seen = digit_seen.setdefault(market_id, {})
+        if ank not in seen or last > seen[ank]:
+            seen[ank] = last
+
+    out = []
+    for market_id, name in names.items():
+        count, last = counts.get(market_id, (0, None))
+        per_digit = Counter({d: 0 for d in range(10)})
+        per_digit.update(digit_counts.get(market_id, Counter()))
+        ranked_digits = ranked(per_digit)
+        seen = digit_seen.get(market_id, {})
+        out.append({
+            "market_id": market_id,
+            "market_name": name,
+            "count": count,
+            "last_result_date": str(last) if last else None,
+            "top_jodis": [
+                {"jodi": format_jodi(k), "count": v}
+                for k, v in ranked(jodi_counts.get(market_id, Counter()))[:top_n]
+            ],
+            "hot_digits": [{"digit": k, "count": v} for k, v in ranked_digits[:3]],
+            "cold_digits": [{"digit": k, "count": v} for k, v in reversed(ranked_digits[-3:])],
+            "digit_last_seen": {str(d): (str(seen[d]) if d in seen else None) for d in range(10)},
+        })
+    out.sort(key=lambda x: (-x["count"], x["market_id"]))
+    return out
+
+
+def summary_queries(start: date, market_ids: Optional[List[int]] = None) -> Tuple:
+    """Grouped statements behind ``summarize_markets``: markets, totals, jodis, digits
+
+    Every statement groups by market, so the rows returned are bounded by
+    markets x values, not by the number of results in the window.
+    """
+    markets = select(Game.sr_no, Game.game).where(Game.status == 1)
+    if market_ids:
+        markets = markets.where(Game.sr_no.in_(market_ids))
+    window = and_(Result.result_date >= start, Result.market_id.in_(markets.with_only_columns(Game.sr_no)))
+
+    totals = (
+        select(Result.market_id, func.count(), func.max(Result.result_date))
+        .where(window)
+        .group_by(Result.market_id)
+    )
+    jodis = (
+        select(Result.market_id, Result.jodi, func.count())
+        .where(window, Result.jodi.isnot(None))
+        .group_by(Result.market_id, Result.jodi)
+    )
+    anks = union_all(*(
+        select(Result.market_id, column.label("ank"), Result.result_date)
+        .where(window, column.isnot(None))
+        for column in (Result.open_ank, Result.close_ank)
+    )).subquery()
+    digits = (
+        select(anks.c.market_id, anks.c.ank, func.count(), func.max(anks.c.result_date))
+        .group_by(anks.c.market_id, anks.c.ank)
+    )
+    return markets, totals, jodis, digits
+
+
+async def summarize_markets(
+    db: AsyncSession,
+    start: date,
+    market_ids: Optional[List[int]] = None,
+    top_n: int = 5,
+    counts_only: bool = False,
+) -> List[dict]:
+    """Cross-market summary for active markets from a fixed number of grouped queries"""
+    markets, totals, jodis, digits = summary_queries(start, market_ids)
+    rows = [(await db.execute(markets)).all(), (await db.execute(totals)).all()]
+    if not counts_only:
+        rows += [(await db.execute(jodis)).all(), (await db.execute(digits)).all()]
+    return build_market_summaries(*rows, top_n=top_n)
@@ -0,0 +1,870 @@
+"""Two-tier response cache: in-process LRU backed by Redis"""
+import asyncio
+import hashlib
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+import redis
+
+from app.core.circuit import CircuitOpenError
+from app.core.config import settings
+from app.core.metrics import registry, stats_samples
+from app.services.invalidation_bus import InvalidationBus, invalidation_bus
+from app.utils import encoding
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+REDIS_RETRY_SECONDS = 10
+
+# Idle tag versions expire from Redis; a re-created token only costs a 200
+VERSION_TTL_SECONDS = 7 * 24 * 3600
+
+# Local version mirror is cleared rather than evicted past this many tags
+VERSION_LOCAL_MAX_TAGS = 4096
+
+# Cross-worker single-flight: how long a loader may hold a key's lock, and
+# how often the other workers look for its result meanwhile
+LOAD_LOCK_SECONDS = 5
+LOAD_POLL_SECONDS = 0.02
+
+# Compare-and-delete so a loader never releases a lock that expired and was retaken
+_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Handed to waiters when the loading request was cancelled; they retry
+_RETRY = object()
+
+
+def market_tag(market_id: int) -> str:
+    """Tag for every cached view of one market"""
+    return f"market:{market_id}"
+
+
+def market_from_tag(tag: str) -> Optional[int]:
+    """Market id named by a ``market_tag``, or None for other tags"""
+    if tag.startswith("market:"):
+        try:
+            return int(tag[len("market:"):])
+        except ValueError:
+            return None
+    return None
+
+
+def date_tag(target_date: date) -> str:
+    """Tag for every cached view of one result date"""
+    return f"date:{target_date.isoformat()}"
+
+
+def rashi_tag(target_date: date) -> str:
+    """Tag for every cached view of one rashi date"""
+    return f"rashi:{target_date.isoformat()}"
+
+
+def count_tag(table: str) -> str:
+    """Tag for the cached list totals of one table"""
+    return f"count:{table}"
+
+
+def new_tag_version(now: Optional[float] = None) -> str:
+    """Fresh, never reused version token: hex milliseconds plus a random suffix"""
+    millis = int((time.time() if now is None else now) * 1000)
+    return f"{millis:x}-{secrets.token_hex(4)}"
+
+
+def tag_version_time(token: str) -> float:
+    """Unix time at which a version token was issued"""
+    return int(token.split("-", 1)[0], 16) / 1000.0
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a payload for storage in either tier; the bytes are the response body"""
+    return encoding.dumps(value)
+
+
+def body_version(body: bytes) -> str:
+    """Content version of an encoded payload"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _pack(entry: "CacheEntry") -> bytes:
+    """Redis value layout: JSON header, newline, body"""
+    now = time.monotonic()
+    header = {
+        "tags": list(entry.tags),
+        "version": entry.version,
+        "stored_at": entry.stored_at,
+        "fresh_for": max(entry.expires_at - now, 0.0),
+        "stale_for": max(entry.stale_until - entry.expires_at, 0.0),
+    }
+    return json.dumps(header).encode() + b"\n" + entry.body
+
+
+def _unpack(raw: bytes, remaining: float) -> "CacheEntry":
+    """Rebuild an entry; ``remaining`` is the key's TTL, which ends its fallback window"""
+    head, _, body = raw.partition(b"\n")
+    header = json.loads(head)
+    now = time.monotonic()
+    stored_at = header.get("stored_at", time.time())
+    # Freshness is relative to when the writer stored it, not when we read it
+    fresh_left = header.get("fresh_for", remaining) - (time.time() - stored_at)
+    expires_at = now + min(fresh_left, remaining)
+    return CacheEntry(
+        body=body,
+        expires_at=expires_at,
+        tags=tuple(header["tags"]),
+        version=header["version"],
+        stale_until=min(expires_at + header.get("stale_for", 0.0), now + remaining),
+        discard_at=now + remaining,
+        stored_at=stored_at,
+    )
+
+
+@dataclass
+class CacheEntry:
+    """A cached body and its lifetime
+
+    Fresh until ``expires_at``; servable while revalidating until
+    ``stale_until``; kept as a last good copy for failures until
+    ``discard_at``. The latter two default to ``expires_at``. ``variants``
+    holds the compressed forms of ``body`` once the entry is stored locally.
+    ``invalidated`` marks a local copy expired by a tag invalidation.
+    """
+    body: bytes
+    expires_at: float
+    tags: tuple = ()
+    version: str = ""
+    value: Any = field(default=None, repr=False)
+    stale_until: float = 0.0
+    discard_at: float = 0.0
+    stored_at: float = field(default_factory=time.time)
+    variants: Dict[str, bytes] = field(default_factory=dict, repr=False)
+    compressed: bool = field(default=False, repr=False)
+    invalidated: bool = field(default=False, repr=False)
+
+    def __post_init__(self):
+        self.stale_until = max(self.stale_until, self.expires_at)
+        self.discard_at = max(self.discard_at, self.stale_until)
+
+    @property
+    def age(self) -> int:
+        return max(int(time.time() - self.stored_at), 0)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return self.expires_at > (time.monotonic() if now is None else now)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+    def decoded(self) -> Any:
+        if self.value is None:
+            self.value = encoding.loads(self.body)
+        return self.value
+
+    def precompress(self) -> None:
+        if not self.compressed:
+            self.variants = encoding.precompress(self.body)
+            self.compressed = True
+
+    def superseded_by(self, other: "CacheEntry") -> bool:
+        """Whether ``other`` (a copy from Redis) may replace this local copy
+
+        An invalidated copy is only replaced by a newer one: until the Redis
+        delete lands, Redis still holds the very copy that was invalidated.
+        """
+        if self.invalidated:
+            return other.stored_at > self.stored_at
+        return other.stored_at >= self.stored_at
+
+    def encoded(self, preferred: str) -> Tuple[bytes, str]:
+        """The body in ``preferred`` coding if a variant exists, else identity"""
+        packed = self.variants.get(preferred)
+        if packed is None:
+            return self.body, encoding.IDENTITY
+        return packed, preferred
+
+
+@dataclass
+class CacheResult:
+    """Outcome of ``CacheService.fetch``; ``state`` is FRESH, STALE or FALLBACK
+
+    ``entry`` is the stored entry behind ``value`` when there is one, so its
+    encoded bytes can be sent without serializing ``value`` again.
+    """
+    value: Any
+    state: str
+    age: int = 0
+    entry: Optional[CacheEntry] = None
+
+
+FRESH = "fresh"
+STALE = "stale"
+FALLBACK = "fallback"
+
+
+class LocalCache:
+    """Thread-safe LRU with per-entry TTL, bounded by entry count and bytes"""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tags: dict = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """The entry while fresh"""
+        entry = self.peek(key)
+        if entry is None or not entry.is_fresh():
+            return None
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """The entry in any state short of discarded (fresh, stale or last good)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.discard_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        # Compressed once here, so hits never compress; size is fixed from now on
+        entry.precompress()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Expire tagged entries; they stay only as last good copies for failures"""
+        invalidated = 0
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        continue
+                    if entry.discard_at <= now:
+                        self._remove(key)
+                    else:
+                        entry.expires_at = entry.stale_until = now
+                        entry.invalidated = True
+                    invalidated += 1
+        return invalidated
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class CacheService:
+    """Read-through cache; Redis is optional and failures degrade to local only"""
+
+    def __init__(
+        self,
+        local: Optional[LocalCache] = None,
+        redis_client: Optional[redis.Redis] = None,
+        prefix: str = "smboss",
+        default_ttl: int = 60,
+        version_ttl: float = 1.0,
+        stale_ttl: int = 0,
+        stale_if_error_ttl: int = 0,
+        bus: Optional[InvalidationBus] = None,
+    ):
+        self.local = local or LocalCache(1024, 16 * 1024 * 1024)
+        self.redis = redis_client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.version_ttl = version_ttl
+        self.stale_ttl = stale_ttl
+        self.stale_if_error_ttl = stale_if_error_ttl
+        self._refreshing: set = set()
+        self._background: set = set()
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(self.apply_invalidation)
+        self._versions: Dict[str, tuple] = {}
+        self._versions_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis_down_until = 0.0
+        # One thread, so Redis sees invalidations in the order they were made
+        self._invalidator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-invalidate")
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "coalesced_local": 0,
+            "coalesced_remote": 0,
+            "stale_served": 0,
+            "fallback_served": 0,
+            "refresh_failures": 0,
+            "discarded_loads": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "CacheService":
+        client = None
+        if settings.CACHE_REDIS_ENABLED:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                socket_connect_timeout=0.25,
+                socket_timeout=0.25,
+            )
+        return cls(
+            local=LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES, settings.CACHE_LOCAL_MAX_BYTES),
+            redis_client=client,
+            prefix=settings.CACHE_PREFIX,
+            default_ttl=settings.CACHE_DEFAULT_TTL,
+            version_ttl=settings.CACHE_VERSION_LOCAL_TTL,
+            stale_ttl=settings.CACHE_STALE_TTL,
+            stale_if_error_ttl=settings.CACHE_STALE_IF_ERROR_TTL,
+            bus=invalidation_bus,
+        )
+
+    # Redis helpers (blocking; async callers go through a worker thread)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:cache:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _version_key(self, tag: str) -> str:
+        return f"{self.prefix}:ver:{tag}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.prefix}:lock:{key}"
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, exc: Exception) -> None:
+        if time.monotonic() >= self._redis_down_until:
+            logger.warning(f"Redis cache tier unavailable: {exc}")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _redis_get(self, key: str) -> Optional[CacheEntry]:
+        if not self._redis_available():
+            return None
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(self._key(key))
+            pipe.pttl(self._key(key))
+            raw, pttl = pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return None
+        if raw is None or pttl is None or pttl <= 0:
+            return None
+        return _unpack(raw, pttl / 1000.0)
+
+    def _redis_set(self, key: str, entry: CacheEntry) -> None:
+        if not self._redis_available():
+            return
+        tags = entry.tags
+        # Redis keeps the entry through its last-good window, like the local tier
+        keep = max(int(entry.discard_at - time.monotonic() + 0.999), 1)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(self._key(key), _pack(entry), ex=keep)
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), max(keep, 3600))
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def _redis_invalidate(self, tags: tuple) -> None:
+        if not self._redis_available():
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(self._tag_key(tag))
+            members = pipe.execute()
+            pipe = self.redis.pipeline(transaction=False)
+            for tag, keys in zip(tags, members):
+                for key in keys:
+                    pipe.delete(self._key(key.decode() if isinstance(key, bytes) else key))
+                pipe.delete(self._tag_key(tag))
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def _redis_lock(self, key: str) -> Optional[str]:
+        """Take the load lock: a token when held by us, None when another worker
+        holds it, and "" when Redis cannot arbitrate (load without a lock)"""
+        if not self._redis_available():
+            return ""
+        token = secrets.token_hex(8)
+        try:
+            if self.redis.set(self._lock_key(key), token, nx=True, ex=LOAD_LOCK_SECONDS):
+                return token
+            return None
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return ""
+
+    def _redis_unlock(self, key: str, token: str) -> None:
+        if not self._redis_available():
+            return
+        try:
+            self.redis.eval(_UNLOCK_SCRIPT, 1, self._lock_key(key), token)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def _redis_locked(self, key: str) -> bool:
+        if not self._redis_available():
+            return False
+        try:
+            return bool(self.redis.exists(self._lock_key(key)))
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return False
+
+    def _redis_versions(self, tags: tuple) -> Optional[Dict[str, str]]:
+        if not self._redis_available():
+            return None
+        keys = [self._version_key(t) for t in tags]
+        try:
+            raw = self.redis.mget(keys)
+            missing = [i for i, v in enumerate(raw) if v is None]
+            if missing:
+                # First reader issues the token; concurrent readers agree via NX
+                pipe = self.redis.pipeline(transaction=False)
+                for i in missing:
+                    pipe.set(keys[i], new_tag_version(), nx=True, ex=VERSION_TTL_SECONDS)
+                pipe.mget([keys[i] for i in missing])
+                for i, value in zip(missing, pipe.execute()[-1]):
+                    raw[i] = value
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return None
+        return {t: (v.decode() if isinstance(v, bytes) else v) for t, v in zip(tags, raw)}
+
+    def _redis_bump(self, versions: Dict[str, str]) -> None:
+        if not self._redis_available():
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for tag, token in versions.items():
+                pipe.set(self._version_key(tag), token, ex=VERSION_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def _remember_versions(self, versions: Dict[str, str]) -> None:
+        now = time.monotonic()
+        with self._versions_lock:
+            if len(self._versions) > VERSION_LOCAL_MAX_TAGS:
+                self._versions.clear()
+            for tag, token in versions.items():
+                self._versions[tag] = (token, now)
+
+    # Public API
+
+    async def get(self, key: str) -> Any:
+        """Return the cached payload while fresh, or None"""
+        entry = self.local.get(key)
+        if entry is not None:
+            self.stats["local_hits"] += 1
+            return entry.decoded()
+        value = None
+        if self._redis_available():
+            value = await self._adopt_redis_entry(key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["redis_hits"] += 1
+        return value
+
+    def _new_entry(self, value: Any, ttl: int, tags: tuple) -> CacheEntry:
+        body = encode_value(value)
+        expires_at = time.monotonic() + ttl
+        return CacheEntry(
+            body=body,
+            expires_at=expires_at,
+            tags=tags,
+            version=body_version(body),
+            value=value,
+            stale_until=expires_at + self.stale_ttl,
+            discard_at=expires_at + max(self.stale_ttl, self.stale_if_error_ttl),
+        )
+
+    async def _set_local(self, key: str, entry: CacheEntry) -> None:
+        # gzip/brotli at the cached levels take milliseconds on large bodies,
+        # so they run on a worker thread instead of the event loop
+        if len(entry.body) >= settings.COMPRESS_MIN_BYTES:
+            await asyncio.to_thread(entry.precompress)
+        self.local.set(key, entry)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> CacheEntry:
+        """Store a payload in both tiers"""
+        entry = self._new_entry(value, ttl or self.default_ttl, tuple(tags))
+        await self._set_local(key, entry)
+        if self._redis_available():
+            await asyncio.to_thread(self._redis_set, key, entry)
+        return entry
+
+    def set_blocking(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> CacheEntry:
+        """Store a payload from synchronous code (background jobs)"""
+        entry = self._new_entry(value, ttl or self.default_ttl, tuple(tags))
+        self.local.set(key, entry)
+        self._redis_set(key, entry)
+        return entry
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """Read through the cache, calling ``loader`` on a miss
+
+        Concurrent misses for one key are coalesced: on this worker they await
+        the first caller's future, and across workers a Redis lock lets one
+        worker load while the others wait for its result to appear.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        return await self._single_flight(key, loader, ttl, tuple(tags))
+
+    async def fetch(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+        circuit=None,
+    ) -> CacheResult:
+        """Like ``get_or_set`` but serves stale entries instead of waiting or failing
+
+        A stale entry is returned at once while one background refresh runs.
+        When ``circuit`` is open, or the load fails with one of its failure
+        types, the last good entry is returned instead. ``loader`` must not
+        depend on request-scoped state, since a refresh can outlive the
+        request that started it.
+        """
+        tags = tuple(tags)
+        entry = self.local.peek(key)
+        hit = "local_hits"
+        if (entry is None or not entry.is_fresh()) and self._redis_available():
+            remote = await self._redis_entry(key)
+            if remote is not None:
+                entry, hit = remote, "redis_hits"
+        now = time.monotonic()
+        if entry is not None and entry.is_fresh(now):
+            self.stats[hit] += 1
+            return CacheResult(entry.decoded(), FRESH, entry.age, entry)
+        if entry is not None and entry.stale_until > now:
+            self.stats["stale_served"] += 1
+            if key not in self._inflight and key not in self._refreshing:
+                if circuit is None or circuit.allow():
+                    self._refresh_in_background(key, self._guarded(loader, circuit), ttl, tags)
+            return CacheResult(entry.decoded(), STALE, entry.age, entry)
+
+        if key not in self._inflight and circuit is not None and not circuit.allow():
+            return self._fallback(key, entry, CircuitOpenError(f"{circuit.name} circuit is open"))
+        self.stats["misses"] += 1
+        try:
+            value = await self._single_flight(key, self._guarded(loader, circuit), ttl, tags)
+        except Exception as e:
+            if circuit is not None and isinstance(e, circuit.failures):
+                return self._fallback(key, entry, e)
+            raise
+        stored = self.local.peek(key)
+        return CacheResult(value, FRESH, 0, stored if stored is not None and stored.value is value else None)
+
+    def _fallback(self, key: str, entry: Optional[CacheEntry], error: Exception) -> CacheResult:
+        if entry is None:
+            raise error
+        self.stats["fallback_served"] += 1
+        logger.warning(f"Serving last good copy of {key} ({entry.age}s old): {error}")
+        return CacheResult(entry.decoded(), FALLBACK, entry.age, entry)
+
+    @staticmethod
+    def _guarded(loader: Callable[[], Awaitable[Any]], circuit) -> Callable[[], Awaitable[Any]]:
+        if circuit is None:
+            return loader
+
+        async def load():
+            try:
+                value = await loader()
+            except circuit.failures:
+                circuit.record_failure()
+                raise
+            circuit.record_success()
+            return value
+        return load
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int], tags: tuple) -> None:
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._single_flight(key, loader, ttl, tags)
+            except Exception as e:
+                self.stats["refresh_failures"] += 1
+                logger.warning(f"Background refresh of {key} failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        # The loop only holds weak references to tasks
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _single_flight(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int], tags: tuple) -> Any:
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.stats["coalesced_local"] += 1
+            value = await asyncio.shield(inflight)
+            if value is not _RETRY:
+                return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader, ttl, tags)
+        except asyncio.CancelledError:
+            future.set_result(_RETRY)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved in case there are none
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int], tags: tuple) -> Any:
+        token = ""
+        if self._redis_available():
+            token = await asyncio.to_thread(self._redis_lock, key)
+            if token is None:
+                value = await self._wait_for_peer(key)
+                if value is not None:
+                    self.stats["coalesced_remote"] += 1
+                    return value
+                token = ""
+            elif token:
+                # A peer may have stored the value between our miss and the lock
+                value = await self._adopt_redis_entry(key)
+                if value is not None:
+                    await asyncio.to_thread(self._redis_unlock, key, token)
+                    self.stats["coalesced_remote"] += 1
+                    return value
+        try:
+            self.stats["loads"] += 1
+            before = await self.tag_versions(tags) if tags else None
+            value = await loader()
+            if before is not None and await self.tag_versions(tags, memoized=False) != before:
+                # A write committed while loading; the rows read may predate it, so
+                # serve this once but do not store it under the newer versions
+                self.stats["discarded_loads"] += 1
+                return value
+            await self.set(key, value, ttl, tags)
+            return value
+        finally:
+            if token:
+                await asyncio.to_thread(self._redis_unlock, key, token)
+
+    async def _redis_entry(self, key: str) -> Optional[CacheEntry]:
+        """Redis copy in any state, kept locally; None if the local copy supersedes it"""
+        entry = await asyncio.to_thread(self._redis_get, key)
+        if entry is None:
+            return None
+        held = self.local.peek(key)
+        if held is not None and not held.superseded_by(entry):
+            return None
+        await self._set_local(key, entry)
+        return entry
+
+    async def _adopt_redis_entry(self, key: str) -> Any:
+        entry = await self._redis_entry(key)
+        if entry is None or not entry.is_fresh():
+            return None
+        return entry.decoded()
+
+    async def _wait_for_peer(self, key: str) -> Any:
+        """Poll for another worker's result; None once its lock is gone without one"""
+        deadline = time.monotonic() + LOAD_LOCK_SECONDS
+        delay = LOAD_POLL_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            value = await self._adopt_redis_entry(key)
+            if value is not None:
+                return value
+            if not await asyncio.to_thread(self._redis_locked, key):
+                return None
+            delay = min(delay * 2, 0.2)
+        return None
+
+    async def tag_versions(self, tags: Iterable[str], memoized: bool = True) -> Dict[str, str]:
+        """Current version token of each tag, shared across workers through Redis
+
+        Tokens are remembered locally for ``version_ttl`` seconds; pass
+        ``memoized=False`` to go to Redis regardless.
+        """
+        found, stale = self._memoized_versions(tags, memoized)
+        if not stale:
+            return found
+        fetched = None
+        if self._redis_available():
+            fetched = await asyncio.to_thread(self._redis_versions, stale)
+        found.update(self._adopt_versions(stale, fetched))
+        return found
+
+    def tag_versions_blocking(self, tags: Iterable[str], memoized: bool = True) -> Dict[str, str]:
+        """``tag_versions`` for synchronous code (background jobs)"""
+        found, stale = self._memoized_versions(tags, memoized)
+        if not stale:
+            return found
+        found.update(self._adopt_versions(stale, self._redis_versions(stale)))
+        return found
+
+    def _memoized_versions(self, tags: Iterable[str], memoized: bool) -> Tuple[Dict[str, str], tuple]:
+        """Tokens still remembered, and the tags that need a Redis read"""
+        tags = tuple(tags)
+        now = time.monotonic()
+        found: Dict[str, str] = {}
+        with self._versions_lock:
+            for tag in tags:
+                held = self._versions.get(tag)
+                if memoized and held is not None and now - held[1] < self.version_ttl:
+                    found[tag] = held[0]
+        return found, tuple(t for t in tags if t not in found)
+
+    def _adopt_versions(self, stale: tuple, fetched: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """Remember tokens read from Redis (None when it is unavailable)"""
+        if fetched is None:
+            # Local only: keep what we had, issue tokens for tags never seen
+            with self._versions_lock:
+                fetched = {t: self._versions.get(t, (new_tag_version(),))[0] for t in stale}
+        else:
+            with self._versions_lock:
+                for tag, token in fetched.items():
+                    held = self._versions.get(tag)
+                    # Our own bump may still be on its way to Redis; tokens only
+                    # carry milliseconds, so a tie keeps ours too
+                    if held is not None and tag_version_time(held[0]) >= tag_version_time(token):
+                        fetched[tag] = held[0]
+        self._remember_versions(fetched)
+        return fetched
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Expire every cached entry carrying any of ``tags`` and bump their versions
+
+        This worker's state changes at once. The Redis round-trips and the
+        bus publish run on a single background thread, in order; synchronous
+        callers wait for them, while callers on the event loop (an
+        AsyncSession commit) return without waiting.
+        """
+        tags = tuple(tags)
+        if not tags:
+            return
+        self.local.invalidate_tags(tags)
+        bumped = {tag: new_tag_version() for tag in tags}
+        self._remember_versions(bumped)
+        if self.redis is None and (self.bus is None or self.bus.relay is None):
+            # Nothing leaves the process, so nothing can block
+            self._invalidate_remote(tags, bumped)
+            return
+        done = self._invalidator.submit(self._invalidate_remote, tags, bumped)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            done.result()
+
+    def _invalidate_remote(self, tags: tuple, bumped: Dict[str, str]) -> None:
+        try:
+            self._redis_invalidate(tags)
+            self._redis_bump(bumped)
+            if self.bus is not None:
+                self.bus.publish(tags, bumped)
+        except Exception as e:
+            logger.error(f"Publishing invalidation of {list(tags)} failed: {e}")
+
+    def apply_invalidation(self, tags: tuple, versions: Dict[str, str]) -> None:
+        """Apply another worker's invalidation to this worker's local state only"""
+        self.local.invalidate_tags(tags)
+        if versions:
+            self._remember_versions(versions)
+
+    def clear_local(self) -> None:
+        self.local.clear()
+
+
+cache_service = CacheService.from_settings()
+
+registry.callback(
+    "cache_events_total", "Cache hits, misses, loads and stale serves on this worker",
+    stats_samples(cache_service.stats), ("event",), kind="counter",
+)
+registry.callback(
+    "cache_local_bytes", "Bytes held by the local cache tier",
+    lambda: {(): cache_service.local.size_bytes},
+)
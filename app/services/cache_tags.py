@@ -0,0 +1,96 @@
+"""Cache invalidation derived from ORM writes
+
+Session events collect the tags touched by every flushed ``Result``,
+``Game``, ``Rashi``, ``StarLine``, ``FreeFix``, ``Offer`` and ``User`` and
+invalidate them once the transaction commits, so write paths need no
+per-route invalidation code. Importing this module registers the listeners.
+"""
+from typing import Callable, Dict, Iterable, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models import FreeFix, Game, Offer, Rashi, Result, StarLine, User
+from app.services.cache_service import cache_service, count_tag, date_tag, market_tag, rashi_tag
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# The live board reads every market's latest result
+LIVE_BOARD_TAG = "board"
+
+# session.info key holding the tags flushed in the current transaction
+PENDING_TAGS = "cache_tags"
+
+
+def attribute_values(obj, name: str) -> Set:
+    """Current and pre-flush values of an attribute, without loading anything"""
+    history = inspect(obj).attrs[name].history
+    return {v for v in (*history.added, *history.unchanged, *history.deleted) if v is not None}
+
+
+def _result_tags(obj: Result) -> Set[str]:
+    # Old values too: moving a result to another market or date dirties both views
+    tags = {LIVE_BOARD_TAG} | {market_tag(m) for m in attribute_values(obj, "market_id")}
+    return tags | {date_tag(d) for d in attribute_values(obj, "result_date")}
+
+
+def _game_tags(obj: Game) -> Set[str]:
+    return {"markets", LIVE_BOARD_TAG} | {market_tag(m) for m in attribute_values(obj, "sr_no")}
+
+
+def _rashi_tags(obj: Rashi) -> Set[str]:
+    return {count_tag("rashi")} | {rashi_tag(d) for d in attribute_values(obj, "result_date")}
+
+
+# Model -> tags of the cached views built from its rows
+TAG_RULES: Dict[type, Callable[[object], Set[str]]] = {
+    Result: _result_tags,
+    Game: _game_tags,
+    Rashi: _rashi_tags,
+    StarLine: lambda obj: {count_tag("starline")},
+    FreeFix: lambda obj: {"predictions"},
+    Offer: lambda obj: {"offers"},
+    User: lambda obj: {count_tag("users")},
+}
+
+
+def tags_for(obj) -> Set[str]:
+    rule = TAG_RULES.get(type(obj))
+    return rule(obj) if rule else set()
+
+
+def invalidate_on_commit(session: Session, tags: Iterable[str]) -> None:
+    """Queue tags for writes the ORM does not see, such as Core INSERT statements"""
+    session.info.setdefault(PENDING_TAGS, set()).update(tags)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tags(session: Session, flush_context) -> None:
+    tags = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        tags |= tags_for(obj)
+    if tags:
+        invalidate_on_commit(session, tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    # AsyncSession commits run this on the event loop; invalidate_tags only
+    # touches local state there and leaves the Redis work to its own thread
+    tags = session.info.pop(PENDING_TAGS, None)
+    if not tags:
+        return
+    try:
+        cache_service.invalidate_tags(sorted(tags))
+    except Exception as e:
+        # The write is committed; a cache failure must not turn it into an error
+        logger.error(f"Cache invalidation after commit failed for {sorted(tags)}: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tags(session: Session, previous_transaction) -> None:
+    # A rolled back savepoint may leave flushed rows of its parent behind, so
+    # only the outermost rollback drops what was collected
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_TAGS, None)
@@ -0,0 +1,103 @@
+"""Live result events: per-worker fan-out plus a cross-worker Redis relay"""
+import asyncio
+import threading
+from typing import Optional, Set
+
+from app.core.config import settings
+from app.services.pubsub import RedisRelay, redis_from_settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def result_event(kind: str, result) -> dict:
+    """Compact event describing a result write"""
+    return {
+        "type": kind,
+        "sr_no": result.sr_no,
+        "market_id": result.market_id,
+        "result": result.result,
+        "result_date": str(result.result_date),
+    }
+
+
+class EventBroker:
+    """Fans each published event out to every subscriber queue on this worker
+
+    ``publish`` may be called from the event loop or from any thread. When a
+    Redis client is configured the event is also relayed to other workers,
+    which deliver it to their own subscribers.
+    """
+
+    def __init__(self, redis_client=None, channel: str = "smboss:events:results", queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.relay = RedisRelay(redis_client, channel, self._deliver) if redis_client is not None else None
+
+    @classmethod
+    def from_settings(cls) -> "EventBroker":
+        return cls(redis_client=redis_from_settings(), channel=f"{settings.CACHE_PREFIX}:events:results")
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self.relay is not None:
+            self.relay.start()
+
+    async def stop(self) -> None:
+        if self.relay is not None:
+            self.relay.stop()
+        with self._lock:
+            self._subscribers.clear()
+        self._loop = None
+
+    def subscribe(self) -> asyncio.Queue:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(queue)
+
+    def publish(self, event: dict) -> None:
+        """Deliver locally and relay to the other workers"""
+        self._deliver(event)
+        if self.relay is not None:
+            self.relay.publish(event)
+
+    def _deliver(self, event: dict) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(event)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for queue in subscribers:
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block everyone
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+
+
+event_broker = EventBroker.from_settings()
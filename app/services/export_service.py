@@ -0,0 +1,117 @@
+"""Streaming result export (CSV / NDJSON) over a server-side cursor"""
+import csv
+import io
+import json
+from datetime import date
+from typing import AsyncIterator, Iterable, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.result_parser import format_jodi, format_panna
+from app.models.game import Game
+from app.models.result import Result
+
+# Rows fetched from the cursor per round trip; also the rows per emitted chunk
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Exportable column name -> (selectable, value formatter)
+EXPORT_COLUMNS = {
+    "sr_no": (Result.sr_no, None),
+    "market_id": (Result.market_id, None),
+    "market_name": (Game.game, None),
+    "result_date": (Result.result_date, str),
+    "result": (Result.result, None),
+    "open_panna": (Result.open_panna, format_panna),
+    "open_ank": (Result.open_ank, None),
+    "jodi": (Result.jodi, format_jodi),
+    "close_ank": (Result.close_ank, None),
+    "close_panna": (Result.close_panna, format_panna),
+    "open_panna_type": (Result.open_panna_type, None),
+    "close_panna_type": (Result.close_panna_type, None),
+    "timestamp": (Result.date, lambda v: v.isoformat()),
+}
+
+DEFAULT_EXPORT_COLUMNS = ("market_id", "market_name", "result_date", "result")
+
+
+def parse_columns(raw: Optional[str]) -> List[str]:
+    """Validate a comma separated column list; raises ValueError naming unknown columns"""
+    if not raw:
+        return list(DEFAULT_EXPORT_COLUMNS)
+    columns = [c.strip() for c in raw.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown) or raw}")
+    return columns
+
+
+def export_query(
+    columns: Sequence[str],
+    market_ids: Optional[Sequence[int]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    query = select(*[EXPORT_COLUMNS[c][0] for c in columns]).select_from(Result)
+    if "market_name" in columns:
+        query = query.join(Game, Game.sr_no == Result.market_id)
+    if market_ids:
+        query = query.where(Result.market_id.in_(market_ids))
+    if start_date:
+        query = query.where(Result.result_date >= start_date)
+    if end_date:
+        query = query.where(Result.result_date <= end_date)
+    # Matches uq_market_date so the server walks the index in order
+    return query.order_by(Result.market_id, Result.result_date)
+
+
+def _formatted(columns: Sequence[str], row: Iterable) -> list:
+    out = []
+    for name, value in zip(columns, row):
+        formatter = EXPORT_COLUMNS[name][1]
+        out.append(formatter(value) if formatter and value is not None else value)
+    return out
+
+
+def csv_chunk(columns: Sequence[str], rows: Iterable, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow(_formatted(columns, row))
+    return buffer.getvalue()
+
+
+def ndjson_chunk(columns: Sequence[str], rows: Iterable) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, _formatted(columns, row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+async def encode_batches(fmt: str, columns: Sequence[str], batches: AsyncIterator[list]) -> AsyncIterator[str]:
+    """Encode row batches as they arrive; a CSV export always starts with its header"""
+    if fmt == "csv":
+        yield csv_chunk(columns, (), header=True)
+    async for rows in batches:
+        yield csv_chunk(columns, rows) if fmt == "csv" else ndjson_chunk(columns, rows)
+
+
+async def stream_rows(query, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[list]:
+    """Row batches from an unbuffered server-side cursor on a session of its own
+
+    The session lives as long as the response body is being sent, which is
+    longer than a request-scoped dependency session.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions(batch_size):
+            yield rows
+
+
+def export_filename(fmt: str, start_date: Optional[date], end_date: Optional[date]) -> str:
+    span = "-".join(str(d) for d in (start_date, end_date) if d) or "all"
+    return f"results-{span}.{fmt}"
@@ -1,5 +1,7 @@
 """Game/Market business logic"""
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.game import Game
 
 class GameService:
@@ -23,3 +25,27 @@ class GameService:
         db.commit()
         db.refresh(game)
         return game
+
+class AsyncGameService:
+    @staticmethod
+    async def get_all_games(db: AsyncSession):
+        rows = await db.execute(select(Game).where(Game.status == 1))
+        return rows.scalars().all()
+    
+    @staticmethod
+    async def get_game_by_id(db: AsyncSession, game_id: int):
+        rows = await db.execute(select(Game).where(Game.sr_no == game_id))
+        return rows.scalars().first()
+    
+    @staticmethod
+    async def create_game(db: AsyncSession, game_name: str, open_time=None, close_time=None):
+        game = Game(
+            game=game_name,
+            open_time=open_time,
+            close_time=close_time,
+            status=1
+        )
+        db.add(game)
+        await db.commit()
+        await db.refresh(game)
+        return game
@@ -0,0 +1,100 @@
+"""Cross-worker cache invalidation: tag drops and version bumps broadcast to peers"""
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.services.pubsub import RedisRelay, redis_from_settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# handler(tags, versions) — called for invalidations made by other workers
+InvalidationHandler = Callable[[tuple, Dict[str, str]], None]
+
+
+class MemoryHub:
+    """In-process transport: every bus attached to a hub hears the others
+
+    Used when Redis is disabled, where there is a single worker and the hub
+    only connects buses living in the same process.
+    """
+
+    def __init__(self):
+        self._buses: List["InvalidationBus"] = []
+        self._lock = threading.Lock()
+
+    def attach(self, bus: "InvalidationBus") -> None:
+        with self._lock:
+            if bus not in self._buses:
+                self._buses.append(bus)
+
+    def detach(self, bus: "InvalidationBus") -> None:
+        with self._lock:
+            if bus in self._buses:
+                self._buses.remove(bus)
+
+    def publish(self, sender: "InvalidationBus", message: dict) -> None:
+        with self._lock:
+            peers = [b for b in self._buses if b is not sender]
+        for bus in peers:
+            bus._receive(message)
+
+
+memory_hub = MemoryHub()
+
+
+class InvalidationBus:
+    """Broadcasts ``(tags, versions)`` for every invalidation on this worker
+
+    Peers apply them to their local cache tier and version mirror, so a
+    write on one worker is visible on all of them as soon as the message
+    lands instead of after local TTLs. With a Redis client messages go over
+    pub/sub; without one they go through an in-process ``MemoryHub``.
+    """
+
+    def __init__(self, redis_client=None, channel: str = "smboss:events:invalidate", hub: Optional[MemoryHub] = None):
+        self._handlers: List[InvalidationHandler] = []
+        self.relay = RedisRelay(redis_client, channel, self._receive) if redis_client is not None else None
+        self.hub = None if self.relay is not None else (hub or memory_hub)
+        if self.hub is not None:
+            self.hub.attach(self)
+        self.stats = {"published": 0, "received": 0}
+
+    @classmethod
+    def from_settings(cls) -> "InvalidationBus":
+        return cls(redis_client=redis_from_settings(), channel=f"{settings.CACHE_PREFIX}:events:invalidate")
+
+    def subscribe(self, handler: InvalidationHandler) -> None:
+        self._handlers.append(handler)
+
+    def start(self) -> None:
+        if self.relay is not None:
+            self.relay.start()
+
+    def stop(self) -> None:
+        if self.relay is not None:
+            self.relay.stop()
+
+    def publish(self, tags: Iterable[str], versions: Dict[str, str]) -> None:
+        """Tell the other workers about an invalidation already applied here"""
+        message = {"tags": list(tags), "versions": versions}
+        self.stats["published"] += 1
+        if self.relay is not None:
+            self.relay.publish(message)
+        else:
+            self.hub.publish(self, message)
+
+    def _receive(self, message: dict) -> None:
+        tags = tuple(message.get("tags") or ())
+        if not tags:
+            return
+        self.stats["received"] += 1
+        versions = message.get("versions") or {}
+        for handler in self._handlers:
+            try:
+                handler(tags, versions)
+            except Exception as e:
+                logger.error(f"Invalidation handler failed for {tags}: {e}")
+
+
+invalidation_bus = InvalidationBus.from_settings()
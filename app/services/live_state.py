@@ -0,0 +1,133 @@
+"""market_live_state projection: latest result per market, kept in step with writes
+
+Rows are recomputed from ``game`` and ``game_results`` inside the flush that
+changed them, so the projection commits or rolls back with the write.
+Writers lock a market's projection row before they write its results and
+then read the latest result with a locking (current) read, so concurrent
+writes to one market are applied in commit order rather than each from
+its own snapshot. Importing this module registers the listeners.
+"""
+from datetime import datetime
+from typing import Iterable, List
+
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.result_parser import parse_result
+from app.models.game import Game
+from app.models.live_state import MarketLiveState
+from app.models.result import Result
+from app.services.cache_tags import attribute_values
+
+STATE = MarketLiveState.__table__
+GAMES = Game.__table__
+RESULTS = Result.__table__
+
+
+def lock_live_state(connection: Connection, market_ids: Iterable[int]) -> None:
+    """Hold the projection rows of ``market_ids`` until the transaction ends
+
+    Taken before a market's results are written; rows are locked in id
+    order so two multi-market writers cannot deadlock on them.
+    """
+    market_ids = sorted(set(market_ids))
+    if market_ids:
+        connection.execute(
+            select(STATE.c.market_id)
+            .where(STATE.c.market_id.in_(market_ids))
+            .order_by(STATE.c.market_id)
+            .with_for_update()
+        ).all()
+
+
+def _latest_results(connection: Connection, market_ids: List[int]) -> dict:
+    latest = (
+        select(RESULTS.c.market_id, func.max(RESULTS.c.result_date).label("result_date"))
+        .where(RESULTS.c.market_id.in_(market_ids))
+        .group_by(RESULTS.c.market_id)
+        .subquery()
+    )
+    # A locking read sees results committed after this transaction's snapshot
+    rows = connection.execute(
+        select(RESULTS.c.market_id, RESULTS.c.result, RESULTS.c.result_date).join(
+            latest,
+            and_(RESULTS.c.market_id == latest.c.market_id, RESULTS.c.result_date == latest.c.result_date),
+        ).with_for_update(read=True)
+    ).all()
+    return {r.market_id: r for r in rows}
+
+
+def state_row(game, latest) -> dict:
+    """Projection columns for one market and its latest result (or None)"""
+    parsed = parse_result(latest.result if latest else None)
+    return {
+        "market_id": game.sr_no,
+        "game": game.game,
+        "open_time": game.open_time,
+        "close_time": game.close_time,
+        "market_status": game.status,
+        "result": latest.result if latest else None,
+        "result_date": latest.result_date if latest else None,
+        "open_declared": parsed.open_ank is not None,
+        "close_declared": parsed.close_ank is not None,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def refresh_live_state(connection: Connection, market_ids: Iterable[int]) -> None:
+    """Recompute the projection rows of ``market_ids`` on the caller's connection"""
+    market_ids = sorted(set(market_ids))
+    if not market_ids:
+        return
+    games = connection.execute(select(GAMES).where(GAMES.c.sr_no.in_(market_ids))).all()
+    found = {g.sr_no for g in games}
+    gone = [m for m in market_ids if m not in found]
+    if gone:
+        connection.execute(STATE.delete().where(STATE.c.market_id.in_(gone)))
+    if not games:
+        return
+    latest = _latest_results(connection, [g.sr_no for g in games])
+    rows = [state_row(g, latest.get(g.sr_no)) for g in games]
+    if connection.dialect.name == "mysql":
+        stmt = mysql_insert(STATE).values([{**row, "version": 1} for row in rows])
+        update = {name: stmt.inserted[name] for name in rows[0] if name != "market_id"}
+        update["version"] = STATE.c.version + 1
+        connection.execute(stmt.on_duplicate_key_update(update))
+        return
+    # Portable path (tests, tooling): update, then insert what did not exist
+    existing = set(connection.execute(select(STATE.c.market_id).where(STATE.c.market_id.in_(found))).scalars())
+    for row in rows:
+        if row["market_id"] in existing:
+            connection.execute(
+                STATE.update()
+                .where(STATE.c.market_id == row["market_id"])
+                .values(**row, version=STATE.c.version + 1)
+            )
+        else:
+            connection.execute(STATE.insert().values(**row, version=1))
+
+
+def _touched_markets(session: Session) -> set:
+    market_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Result):
+            market_ids |= attribute_values(obj, "market_id")
+        elif isinstance(obj, Game):
+            market_ids |= attribute_values(obj, "sr_no")
+    return market_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _lock_flushing_markets(session: Session, flush_context, instances) -> None:
+    market_ids = _touched_markets(session)
+    if market_ids:
+        lock_live_state(session.connection(), market_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_flushed_markets(session: Session, flush_context) -> None:
+    market_ids = _touched_markets(session)
+    if market_ids:
+        refresh_live_state(session.connection(), market_ids)
@@ -0,0 +1,114 @@
+"""Cross-worker message relay over Redis pub/sub"""
+import json
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+import redis
+
+from app.core.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Identifies this process so a worker can skip its own relayed messages
+WORKER_ID = uuid.uuid4().hex
+
+# After a failed publish, skip publishing for this long instead of paying
+# the connect timeout on every write
+PUBLISH_RETRY_SECONDS = 5
+
+
+def redis_from_settings() -> Optional[redis.Redis]:
+    """Client for pub/sub use, or None when Redis is disabled"""
+    if not settings.CACHE_REDIS_ENABLED:
+        return None
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        socket_connect_timeout=0.25,
+        socket_timeout=5,
+    )
+
+
+class RedisRelay:
+    """Publishes JSON messages on a channel and hands peers' messages to a callback
+
+    The listener runs on a daemon thread; the callback is invoked on that
+    thread, so it must be thread-safe.
+    """
+
+    def __init__(self, client, channel: str, on_message: Callable[[dict], None]):
+        self.client = client
+        self.channel = channel
+        self.on_message = on_message
+        self.origin = WORKER_ID
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._publish_down_until = 0.0
+
+    def publish(self, message: dict) -> bool:
+        """Send to every other worker; returns False when Redis is unreachable"""
+        if self.client is None or time.monotonic() < self._publish_down_until:
+            return False
+        data = json.dumps({"origin": self.origin, "message": message}, default=str)
+        try:
+            self.client.publish(self.channel, data)
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Relay publish on {self.channel} failed: {e}")
+            self._publish_down_until = time.monotonic() + PUBLISH_RETRY_SECONDS
+            return False
+
+    def start(self) -> None:
+        if self.client is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen, name=f"relay:{self.channel}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub()
+                pubsub.subscribe(self.channel)
+                backoff = 0.5
+                while not self._stop.is_set():
+                    raw = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if raw is None or raw.get("type") != "message":
+                        continue
+                    self._dispatch(raw["data"])
+            except redis.RedisError as e:
+                logger.warning(f"Relay listener on {self.channel} lost Redis: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except redis.RedisError:
+                        pass
+
+    def _dispatch(self, data) -> None:
+        try:
+            envelope = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if envelope.get("origin") == self.origin:
+            return
+        try:
+            self.on_message(envelope.get("message") or {})
+        except Exception as e:
+            logger.error(f"Relay handler on {self.channel} failed: {e}")
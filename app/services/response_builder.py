@@ -0,0 +1,249 @@
+"""Response bodies and cache keys shared by the read routes and the cache warmer"""
+from datetime import date
+from typing import Iterable
+
+DEFAULT_HISTORY_LIMIT = 30
+
+
+def public_markets_key() -> str:
+    return "public:markets"
+
+
+def public_results_key(target_date: date) -> str:
+    return f"public:results:{target_date}"
+
+
+def live_results_key(target_date: date) -> str:
+    return f"results:live:{target_date}"
+
+
+def market_results_key(market_id: int, limit: int = DEFAULT_HISTORY_LIMIT) -> str:
+    return f"markets:{market_id}:results:{limit}"
+
+
+def public_rashi_key(target_date: date) -> str:
+    return f"public:rashi:{target_date}"
+
+
+def markets_key() -> str:
+    return "markets:active"
+
+
+def market_key(market_id: int) -> str:
+    return f"markets:{market_id}"
+
+
+def public_offers_key(today: date) -> str:
+    # Offer windows are whole days, so the active set only changes with the date
+    return f"public:offers:{today}"
+
+
+def public_home_key(today: date) -> str:
+    return f"public:home:{today}"
+
+
+def live_board_key(today: date) -> str:
+    # "pending" is relative to today, so the board is per date
+    return f"results:board:{today}"
+
+
+def market_fields(m) -> dict:
+    return {
+        "sr_no": m.sr_no,
+        "game": m.game,
+        "open_time": str(m.open_time) if m.open_time else None,
+        "close_time": str(m.close_time) if m.close_time else None,
+        "status": m.status,
+        "days": m.days,
+    }
+
+
+def build_markets(markets: Iterable) -> dict:
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Markets fetched",
+        "data": [market_fields(m) for m in markets]
+    }
+
+
+def build_market(market) -> dict:
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Market fetched",
+        "data": market_fields(market)
+    }
+
+
+def build_public_markets(markets: Iterable) -> dict:
+    markets = list(markets)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Markets retrieved",
+        "data": {
+            "markets": [
+            {
+                "sr_no": m.sr_no,
+                "game": m.game,
+                "open_time": str(m.open_time) if m.open_time else None,
+                "close_time": str(m.close_time) if m.close_time else None,
+            }
+            for m in markets
+            ],
+            "count": len(markets)
+        }
+    }
+
+
+def build_public_results(results: Iterable, target_date: date) -> dict:
+    results = list(results)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Results retrieved",
+        "data": {
+            "results": [
+            {
+                "market_id": r.market_id,
+                "result": r.result,
+                "result_date": str(r.result_date)
+            }
+            for r in results
+            ],
+            "count": len(results),
+            "date": str(target_date)
+        }
+    }
+
+
+def build_live_results(results: Iterable, target_date: date) -> dict:
+    results = list(results)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Live results fetched",
+        "data": {
+            "message": [
+            {
+                "market_id": r.market_id,
+                "result": r.result,
+                "result_date": str(r.result_date),
+                "timestamp": r.date.isoformat()
+            }
+            for r in results
+            ],
+            "count": len(results),
+            "date": str(target_date)
+        }
+    }
+
+
+def build_market_results(market, results: Iterable) -> dict:
+    results = list(results)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Results fetched",
+        "data": {
+            "market_id": market.sr_no,
+            "market_name": market.game,
+            "results": [
+            {
+                "result": r.result,
+                "result_date": str(r.result_date),
+                "timestamp": r.date.isoformat()
+            }
+            for r in results
+            ],
+            "count": len(results)
+        }
+    }
+
+
+def build_public_rashi(items: Iterable, target_date: date) -> dict:
+    items = list(items)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Rashi results retrieved",
+        "data": {
+            "results": [
+            {
+                "rashi_name": r.rashi_name,
+                "result": r.result,
+                "result_date": str(r.result_date)
+            }
+            for r in items
+            ],
+            "count": len(items),
+            "date": str(target_date)
+        }
+    }
+
+
+def build_public_offers(offers: Iterable) -> dict:
+    offers = list(offers)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Offers retrieved",
+        "data": {
+            "offers": [
+            {
+                "sr_no": o.sr_no,
+                "title": o.title,
+                "description": o.description,
+                "valid_from": str(o.valid_from),
+                "valid_till": str(o.valid_till)
+            }
+            for o in offers
+            ],
+            "count": len(offers)
+        }
+    }
+
+
+def build_public_home(markets: Iterable, results: Iterable, rashi: Iterable, offers: Iterable, today: date) -> dict:
+    """The four public homepage views in one document"""
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Home retrieved",
+        "data": {
+            "date": str(today),
+            "markets": build_public_markets(markets)["data"],
+            "results": build_public_results(results, today)["data"],
+            "rashi": build_public_rashi(rashi, today)["data"],
+            "offers": build_public_offers(offers)["data"],
+        }
+    }
+
+
+def build_live_board(states: Iterable, today: date) -> dict:
+    states = list(states)
+    return {
+        "http_status": 200,
+        "success": True,
+        "message": "Live board fetched",
+        "data": {
+            "markets": [
+            {
+                "market_id": s.market_id,
+                "market_name": s.game,
+                "open_time": str(s.open_time) if s.open_time else None,
+                "close_time": str(s.close_time) if s.close_time else None,
+                "result": s.result,
+                "result_date": str(s.result_date) if s.result_date else None,
+                "open_declared": s.open_declared,
+                "close_declared": s.close_declared,
+                "pending": s.result_date != today or not s.close_declared,
+                "version": s.version
+            }
+            for s in states
+            ],
+            "count": len(states),
+            "date": str(today)
+        }
+    }
@@ -1,8 +1,44 @@
 """Result business logic"""
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime
+from typing import List
 from app.models.result import Result
 from app.models.game import Game
+from app.core.result_parser import PARSED_COLUMNS, parse_result
+from app.services.cache_service import market_tag, date_tag
+from app.services.cache_tags import LIVE_BOARD_TAG, invalidate_on_commit
+from app.services.live_state import lock_live_state, refresh_live_state
+from app.services.event_broker import event_broker, result_event
+from app.services.analysis_service import record_results_on_commit
+
+# Rows per INSERT ... ON DUPLICATE KEY UPDATE statement
+BULK_CHUNK_SIZE = 500
+
+def _write_results(connection: Connection, values: List[dict], existing: set) -> None:
+    """Insert or overwrite result rows; ``existing`` holds the (market, date) pairs present"""
+    overwrite = ["result", "date", "updated_at", *PARSED_COLUMNS]
+    if connection.dialect.name == "mysql":
+        for start in range(0, len(values), BULK_CHUNK_SIZE):
+            stmt = mysql_insert(Result).values(values[start:start + BULK_CHUNK_SIZE])
+            connection.execute(stmt.on_duplicate_key_update(
+                {column: stmt.inserted[column] for column in overwrite}
+            ))
+        return
+    # Portable path (tests, tooling): update, then insert what did not exist
+    table = Result.__table__
+    for row in values:
+        if (row["market_id"], row["result_date"]) in existing:
+            connection.execute(
+                table.update()
+                .where(table.c.market_id == row["market_id"], table.c.result_date == row["result_date"])
+                .values({column: row[column] for column in overwrite})
+            )
+        else:
+            connection.execute(table.insert().values(row))
 
 class ResultService:
     @staticmethod
@@ -30,4 +66,116 @@ class ResultService:
         db.add(result_obj)
         db.commit()
         db.refresh(result_obj)
+        event_broker.publish(result_event("created", result_obj))
+        return result_obj
+
+class AsyncResultService:
+    @staticmethod
+    async def get_live_results(db: AsyncSession, target_date: date = None):
+        if not target_date:
+            from datetime import datetime
+            target_date = datetime.now().date()
+        
+        rows = await db.execute(select(Result).where(Result.result_date == target_date))
+        return rows.scalars().all()
+    
+    @staticmethod
+    async def get_market_history(db: AsyncSession, market_id: int, limit: int = 30):
+        rows = await db.execute(
+            select(Result)
+            .where(Result.market_id == market_id)
+            .order_by(Result.result_date.desc())
+            .limit(limit)
+        )
+        return rows.scalars().all()
+    
+    @staticmethod
+    async def create_result(db: AsyncSession, market_id: int, result: str, result_date: date):
+        result_obj = Result(
+            market_id=market_id,
+            result=result,
+            result_date=result_date,
+            status=0
+        )
+        db.add(result_obj)
+        await db.commit()
+        await db.refresh(result_obj)
+        event_broker.publish(result_event("created", result_obj))
         return result_obj
+    
+    @staticmethod
+    async def bulk_upsert(db: AsyncSession, rows: List[dict]) -> List[str]:
+        """Insert or overwrite many results in batched upserts over uq_market_date
+        
+        ``rows`` are validated dicts with market_id, result and result_date.
+        Returns one outcome per row: created, updated, market_not_found or
+        superseded (a later row in the batch has the same market and date).
+        """
+        outcomes = [None] * len(rows)
+        market_ids = {r["market_id"] for r in rows}
+        found = await db.execute(select(Game.sr_no).where(Game.sr_no.in_(market_ids)))
+        known_markets = set(found.scalars().all())
+        
+        latest = {}
+        for i, r in enumerate(rows):
+            if r["market_id"] not in known_markets:
+                outcomes[i] = "market_not_found"
+                continue
+            key = (r["market_id"], r["result_date"])
+            if key in latest:
+                outcomes[latest[key]] = "superseded"
+            latest[key] = i
+        valid = [rows[i] for i in sorted(latest.values())]
+        
+        # Serialise with other writers of these markets before reading what exists
+        market_ids = {m for m, _ in latest}
+        await db.run_sync(lambda session: lock_live_state(session.connection(), market_ids))
+        existing = set()
+        if latest:
+            # A locking read sees rows committed after the market lookup above
+            found = await db.execute(
+                select(Result.market_id, Result.result_date).where(
+                    tuple_(Result.market_id, Result.result_date).in_(list(latest))
+                ).with_for_update(read=True)
+            )
+            existing = {(m, d) for m, d in found.all()}
+        
+        now = datetime.utcnow()
+        values = [
+            {
+                "market_id": r["market_id"],
+                "result": r["result"],
+                "result_date": r["result_date"],
+                "status": 0,
+                "date": now,
+                "created_at": now,
+                "updated_at": now,
+                "is_active": True,
+                **parse_result(r["result"]).as_columns(),
+            }
+            for r in valid
+        ]
+        await db.run_sync(lambda session: _write_results(session.connection(), values, existing))
+        # Core upserts bypass the ORM flush, so the projection and the tags are
+        # handled here; both still land with the commit, as one invalidation
+        await db.run_sync(lambda session: refresh_live_state(session.connection(), market_ids))
+        # Multi-row upserts don't report their ids; read them back for the events
+        written = {}
+        if latest:
+            found = await db.execute(
+                select(Result.sr_no, Result.market_id, Result.result, Result.result_date).where(
+                    tuple_(Result.market_id, Result.result_date).in_(list(latest))
+                )
+            )
+            written = {(row.market_id, row.result_date): row for row in found.all()}
+        invalidate_on_commit(db.sync_session, {LIVE_BOARD_TAG} | {
+            tag for m, d in latest for tag in (market_tag(m), date_tag(d))
+        })
+        record_results_on_commit(db.sync_session, {key: rows[i]["result"] for key, i in latest.items()})
+        await db.commit()
+        
+        for key, i in latest.items():
+            outcomes[i] = "updated" if key in existing else "created"
+        for key, i in sorted(latest.items(), key=lambda item: item[1]):
+            event_broker.publish(result_event(outcomes[i], written[key]))
+        return outcomes
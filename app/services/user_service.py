@@ -1,5 +1,8 @@
 """User business logic"""
+import asyncio
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.core.security import hash_password, verify_password
 
@@ -25,3 +28,30 @@ class UserService:
         db.commit()
         db.refresh(user)
         return user
+
+class AsyncUserService:
+    @staticmethod
+    async def get_user_by_username(db: AsyncSession, username: str):
+        rows = await db.execute(select(User).where(User.username == username))
+        return rows.scalars().first()
+    
+    @staticmethod
+    async def get_user_by_id(db: AsyncSession, user_id: int):
+        rows = await db.execute(select(User).where(User.id == user_id))
+        return rows.scalars().first()
+    
+    @staticmethod
+    async def create_user(db: AsyncSession, username: str, mobile: str, email: str, password: str, status: int = 0):
+        # bcrypt is CPU-bound; keep it off the event loop
+        hashed = await asyncio.to_thread(hash_password, password)
+        user = User(
+            username=username,
+            mobile=mobile,
+            email=email,
+            password=hashed,
+            status=status
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
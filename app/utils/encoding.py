@@ -0,0 +1,103 @@
+"""JSON body encoding and content-coding negotiation (identity / gzip / brotli)"""
+import gzip
+from typing import Any, Dict, Mapping, Optional
+
+import brotli
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import settings
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+
+# Preferred first when the client weighs codings equally
+ENCODINGS = (BROTLI, GZIP)
+
+# Cached bodies are compressed once per entry, so they get the best ratio
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON; values orjson has no native form for fall back to str()"""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def loads(body: bytes) -> Any:
+    return orjson.loads(body)
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = CACHED_GZIP_LEVEL, brotli_quality: int = CACHED_BROTLI_QUALITY) -> bytes:
+    if encoding == GZIP:
+        # mtime=0 keeps the bytes, and so the ETag's body, deterministic
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=brotli_quality)
+    return body
+
+
+def precompress(body: bytes, min_size: Optional[int] = None) -> Dict[str, bytes]:
+    """Compressed variants of a body worth compressing, keyed by coding"""
+    if len(body) < (settings.COMPRESS_MIN_BYTES if min_size is None else min_size):
+        return {}
+    variants = {}
+    for encoding in ENCODINGS:
+        packed = compress(body, encoding)
+        # Incompressible bodies are sent as they are
+        if len(packed) < len(body):
+            variants[encoding] = packed
+    return variants
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    weights = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    return weights
+
+
+def select_encoding(accept_encoding: Optional[str]) -> str:
+    """Best coding the client accepts (RFC 9110 12.5.3); identity when none"""
+    if not accept_encoding:
+        return IDENTITY
+    weights = _accepted(accept_encoding)
+    wildcard = weights.get("*", 0.0)
+    best, best_q = IDENTITY, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class EncodedJSONResponse(ORJSONResponse):
+    """JSON response around an already encoded (and possibly compressed) body"""
+
+    def __init__(
+        self,
+        body: bytes,
+        encoding: str = IDENTITY,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        headers = dict(headers or {})
+        if encoding != IDENTITY:
+            headers["Content-Encoding"] = encoding
+        super().__init__(body, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return content
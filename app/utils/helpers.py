@@ -1,5 +1,6 @@
 """Helper functions"""
 from datetime import datetime, date
+from app.core.result_parser import parse_result, format_jodi, format_panna
 
 def get_today() -> date:
     """Get today's date"""
@@ -21,21 +22,18 @@ def format_response(status: str, message: str, data: dict = None) -> dict:
 def extract_jodi(result: str) -> str:
     """Extract jodi (middle 2 digits) from result"""
     # From "123-45-678" extract "45"
-    parts = result.split('-')
-    if len(parts) >= 2:
-        return parts
-    return None
+    return format_jodi(parse_result(result).jodi)
 
 def extract_panna(result: str, panna_type: str = "close") -> str:
     """Extract panna from result"""
     # From "123-45-678"
     # close_panna = "678" (last 3 digits)
     # open_panna = "123" (first 3 digits)
-    parts = result.split('-')
+    parsed = parse_result(result)
     
-    if panna_type == "close" and len(parts) >= 3:
-        return parts
-    elif panna_type == "open" and len(parts) >= 1:
-        return parts
+    if panna_type == "close":
+        return format_panna(parsed.close_panna)
+    elif panna_type == "open":
+        return format_panna(parsed.open_panna)
     
     return None
@@ -0,0 +1,114 @@
+"""Conditional GET (ETag / Last-Modified / 304) and stale serving for cached read views"""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.circuit import CircuitOpenError, db_circuit
+from app.core.database import AsyncSessionLocal
+from app.services.cache_service import FALLBACK, STALE, CacheResult, cache_service, tag_version_time
+from app.utils.encoding import IDENTITY, EncodedJSONResponse, dumps, select_encoding
+
+STALE_WARNING = '110 - "Response is Stale"'
+FALLBACK_WARNING = '111 - "Revalidation Failed"'
+
+
+def make_etag(key: str, versions: Dict[str, str], encoding: str = IDENTITY) -> str:
+    """Strong ETag for a view: its cache key, the versions of its tags and the negotiated coding"""
+    material = key + "|" + ",".join(f"{t}={versions[t]}" for t in sorted(versions))
+    if encoding != IDENTITY:
+        # Each content-coding is a different representation, so a different tag
+        material += "|" + encoding
+    return '"' + hashlib.blake2b(material.encode(), digest_size=10).hexdigest() + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float]) -> bool:
+    """If-None-Match wins; If-Modified-Since is only consulted without it"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def cached_response(request: Request, cached: CacheResult, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Send a cached view's stored bytes in the best coding the client accepts
+
+    Nothing is serialized or compressed on a hit; only a value that never
+    made it into the local tier is encoded here.
+    """
+    if cached.entry is None:
+        return EncodedJSONResponse(dumps(cached.value), headers=headers)
+    body, coding = cached.entry.encoded(select_encoding(request.headers.get("accept-encoding")))
+    return EncodedJSONResponse(body, encoding=coding, headers=headers)
+
+
+async def conditional_view(
+    request: Request,
+    key: str,
+    tags: Iterable[str],
+    load: Callable[[AsyncSession], Awaitable[Any]],
+    ttl: Optional[int] = None,
+) -> Response:
+    """Serve a cached view, answering 304 from tag versions alone when the client is current
+
+    Versions are read before the body, and a load whose tags were bumped
+    while it ran is served once but not stored, so the ETag can be older
+    than the body but a body is never cached under newer versions.
+    ``load`` gets a session of its own because a stale hit refreshes in the
+    background. An expired body is served while that refresh runs (Warning
+    110); while the database circuit is open or a load fails, the last good
+    body is served without validators (Warning 111).
+    """
+    tags = tuple(tags)
+    versions = await cache_service.tag_versions(tags)
+    etag = make_etag(key, versions, select_encoding(request.headers.get("accept-encoding")))
+    last_modified = max((tag_version_time(v) for v in versions.values()), default=None)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await load(db)
+    
+    try:
+        cached = await cache_service.fetch(key, run, ttl, tags, circuit=db_circuit)
+    except (CircuitOpenError,) + db_circuit.failures:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service temporarily unavailable",
+            headers={"Retry-After": str(int(db_circuit.reset_after))},
+        )
+    headers["Age"] = str(cached.age)
+    if cached.state == STALE:
+        headers["Warning"] = STALE_WARNING
+    elif cached.state == FALLBACK:
+        # The body may predate the current versions, so it must not validate
+        headers.pop("ETag")
+        headers.pop("Last-Modified", None)
+        headers["Cache-Control"] = "no-store"
+        headers["Warning"] = FALLBACK_WARNING
+    return cached_response(request, cached, headers)
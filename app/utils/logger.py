@@ -1,36 +1,149 @@
-"""Logging configuration"""
+"""Logging configuration
+
+One root configuration for the whole process: loggers only enqueue records,
+and a ``QueueListener`` thread does the formatting, disk writes and
+rotation. ``setup_logger`` can be called any number of times; the handlers
+are installed once.
+"""
+import atexit
+import copy
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from pythonjsonlogger import jsonlogger
+
 from app.core.config import settings
 
+LOG_MAX_BYTES = 10485760  # 10MB
+LOG_BACKUP_COUNT = 10
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+JSON_FIELDS = '%(asctime)s %(name)s %(levelname)s %(message)s'
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+def parse_sampling(raw: str) -> Dict[str, float]:
+    """``"app.services.cache_service=0.1,app.routes=0.5"`` -> {logger prefix: keep rate}"""
+    rates = {}
+    for part in raw.split(","):
+        name, _, rate = part.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fixed share of the records of noisy loggers
+
+    Rates apply to a logger and its children, the longest prefix winning.
+    Sampling is deterministic (every n-th record per prefix) and never
+    drops WARNING or above.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _prefix(self, name: str) -> Optional[str]:
+        best = None
+        for prefix in self.rates:
+            if (name == prefix or name.startswith(prefix + ".")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        prefix = self._prefix(record.name)
+        if prefix is None:
+            return True
+        rate = self.rates[prefix]
+        if rate <= 0:
+            return False
+        every = max(int(round(1 / rate)), 1)
+        with self._lock:
+            seen = self._seen.get(prefix, 0)
+            self._seen[prefix] = seen + 1
+        return seen % every == 0
+
+
+class _QueueHandler(QueueHandler):
+    """Resolves the message on the caller's thread but keeps the record unformatted
+
+    The stock ``prepare`` formats the whole line here; only the message and
+    traceback text need to be resolved before the record changes threads.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def make_formatter(fmt: str) -> logging.Formatter:
+    if fmt == "json":
+        return jsonlogger.JsonFormatter(JSON_FIELDS, rename_fields={"levelname": "level", "name": "logger"})
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def configure_logging() -> None:
+    """Install the root queue handler and start its listener, once per process"""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        os.makedirs(os.path.dirname(settings.LOG_FILE), exist_ok=True)
+        formatter = make_formatter(settings.LOG_FORMAT)
+        file_handler = RotatingFileHandler(
+            settings.LOG_FILE,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT
+        )
+        console_handler = logging.StreamHandler()
+        for handler in (file_handler, console_handler):
+            handler.setFormatter(formatter)
+
+        records: queue.Queue = queue.Queue(-1)
+        queue_handler = _QueueHandler(records)
+        queue_handler.addFilter(SamplingFilter(parse_sampling(settings.LOG_SAMPLING)))
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL)
+        # Re-imports (reloaders, tests) must not stack a second pipeline
+        for handler in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _listener = QueueListener(records, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and close the handlers"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 def setup_logger(name: str) -> logging.Logger:
-    """Setup logging configuration"""
-    logger = logging.getLogger(name)
-    logger.setLevel(settings.LOG_LEVEL)
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs(os.path.dirname(settings.LOG_FILE), exist_ok=True)
-    
-    # File handler
-    file_handler = RotatingFileHandler(
-        settings.LOG_FILE,
-        maxBytes=10485760,  # 10MB
-        backupCount=10
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
+    """Logger for a module; records go through the shared root pipeline"""
+    configure_logging()
+    return logging.getLogger(name)
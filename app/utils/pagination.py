@@ -0,0 +1,110 @@
+"""Keyset (cursor) pagination and cached list totals"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, false, or_
+
+from app.core.config import settings
+from app.services.cache_service import cache_service, count_tag
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(raw: Any, type_: type) -> Any:
+    if raw is None:
+        return None
+    if type_ is datetime:
+        return datetime.fromisoformat(raw)
+    if type_ is date:
+        return date.fromisoformat(raw)
+    return type_(raw)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row on a page"""
+    data = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(types):
+            raise ValueError("wrong arity")
+        return tuple(_decode_value(v, t) for v, t in zip(raw, types))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _nullable(column) -> bool:
+    return bool(getattr(column.expression, "nullable", False))
+
+
+def _order(column, descending: bool) -> list:
+    # NULLs sort last either way; the extra key is only added where they can occur
+    ordered = column.desc() if descending else column.asc()
+    return [column.is_(None), ordered] if _nullable(column) else [ordered]
+
+
+def _after(columns: Sequence, values: Sequence[Any], descending: bool):
+    # Expanded row comparison: (a, b) < (x, y)  ==  a < x OR (a = x AND b < y).
+    # MySQL uses a composite index for this form but not for tuple_() < tuple_().
+    # With NULLs last, "past" a value also means NULL, and nothing is past NULL.
+    clauses = []
+    for i, column in enumerate(columns):
+        value = values[i]
+        if value is None:
+            continue
+        past = column < value if descending else column > value
+        if _nullable(column):
+            past = or_(past, column.is_(None))
+        same = [c.is_(None) if v is None else c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*same, past))
+    return or_(*clauses) if clauses else false()
+
+
+def paginate(
+    query,
+    columns: Sequence,
+    types: Sequence[type],
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> Tuple[list, Optional[str]]:
+    """One page of ``query`` ordered by ``columns`` plus the cursor for the next page
+
+    With a cursor the page starts right after the row it encodes (keyset);
+    without one ``offset`` is used as before. Either way the next cursor is
+    returned, so an offset client can switch to cursors at any page.
+    """
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, types), descending))
+    order = [key for c in columns for key in _order(c, descending)]
+    query = query.order_by(*order).limit(limit + 1)
+    if not cursor and offset:
+        query = query.offset(offset)
+    items = query.all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, c.key) for c in columns])
+
+
+async def cached_total(name: str, key: str, count: Callable[[], int]) -> int:
+    """Row count for a list view, cached briefly and dropped when the table is written"""
+    async def load():
+        return count()
+
+    return await cache_service.get_or_set(
+        f"total:{name}:{key}", load, ttl=settings.ADMIN_TOTAL_TTL, tags=[count_tag(name)]
+    )
@@ -0,0 +1,86 @@
+"""Per-request CPU cost of sending a cached view: re-encoding vs stored bytes
+
+    python scripts/bench_responses.py [--rows 30 365] [--iterations 2000]
+
+"old" is the path before bodies were cached encoded: the cached dict goes
+through jsonable_encoder and JSONResponse (stdlib json) on every request,
+plus gzip when the client asks for it. "new" picks the stored variant of
+the cache entry and wraps it in a response.
+"""
+import argparse
+import gzip
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.services.cache_service import CacheEntry, encode_value
+from app.services.response_builder import build_market_results
+from app.utils.encoding import BROTLI, GZIP, IDENTITY, EncodedJSONResponse
+
+
+def sample_payload(rows: int) -> dict:
+    market = SimpleNamespace(sr_no=1, game="KALYAN")
+    start = date(2025, 12, 31)
+    results = [
+        SimpleNamespace(
+            result="123-68-459",
+            result_date=start - timedelta(days=i),
+            date=datetime(2025, 12, 31, 17, 30) - timedelta(days=i),
+        )
+        for i in range(rows)
+    ]
+    return build_market_results(market, results)
+
+
+def cpu_per_call(fn, iterations: int) -> float:
+    """Mean CPU microseconds per call"""
+    fn()
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def old_path(payload: dict, coding: str):
+    def send():
+        body = JSONResponse(jsonable_encoder(payload)).body
+        if coding == GZIP:
+            gzip.compress(body, compresslevel=6)
+    return send
+
+
+def new_path(entry: CacheEntry, coding: str):
+    def send():
+        body, used = entry.encoded(coding)
+        EncodedJSONResponse(body, encoding=used)
+    return send
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[30, 365])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'coding':>8} {'bytes':>8} {'old us':>9} {'new us':>9} {'speedup':>8}")
+    for rows in args.rows:
+        payload = sample_payload(rows)
+        body = encode_value(payload)
+        entry = CacheEntry(body=body, expires_at=time.monotonic() + 3600, value=payload)
+        entry.precompress()
+        for coding in (IDENTITY, GZIP, BROTLI):
+            if coding == BROTLI:
+                # The old path never sent brotli; compare against its gzip cost
+                old = cpu_per_call(old_path(payload, GZIP), args.iterations)
+            else:
+                old = cpu_per_call(old_path(payload, coding), args.iterations)
+            new = cpu_per_call(new_path(entry, coding), args.iterations)
+            size = len(entry.encoded(coding)[0])
+            print(f"{rows:>6} {coding:>8} {size:>8} {old:>9.1f} {new:>9.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
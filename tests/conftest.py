@@ -0,0 +1,202 @@
+import queue
+import threading
+import time
+
+import pytest
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.server.subscribe(channel, self)
+
+    def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.server.unsubscribe(self)
+
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.server, name)
+
+        def queue_call(*args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            return self
+        return queue_call
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+class FakeRedis:
+    """In-process stand-in for the pub/sub and key/value subset of redis.Redis"""
+
+    def __init__(self):
+        self.channels = {}
+        self.data = {}
+        self.expiry = {}
+        self.lock = threading.RLock()
+
+    # Key/value
+
+    def _live(self, key):
+        expires = self.expiry.get(key)
+        if expires is not None and time.monotonic() >= expires:
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        with self.lock:
+            return self.data[key] if self._live(key) else None
+
+    def mget(self, keys):
+        return [self.get(k) for k in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        with self.lock:
+            if nx and self._live(key):
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            self.expiry.pop(key, None)
+            if ex is not None:
+                self.expiry[key] = time.monotonic() + ex
+            return True
+
+    def delete(self, *keys):
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._live(key):
+                    removed += 1
+                self.data.pop(key, None)
+                self.expiry.pop(key, None)
+            return removed
+
+    def exists(self, key):
+        with self.lock:
+            return int(self._live(key))
+
+    def pttl(self, key):
+        with self.lock:
+            if not self._live(key):
+                return -2
+            expires = self.expiry.get(key)
+            return -1 if expires is None else int((expires - time.monotonic()) * 1000)
+
+    def expire(self, key, seconds):
+        with self.lock:
+            if not self._live(key):
+                return False
+            self.expiry[key] = time.monotonic() + seconds
+            return True
+
+    def sadd(self, key, *members):
+        with self.lock:
+            if not self._live(key):
+                self.data[key] = set()
+            self.data[key].update(m.encode() if isinstance(m, str) else m for m in members)
+
+    def smembers(self, key):
+        with self.lock:
+            return set(self.data[key]) if self._live(key) else set()
+
+    def eval(self, script, numkeys, key, token):
+        # Only the compare-and-delete unlock script is used
+        with self.lock:
+            if self.get(key) == token.encode():
+                return self.delete(key)
+            return 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    # Pub/sub
+
+    def subscribe(self, channel, pubsub):
+        with self.lock:
+            self.channels.setdefault(channel, set()).add(pubsub)
+
+    def unsubscribe(self, pubsub):
+        with self.lock:
+            for subscribers in self.channels.values():
+                subscribers.discard(pubsub)
+
+    def subscriber_count(self, channel):
+        with self.lock:
+            return len(self.channels.get(channel, ()))
+
+    def publish(self, channel, data):
+        with self.lock:
+            subscribers = list(self.channels.get(channel, ()))
+        for pubsub in subscribers:
+            pubsub.messages.put({"type": "message", "data": data})
+        return len(subscribers)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class SyncBackedSession:
+    """The AsyncSession calls the services make, run on a sync Session
+
+    aiosqlite is not a dependency, so async routes are tested on sqlite
+    through this.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, obj):
+        self.sync_session.add(obj)
+
+    async def execute(self, statement):
+        return self.sync_session.execute(statement)
+
+    async def scalar(self, statement):
+        return self.sync_session.scalar(statement)
+
+    async def run_sync(self, fn):
+        return fn(self.sync_session)
+
+    async def refresh(self, obj):
+        self.sync_session.refresh(obj)
+
+    async def commit(self):
+        self.sync_session.commit()
+
+    async def rollback(self):
+        self.sync_session.rollback()
+
+
+@pytest.fixture
+def sync_backed_session():
+    return SyncBackedSession
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def no_n_plus_one():
+    """Profile the test's queries and fail it if a statement shape repeats like an N+1 loop"""
+    from app.core.sql_profiler import profile_queries
+
+    with profile_queries("test") as profile:
+        yield profile
+    assert not profile.repeated(), f"possible N+1 queries: {profile.repeated()}"
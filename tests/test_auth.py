@@ -0,0 +1,63 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app.core.database import get_async_db
+from app.core.security import hash_password
+from app.models import User
+from app.routes import auth
+from app.services import cache_tags
+
+
+@pytest.fixture
+def login(monkeypatch, sync_backed_session):
+    monkeypatch.setattr(cache_tags.cache_service, "invalidate_tags", lambda tags: None)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    User.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(User(username="user1", mobile="9999999999", password=hash_password("pass"), status=1))
+    session.add(User(username="idle", mobile="9999999998", password=hash_password("pass"), status=0))
+    session.commit()
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+    app.dependency_overrides[get_async_db] = lambda: sync_backed_session(Session())
+    yield TestClient(app), session
+    session.close()
+
+
+def test_user_login(login):
+    client, _ = login
+    response = client.post("/auth/login/user", json={"username": "user1", "password": "pass"})
+    assert response.status_code == 200
+    token = response.json()["data"]["access_token"]
+    assert jwt.get_unverified_claims(token)["username"] == "user1"
+    assert client.post("/auth/login/user", json={"username": "user1", "password": "nope"}).status_code == 401
+    assert client.post("/auth/login/user", json={"username": "ghost", "password": "pass"}).status_code == 401
+    assert client.post("/auth/login/user", json={"username": "idle", "password": "pass"}).status_code == 403
+
+
+def test_first_admin_login_creates_the_admin(login):
+    client, session = login
+    response = client.post("/auth/login/admin", json={"username": "admin", "password": "admin"})
+    assert response.status_code == 200
+    assert jwt.get_unverified_claims(response.json()["data"]["access_token"])["role"] == "admin"
+    assert session.scalar(select(User.status).where(User.username == "admin")) == 1
+    assert client.post("/auth/login/admin", json={"username": "admin", "password": "x"}).status_code == 401
+    assert client.post("/auth/login/admin", json={"username": "user1", "password": "pass"}).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_opens_a_session_per_request():
+    dependency = get_async_db(Request({"type": "http", "headers": []}))
+    db = await dependency.__anext__()
+    assert isinstance(db, AsyncSession)
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
@@ -0,0 +1,90 @@
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.database import SharedAsyncSession, get_async_db
+from app.routes import batch
+
+
+def _client():
+    calls = []
+    app = FastAPI()
+    app.include_router(batch.router, prefix="/batch")
+
+    @app.get("/markets/{market_id}")
+    async def market(market_id: int, days: int = 7, db=Depends(get_async_db)):
+        calls.append(db)
+        return {"market_id": market_id, "days": days}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Market not found")
+
+    return TestClient(app), calls
+
+
+def test_sub_requests_share_a_session_and_keep_their_own_status():
+    client, calls = _client()
+    resp = client.post("/batch", json={"requests": [
+        {"id": "a", "path": "/markets/1?days=30"},
+        {"id": "b", "path": "/markets/2"},
+        {"id": "again", "path": "/markets/1?days=30"},
+        {"id": "gone", "path": "/missing"},
+    ]})
+    assert resp.status_code == 200
+    by_id = {r["id"]: r for r in resp.json()["data"]["responses"]}
+    assert by_id["a"]["body"] == by_id["again"]["body"] == {"market_id": 1, "days": 30}
+    assert by_id["b"]["status"] == 200 and by_id["b"]["body"]["days"] == 7
+    assert by_id["gone"]["status"] == 404 and by_id["gone"]["body"] == {"detail": "Market not found"}
+    # The repeated path ran once, and both runs used the batch's one session
+    assert len(calls) == 2 and calls[0] is calls[1]
+    assert isinstance(calls[0], SharedAsyncSession)
+
+
+def test_streams_and_external_urls_are_rejected():
+    client, _ = _client()
+    for path in ("/results/stream", "/batch", "//example.com/x"):
+        assert client.post("/batch", json={"requests": [{"path": path}]}).status_code == 400
+
+
+def test_timeout_mid_statement_abandons_the_shared_session(monkeypatch):
+    import asyncio
+
+    from app.core.config import settings
+
+    class FakeSession:
+        invalidated = False
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement):
+            if statement == "slow":
+                await asyncio.sleep(10)
+            return statement
+
+        async def invalidate(self):
+            FakeSession.invalidated = True
+
+    monkeypatch.setattr(batch, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(settings, "BATCH_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "BATCH_MAX_CONCURRENCY", 1)
+    app = FastAPI()
+    app.include_router(batch.router, prefix="/batch")
+
+    @app.get("/query/{statement}")
+    async def query(statement: str, db=Depends(get_async_db)):
+        return {"result": await db.execute(statement)}
+
+    resp = TestClient(app).post("/batch", json={"requests": [
+        {"id": "fast", "path": "/query/fast"},
+        {"id": "slow", "path": "/query/slow"},
+        {"id": "queued", "path": "/query/after"},
+    ]})
+    by_id = {r["id"]: r for r in resp.json()["data"]["responses"]}
+    assert by_id["fast"]["status"] == 200
+    assert by_id["slow"]["status"] == 504
+    assert by_id["queued"]["status"] == 503
+    assert FakeSession.invalidated
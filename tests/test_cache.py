@@ -0,0 +1,246 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.circuit import CircuitBreaker, CircuitOpenError
+from app.services.cache_service import FALLBACK, FRESH, STALE, CacheEntry, CacheService, LocalCache
+
+
+def _entry(body: bytes, ttl: float = 60, tags=()):
+    return CacheEntry(body=body, expires_at=time.monotonic() + ttl, tags=tuple(tags))
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, max_bytes=1024)
+    local.set("a", _entry(b"1"))
+    local.set("b", _entry(b"2"))
+    local.get("a")
+    local.set("c", _entry(b"3"))
+    assert local.get("b") is None
+    assert local.get("a") is not None
+    assert local.get("c") is not None
+
+
+def test_local_cache_respects_byte_budget_and_ttl():
+    local = LocalCache(max_entries=10, max_bytes=8)
+    local.set("a", _entry(b"12345"))
+    local.set("b", _entry(b"6789"))
+    assert local.get("a") is None
+    assert local.size_bytes == 4
+    local.set("c", _entry(b"x", ttl=-1))
+    assert local.get("c") is None
+
+
+def test_local_cache_invalidates_by_tag():
+    local = LocalCache(max_entries=10, max_bytes=1024)
+    local.set("a", _entry(b"1", tags=["market:1", "date:2025-12-06"]))
+    local.set("b", _entry(b"2", tags=["market:2"]))
+    assert local.invalidate_tags(["date:2025-12-06"]) == 1
+    assert local.get("a") is None
+    assert local.get("b") is not None
+
+
+@pytest.mark.asyncio
+async def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    threads = []
+    precompress = CacheEntry.precompress
+
+    def record(entry):
+        threads.append(threading.get_ident())
+        precompress(entry)
+
+    monkeypatch.setattr(CacheEntry, "precompress", record)
+    cache = CacheService(redis_client=None)
+    entry = await cache.set("big", {"rows": ["x" * 40] * 200})
+    assert set(entry.variants) == {"br", "gzip"}
+    assert threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_reads_through_once():
+    cache = CacheService(redis_client=None)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return {"count": len(calls)}
+
+    assert await cache.get_or_set("k", load, tags=["market:1"]) == {"count": 1}
+    assert await cache.get_or_set("k", load, tags=["market:1"]) == {"count": 1}
+    cache.invalidate_tags(["market:1"])
+    assert await cache.get_or_set("k", load, tags=["market:1"]) == {"count": 2}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = CacheService(redis_client=None)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    results = await asyncio.gather(*[cache.get_or_set("hot", load) for _ in range(20)])
+    assert results == [{"value": 1}] * 20
+    assert calls == [1]
+    assert cache.stats["loads"] == 1
+    assert cache.stats["coalesced_local"] == 19
+
+
+@pytest.mark.asyncio
+async def test_load_racing_an_invalidation_is_not_stored():
+    cache = CacheService(redis_client=None)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        if len(calls) == 1:
+            # A write commits while the first load still holds pre-write rows
+            cache.invalidate_tags(["market:1"])
+        return {"count": len(calls)}
+
+    assert await cache.get_or_set("k", load, tags=["market:1"]) == {"count": 1}
+    assert cache.stats["discarded_loads"] == 1
+    assert await cache.get_or_set("k", load, tags=["market:1"]) == {"count": 2}
+    assert await cache.get_or_set("k", load, tags=["market:1"]) == {"count": 2}
+
+
+@pytest.mark.asyncio
+async def test_failed_load_reaches_every_waiter_then_retries():
+    cache = CacheService(redis_client=None)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    outcomes = await asyncio.gather(*[cache.get_or_set("k", fail) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+
+    async def load():
+        return {"ok": True}
+
+    assert await cache.get_or_set("k", load) == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_workers_coalesce_through_the_redis_lock(fake_redis):
+    first = CacheService(redis_client=fake_redis)
+    second = CacheService(redis_client=fake_redis)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"value": len(calls)}
+
+    a, b = await asyncio.gather(first.get_or_set("hot", load), second.get_or_set("hot", load))
+    assert a == b == {"value": 1}
+    assert calls == [1]
+    assert first.stats["coalesced_remote"] + second.stats["coalesced_remote"] == 1
+    assert not fake_redis.exists("smboss:lock:hot")
+
+
+@pytest.mark.asyncio
+async def test_invalidation_on_the_event_loop_leaves_redis_to_a_thread(fake_redis):
+    cache = CacheService(redis_client=fake_redis)
+    await cache.set("k", {"v": 1}, tags=["market:1"])
+    before = await cache.tag_versions(["market:1"])
+    threads = []
+    bump = cache._redis_bump
+    cache._redis_bump = lambda versions: (threads.append(threading.get_ident()), bump(versions))
+
+    cache.invalidate_tags(["market:1"])
+    assert await cache.get("k") is None
+    # Redis may not have the bump yet, but this worker never reads back the old token
+    assert await cache.tag_versions(["market:1"], memoized=False) != before
+    cache._invalidator.submit(lambda: None).result()
+    assert threads and threads[0] != threading.get_ident()
+    assert fake_redis.get("smboss:ver:market:1").decode() == (await cache.tag_versions(["market:1"]))["market:1"]
+
+
+@pytest.mark.asyncio
+async def test_bump_in_the_same_millisecond_is_not_lost_to_redis(fake_redis, monkeypatch):
+    cache = CacheService(redis_client=fake_redis)
+    monkeypatch.setattr(time, "time", lambda: 1700000000.0)
+    before = await cache.tag_versions(["market:1"], memoized=False)
+    gate = threading.Event()
+    cache._invalidator.submit(gate.wait)
+    try:
+        cache.invalidate_tags(["market:1"])
+        assert await cache.tag_versions(["market:1"], memoized=False) != before
+    finally:
+        gate.set()
+
+
+@pytest.mark.asyncio
+async def test_invalidated_copy_is_not_readopted_before_the_redis_delete(fake_redis):
+    cache = CacheService(redis_client=fake_redis)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"version": len(loads)}
+
+    assert (await cache.fetch("k", load, tags=["market:1"])).value == {"version": 1}
+    # Hold the background thread so Redis still has the pre-write copy
+    gate = threading.Event()
+    cache._invalidator.submit(gate.wait)
+    try:
+        cache.invalidate_tags(["market:1"])
+        result = await cache.fetch("k", load, tags=["market:1"])
+        assert result.state == FRESH and result.value == {"version": 2}
+    finally:
+        gate.set()
+    cache._invalidator.submit(lambda: None).result()
+    assert (await cache.fetch("k", load, tags=["market:1"])).value == {"version": 2}
+    assert loads == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = CacheService(redis_client=None, stale_ttl=30, stale_if_error_ttl=300)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.02)
+        return {"version": len(loads)}
+
+    assert (await cache.fetch("k", load)).state == FRESH
+    cache.local.peek("k").expires_at = time.monotonic() - 1
+
+    stale = await asyncio.gather(*[cache.fetch("k", load) for _ in range(5)])
+    assert {(r.state, r.value["version"]) for r in stale} == {(STALE, 1)}
+    await asyncio.sleep(0.1)
+    refreshed = await cache.fetch("k", load)
+    assert (refreshed.state, refreshed.value) == (FRESH, {"version": 2})
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_last_good_copy_is_served_when_the_database_is_down():
+    cache = CacheService(redis_client=None, stale_ttl=30, stale_if_error_ttl=300)
+    circuit = CircuitBreaker("db", failure_threshold=1, reset_after=60, failures=(ConnectionError,))
+    calls = []
+
+    async def good():
+        return {"ok": 1}
+
+    async def down():
+        calls.append(1)
+        raise ConnectionError("pool exhausted")
+
+    await cache.fetch("k", good, tags=["market:1"], circuit=circuit)
+    cache.invalidate_tags(["market:1"])
+
+    first = await cache.fetch("k", down, tags=["market:1"], circuit=circuit)
+    assert (first.state, first.value) == (FALLBACK, {"ok": 1})
+    assert circuit.state == "open"
+    second = await cache.fetch("k", down, tags=["market:1"], circuit=circuit)
+    assert second.state == FALLBACK
+    assert calls == [1]
+    with pytest.raises(CircuitOpenError):
+        await cache.fetch("other", down, circuit=circuit)
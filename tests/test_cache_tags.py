@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game, MarketLiveState, Rashi, Result
+from app.services import cache_tags
+
+
+@pytest.fixture
+def tagged_db(monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(cache_tags.cache_service, "invalidate_tags", lambda tags: invalidated.append(list(tags)))
+    engine = create_engine("sqlite://")
+    for model in (Game, Result, Rashi, MarketLiveState):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add(Game(id=1, sr_no=1, game="KALYAN", status=1))
+    session.commit()
+    invalidated.clear()
+    yield session, invalidated
+    session.close()
+
+
+def test_writes_invalidate_derived_tags_on_commit(tagged_db):
+    session, invalidated = tagged_db
+    result = Result(id=1, sr_no=1, market_id=1, result="123-68-459", result_date=date(2025, 12, 1))
+    session.add(result)
+    session.flush()
+    assert invalidated == []
+    session.commit()
+    assert invalidated == [["board", "date:2025-12-01", "market:1"]]
+
+    # Moving a result dirties the views it leaves as well as the ones it joins
+    result = session.query(Result).filter(Result.sr_no == 1).one()
+    result.result_date = date(2025, 12, 2)
+    session.commit()
+    assert invalidated[-1] == ["board", "date:2025-12-01", "date:2025-12-02", "market:1"]
+
+    session.add(Rashi(id=1, sr_no=1, rashi_name="Mesh", result="12", result_date=date(2025, 12, 2)))
+    session.delete(session.query(Game).filter(Game.sr_no == 1).one())
+    session.commit()
+    assert invalidated[-1] == ["board", "count:rashi", "market:1", "markets", "rashi:2025-12-02"]
+
+
+def test_rollback_discards_collected_tags(tagged_db):
+    session, invalidated = tagged_db
+    session.add(Result(id=2, sr_no=2, market_id=1, result="123-68-459", result_date=date(2025, 12, 1)))
+    session.flush()
+    session.rollback()
+    cache_tags.invalidate_on_commit(session, ["offers"])
+    session.commit()
+    assert invalidated == [["offers"]]
@@ -0,0 +1,58 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.jobs import cache_warmer
+from app.jobs.cache_warmer import CacheWarmer
+from app.models import Game, MarketLiveState, Offer, Rashi, Result
+from app.services import cache_tags, live_state  # noqa: F401 - registers the listeners
+from app.services.cache_service import CacheService, market_tag
+from app.services.response_builder import market_results_key, public_home_key, public_markets_key
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(cache_tags.cache_service, "invalidate_tags", lambda tags: None)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for model in (Game, Result, Rashi, Offer, MarketLiveState):
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    for n in (1, 2):
+        session.add(Game(id=n, sr_no=n, game=f"M{n}", open_time=time(10), close_time=time(11), status=1))
+    session.add(Result(id=1, sr_no=1, market_id=1, result="123-6", result_date=date.today()))
+    session.commit()
+    session.close()
+
+    cache = CacheService(redis_client=None)
+    monkeypatch.setattr(cache_warmer, "SessionLocal", Session)
+    monkeypatch.setattr(cache_warmer, "cache_service", cache)
+    return cache
+
+
+def test_warm_stores_the_public_views(cache):
+    report = CacheWarmer.warm_cache()
+    keys = {item["key"] for item in report}
+    today = date.today()
+    assert {public_markets_key(), public_home_key(today), market_results_key(1), market_results_key(2)} <= keys
+    assert len(report) == 8
+    assert "123-6" in cache.local.get(market_results_key(1)).body.decode()
+
+
+def test_write_during_warm_is_not_stored(cache, monkeypatch):
+    recent = CacheWarmer._recent_results
+
+    def racing(db, market_ids, limit):
+        rows = recent(db, market_ids, limit)
+        # A result for market 1 commits after the history query read its rows
+        cache.invalidate_tags([market_tag(1)])
+        return rows
+
+    monkeypatch.setattr(CacheWarmer, "_recent_results", staticmethod(racing))
+    keys = {item["key"] for item in CacheWarmer.warm_cache()}
+    assert market_results_key(1) not in keys
+    assert cache.local.peek(market_results_key(1)) is None
+    assert market_results_key(2) in keys and public_home_key(date.today()) in keys
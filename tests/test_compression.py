@@ -0,0 +1,77 @@
+import zlib
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, _StreamCompressor
+from app.utils.encoding import EncodedJSONResponse, select_encoding
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    async def big():
+        return {"digits": "1234567890" * 50}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/packed")
+    async def packed():
+        return EncodedJSONResponse(brotli.compress(b'{"stored":true}'), encoding="br")
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(3):
+                yield f"{i},2025-12-0{i + 1},123-68-459\n"
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    @app.get("/raw")
+    async def raw():
+        return PlainTextResponse("x" * 500, headers={"Content-Type": "image/png"})
+
+    return TestClient(app)
+
+
+def test_negotiation_honours_q_values():
+    assert select_encoding("gzip, deflate, br") == "br"
+    assert select_encoding("br;q=0.5, gzip") == "gzip"
+    assert select_encoding("br;q=0, *") == "gzip"
+    assert select_encoding("deflate") == "identity"
+    assert select_encoding(None) == "identity"
+
+
+def test_threshold_precompressed_and_skipped_types():
+    client = _client()
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip" and big.headers["vary"] == "Accept-Encoding"
+    assert int(big.headers["content-length"]) < 500
+    assert big.json() == {"digits": "1234567890" * 50}
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/raw", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+    # Already encoded bodies are not compressed again, even for another coding
+    packed = client.get("/packed", headers={"Accept-Encoding": "br"})
+    assert packed.headers["content-encoding"] == "br" and packed.json() == {"stored": True}
+
+
+def test_streamed_body_is_compressed_per_chunk():
+    response = _client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text.splitlines()[2] == "2,2025-12-03,123-68-459"
+
+    for encoding, decoder in (("gzip", zlib.decompressobj(16 + zlib.MAX_WBITS)), ("br", brotli.Decompressor())):
+        stream = _StreamCompressor(encoding, 6, 4)
+        decompress = decoder.decompress if encoding == "gzip" else decoder.process
+        # Every flushed chunk decodes fully before the stream ends
+        assert decompress(stream.chunk(b"event: created\n\n")) == b"event: created\n\n"
+        assert decompress(stream.chunk(b"data: {}\n\n") + stream.finish()) == b"data: {}\n\n"
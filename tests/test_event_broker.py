@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.event_broker import EventBroker
+
+
+async def _wait_for_subscribers(server, channel, count):
+    for _ in range(100):
+        if server.subscriber_count(channel) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_every_subscriber():
+    broker = EventBroker()
+    await broker.start()
+    first, second = broker.subscribe(), broker.subscribe()
+    broker.publish({"type": "created", "market_id": 1})
+    assert (await first.get())["market_id"] == 1
+    assert (await second.get())["market_id"] == 1
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_from_worker_thread_reaches_loop():
+    broker = EventBroker()
+    await broker.start()
+    queue = broker.subscribe()
+    thread = threading.Thread(target=broker.publish, args=({"type": "updated", "market_id": 2},))
+    thread.start()
+    thread.join()
+    event = await asyncio.wait_for(queue.get(), timeout=1)
+    assert event["type"] == "updated"
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_relay_delivers_to_other_workers(fake_redis):
+    sender, receiver = EventBroker(fake_redis, "events"), EventBroker(fake_redis, "events")
+    # Both brokers live in this process; give the receiver its own worker id
+    receiver.relay.origin = "other-worker"
+    await sender.start()
+    await receiver.start()
+    await _wait_for_subscribers(fake_redis, "events", 2)
+    local, remote = sender.subscribe(), receiver.subscribe()
+    sender.publish({"type": "created", "market_id": 3})
+
+    assert (await asyncio.wait_for(local.get(), timeout=1))["market_id"] == 3
+    assert (await asyncio.wait_for(remote.get(), timeout=2))["market_id"] == 3
+    assert local.empty()
+    await sender.stop()
+    await receiver.stop()
@@ -0,0 +1,42 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.services.export_service import encode_batches, export_query, parse_columns
+
+
+async def _batches(*batches):
+    for rows in batches:
+        yield rows
+
+
+async def _collect(chunks):
+    return "".join([c async for c in chunks])
+
+
+@pytest.mark.asyncio
+async def test_csv_and_ndjson_encode_batches_in_order():
+    columns = parse_columns("market_id,result_date,jodi,open_panna,timestamp")
+    first = [(1, date(2025, 12, 5), 5, 23, datetime(2025, 12, 5, 10, 0))]
+    second = [(1, date(2025, 12, 6), None, None, datetime(2025, 12, 6, 10, 0))]
+
+    text = await _collect(encode_batches("csv", columns, _batches(first, second)))
+    assert text.splitlines() == [
+        "market_id,result_date,jodi,open_panna,timestamp",
+        "1,2025-12-05,05,023,2025-12-05T10:00:00",
+        "1,2025-12-06,,,2025-12-06T10:00:00",
+    ]
+
+    lines = (await _collect(encode_batches("ndjson", columns, _batches(first, second)))).splitlines()
+    assert [json.loads(l)["jodi"] for l in lines] == ["05", None]
+
+
+def test_column_filter_is_validated_and_shapes_the_query():
+    with pytest.raises(ValueError):
+        parse_columns("market_id,password")
+    assert parse_columns(None) == ["market_id", "market_name", "result_date", "result"]
+
+    sql = str(export_query(["market_id", "result"], [1, 2], date(2025, 1, 1)))
+    assert "JOIN" not in sql and "game_results.market_id IN" in sql
+    assert "JOIN game" in str(export_query(["market_name"]))
@@ -0,0 +1,77 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services.cache_service import CacheService
+from app.utils import http_cache
+
+
+def _client(monkeypatch):
+    cache = CacheService(redis_client=None)
+    monkeypatch.setattr(http_cache, "cache_service", cache)
+    loads = []
+    app = FastAPI()
+
+    @app.get("/view")
+    async def view(request: Request):
+        async def load(db):
+            loads.append(1)
+            return {"loads": len(loads)}
+        return await http_cache.conditional_view(request, "view", ["market:1"], load)
+
+    return TestClient(app), cache, loads
+
+
+def test_matching_etag_gets_304_without_loading(monkeypatch):
+    client, cache, loads = _client(monkeypatch)
+    first = client.get("/view")
+    assert first.status_code == 200 and first.json() == {"loads": 1}
+    etag = first.headers["etag"]
+
+    again = client.get("/view", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    cache.clear_local()
+    assert client.get("/view", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    assert loads == [1]
+
+    cache.invalidate_tags(["market:1"])
+    changed = client.get("/view", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json() == {"loads": 2}
+    assert changed.headers["etag"] != etag
+
+
+def test_if_modified_since_uses_tag_version_time(monkeypatch):
+    client, cache, _ = _client(monkeypatch)
+    last_modified = client.get("/view").headers["last-modified"]
+    assert client.get("/view", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/view", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+
+
+def test_hits_send_stored_compressed_bytes(monkeypatch):
+    import brotli
+
+    cache = CacheService(redis_client=None)
+    monkeypatch.setattr(http_cache, "cache_service", cache)
+    app = FastAPI()
+    rows = [{"result": "123-68-459", "result_date": f"2025-12-{d:02d}"} for d in range(1, 29)]
+
+    @app.get("/history")
+    async def history(request: Request):
+        async def load(db):
+            return {"results": rows}
+        return await http_cache.conditional_view(request, "history", ["market:1"], load)
+
+    client = TestClient(app)
+    plain = client.get("/history", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.json() == {"results": rows}
+
+    entry = cache.local.peek("history")
+    assert set(entry.variants) == {"br", "gzip"}
+    # A hit must not serialize again; a poisoned value would show up in the body
+    entry.value = {"results": []}
+    packed = client.get("/history", headers={"Accept-Encoding": "gzip;q=0.5, br"})
+    assert packed.headers["content-encoding"] == "br"
+    assert packed.headers["vary"] == "Accept-Encoding"
+    assert brotli.decompress(entry.variants["br"]) == plain.content
+    assert packed.json() == {"results": rows}
+    assert packed.headers["etag"] != plain.headers["etag"]
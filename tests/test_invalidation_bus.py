@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from app.services.cache_service import CacheService
+from app.services.invalidation_bus import InvalidationBus, MemoryHub
+
+
+def _wait_until(check, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.asyncio
+async def test_memory_hub_applies_peer_invalidations_only():
+    hub = MemoryHub()
+    first = CacheService(redis_client=None, bus=InvalidationBus(hub=hub))
+    second = CacheService(redis_client=None, bus=InvalidationBus(hub=hub))
+    await first.set("k", {"v": 1}, tags=["market:1"])
+    await second.set("k", {"v": 1}, tags=["market:1"])
+
+    first.invalidate_tags(["market:1"])
+    assert await second.get("k") is None
+    assert second.bus.stats["received"] == 1
+    assert first.bus.stats["received"] == 0
+    assert await second.tag_versions(["market:1"]) == await first.tag_versions(["market:1"])
+
+
+@pytest.mark.asyncio
+async def test_redis_bus_reaches_other_workers(fake_redis):
+    sender_bus = InvalidationBus(redis_client=fake_redis, channel="invalidate")
+    receiver_bus = InvalidationBus(redis_client=fake_redis, channel="invalidate")
+    receiver_bus.relay.origin = "other-worker"
+    sender = CacheService(redis_client=None, bus=sender_bus)
+    receiver = CacheService(redis_client=None, bus=receiver_bus)
+    dropped = []
+    receiver_bus.subscribe(lambda tags, versions: dropped.extend(tags))
+    receiver_bus.start()
+    try:
+        assert _wait_until(lambda: fake_redis.subscriber_count("invalidate") == 1)
+        await receiver.set("public:results:2025-12-06", {"v": 1}, tags=["date:2025-12-06"])
+        sender.invalidate_tags(["date:2025-12-06"])
+        assert _wait_until(lambda: dropped == ["date:2025-12-06"])
+        assert await receiver.get("public:results:2025-12-06") is None
+        assert await receiver.tag_versions(["date:2025-12-06"]) == await sender.tag_versions(["date:2025-12-06"])
+    finally:
+        receiver_bus.stop()
@@ -0,0 +1,91 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Game, MarketLiveState, Result
+from app.services import cache_tags, live_state  # noqa: F401 - registers the listeners
+
+
+@pytest.fixture
+def board_db(monkeypatch):
+    monkeypatch.setattr(cache_tags.cache_service, "invalidate_tags", lambda tags: None)
+    engine = create_engine("sqlite://")
+    for model in (Game, Result, MarketLiveState):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add(Game(id=1, sr_no=1, game="KALYAN", open_time=time(15, 45), close_time=time(17, 45), status=1))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _state(session):
+    session.expire_all()
+    return session.query(MarketLiveState).filter(MarketLiveState.market_id == 1).one_or_none()
+
+
+def test_projection_follows_result_writes(board_db):
+    state = _state(board_db)
+    assert state.game == "KALYAN" and state.result is None and state.version == 1
+
+    board_db.add(Result(id=1, sr_no=1, market_id=1, result="123-6", result_date=date(2025, 12, 2)))
+    board_db.commit()
+    state = _state(board_db)
+    assert (state.result, state.open_declared, state.close_declared, state.version) == ("123-6", True, False, 2)
+
+    latest = board_db.query(Result).filter(Result.sr_no == 1).one()
+    latest.result = "123-68-459"
+    board_db.add(Result(id=2, sr_no=2, market_id=1, result="550-03-346", result_date=date(2025, 12, 1)))
+    board_db.commit()
+    state = _state(board_db)
+    assert (state.result, state.result_date, state.close_declared) == ("123-68-459", date(2025, 12, 2), True)
+
+    # A rolled back write leaves the projection as it was
+    board_db.delete(board_db.query(Result).filter(Result.sr_no == 1).one())
+    board_db.flush()
+    board_db.rollback()
+    assert _state(board_db).result == "123-68-459"
+
+    board_db.delete(board_db.query(Result).filter(Result.sr_no == 1).one())
+    board_db.commit()
+    assert _state(board_db).result == "550-03-346"
+
+    board_db.delete(board_db.query(Game).filter(Game.sr_no == 1).one())
+    board_db.commit()
+    assert _state(board_db) is None
+
+
+def test_market_row_is_locked_before_its_results_are_written(board_db):
+    from sqlalchemy import event
+    from sqlalchemy.dialects import mysql
+
+    from app.services.live_state import STATE, lock_live_state
+
+    statements = []
+    engine = board_db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        board_db.add(Result(id=1, sr_no=1, market_id=1, result="123-6", result_date=date(2025, 12, 2)))
+        board_db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    lock = next(i for i, s in enumerate(statements) if s.startswith("SELECT market_live_state.market_id"))
+    insert = next(i for i, s in enumerate(statements) if s.startswith("INSERT INTO game_results"))
+    assert lock < insert
+
+    # sqlite has no row locks; on MySQL the same statement takes them
+    captured = []
+
+    class Recorder:
+        def execute(self, stmt):
+            captured.append(str(stmt.compile(dialect=mysql.dialect())))
+            return self
+
+        def all(self):
+            return []
+
+    lock_live_state(Recorder(), [2, 1])
+    assert captured[0].endswith("FOR UPDATE") and STATE.name in captured[0]
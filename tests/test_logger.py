@@ -0,0 +1,39 @@
+import json
+import sys
+import logging
+
+from app.utils import logger as logger_module
+from app.utils.logger import SamplingFilter, make_formatter, parse_sampling, setup_logger
+
+
+def _record(name, level=logging.INFO, msg="hit %s", args=("k",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_setup_logger_installs_one_pipeline():
+    setup_logger("app.one")
+    setup_logger("app.two")
+    queued = [h for h in logging.getLogger().handlers if isinstance(h, logger_module._QueueHandler)]
+    assert len(queued) == 1
+    assert not logging.getLogger("app.one").handlers
+
+
+def test_sampling_keeps_every_nth_below_warning():
+    sampler = SamplingFilter(parse_sampling("app.services=0.5, app.services.cache_service=0.25"))
+    kept = [sampler.filter(_record("app.services.cache_service.x")) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert [sampler.filter(_record("app.services.analysis")) for _ in range(4)].count(True) == 2
+    assert all(sampler.filter(_record("app.services.cache_service", logging.WARNING)) for _ in range(3))
+    assert sampler.filter(_record("app.routes"))
+
+
+def test_json_lines_carry_resolved_message_and_traceback():
+    handler = logger_module._QueueHandler(None)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = _record("app.x", logging.ERROR)
+        record.exc_info = sys.exc_info()
+    line = json.loads(make_formatter("json").format(handler.prepare(record)))
+    assert line["message"] == "hit k" and line["level"] == "ERROR" and line["logger"] == "app.x"
+    assert "ValueError: boom" in line["exc_info"]
@@ -0,0 +1,62 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import Registry, http_latency, http_requests
+from app.middleware.metrics import UNMATCHED, MetricsMiddleware
+from app.routes import health
+
+
+def test_requests_are_recorded_under_their_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/probe/{item_id}")
+    async def probe(item_id: int):
+        return {"item_id": item_id}
+
+    client = TestClient(app)
+    before = http_requests.value("GET", "/probe/{item_id}", "200")
+    seen = http_latency.count("GET", "/probe/{item_id}")
+    client.get("/probe/1")
+    client.get("/probe/2")
+    client.get("/no/such/path")
+    assert http_requests.value("GET", "/probe/{item_id}", "200") == before + 2
+    assert http_latency.count("GET", "/probe/{item_id}") == seen + 2
+    assert http_requests.value("GET", UNMATCHED, "404") >= 1
+
+
+def test_text_exposition():
+    registry = Registry(prefix="t_")
+    hits = registry.counter("hits_total", "Hits", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.callback("pool", "Pool", lambda: {("sync", "checked_out"): 3}, ("engine", "state"))
+    hits.inc('/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(7)
+    lines = registry.render().splitlines()
+    assert "# TYPE t_hits_total counter" in lines
+    assert 't_hits_total{route="/a\\"b"} 1' in lines
+    assert 't_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 't_latency_seconds_bucket{le="1"} 2' in lines
+    assert 't_latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "t_latency_seconds_count 3" in lines and "t_latency_seconds_sum 7.55" in lines
+    assert 't_pool{engine="sync",state="checked_out"} 3' in lines
+
+
+def test_metrics_endpoint_is_limited_to_local_scrapers(monkeypatch):
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)  # client address "testclient"
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    monkeypatch.setattr(settings, "METRICS_ALLOWED_CLIENTS", "127.0.0.1, testclient")
+    response = client.get("/metrics")
+    assert response.status_code == 200 and "# TYPE" in response.text
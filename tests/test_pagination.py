@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.auditlog import AuditLog
+from app.utils.pagination import decode_cursor, encode_cursor, paginate
+
+
+@pytest.fixture
+def audit_db():
+    engine = create_engine("sqlite://")
+    AuditLog.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2025, 12, 1, 12, 0, 0)
+    for i in range(25):
+        # Groups of three rows share a timestamp so the sr_no tie-break matters
+        session.add(AuditLog(id=i + 1, sr_no=i + 1, action="update", entity_type="result", timestamp=start + timedelta(minutes=i // 3)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cursor_pages_match_offset_pages(audit_db):
+    columns, types = [AuditLog.timestamp, AuditLog.sr_no], [datetime, int]
+    by_offset = []
+    for offset in range(0, 25, 7):
+        page, _ = paginate(audit_db.query(AuditLog), columns, types, 7, offset=offset)
+        by_offset += [row.sr_no for row in page]
+
+    by_cursor, cursor = [], None
+    while True:
+        page, cursor = paginate(audit_db.query(AuditLog), columns, types, 7, cursor=cursor)
+        by_cursor += [row.sr_no for row in page]
+        if cursor is None:
+            break
+    assert by_cursor == by_offset == list(range(25, 0, -1))
+
+
+def test_null_sort_keys_page_last(audit_db):
+    for i in range(26, 31):
+        audit_db.add(AuditLog(id=i, sr_no=i, action="update", entity_type="result"))
+    audit_db.flush()
+    # Rows written outside the ORM default can carry no timestamp
+    audit_db.query(AuditLog).filter(AuditLog.sr_no > 25).update({AuditLog.timestamp: None})
+    audit_db.commit()
+    columns, types = [AuditLog.timestamp, AuditLog.sr_no], [datetime, int]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        # Page size 4 ends pages both on and after NULL timestamps
+        page, cursor = paginate(audit_db.query(AuditLog), columns, types, 4, cursor=cursor)
+        seen += [row.sr_no for row in page]
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == list(range(25, 0, -1)) + list(range(30, 25, -1))
+    assert pages == 8
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = encode_cursor([datetime(2025, 12, 1, 12, 30), 7])
+    assert decode_cursor(cursor, [datetime, int]) == (datetime(2025, 12, 1, 12, 30), 7)
+    assert decode_cursor(encode_cursor([None, 7]), [datetime, int]) == (None, 7)
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor", [datetime, int])
+    assert exc.value.status_code == 400
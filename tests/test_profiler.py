@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiler import ProfileRateLimiter, SamplingProfiler, profile_path
+from app.core.security import create_access_token
+from app.middleware.profiler import RequestProfilerMiddleware
+from app.routes import admin
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REQUEST_PROFILE_DIR", str(tmp_path))
+    app = FastAPI()
+    app.add_middleware(RequestProfilerMiddleware)
+    app.include_router(admin.router, prefix="/admin")
+
+    # Async, so it runs on the (always sampled) event loop thread
+    @app.get("/slow")
+    async def slow():
+        _busy(0.05)
+        return {"ok": True}
+
+    @app.get("/results/stream")
+    async def stream():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def _auth(role):
+    return {"Authorization": f"Bearer {create_access_token({'sub': '1', 'role': role})}"}
+
+
+def test_admin_profile_is_stored_as_speedscope(client):
+    response = client.get("/slow", headers={"X-Profile": "1", **_auth("admin")})
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    profile_id = response.headers["x-profile-id"]
+    assert profile_path(profile_id) is not None
+
+    document = client.get(response.headers["x-profile-url"], headers=_auth("admin")).json()
+    frames = document["shared"]["frames"]
+    names = {frames[i]["name"] for p in document["profiles"] for s in p["samples"] for i in s}
+    assert "_busy" in names
+    assert client.get(response.headers["x-profile-url"], headers=_auth("user")).status_code == 403
+
+
+def test_profile_flag_requires_admin(client):
+    assert client.get("/slow", headers={"X-Profile": "1"}).status_code == 401
+    assert client.get("/slow", headers={"X-Profile": "1", **_auth("user")}).status_code == 403
+    plain = client.get("/slow", headers=_auth("user"))
+    assert plain.status_code == 200 and "x-profile-id" not in plain.headers
+
+
+def test_rate_limit():
+    limiter = ProfileRateLimiter(per_minute=2)
+    assert limiter.acquire()
+    assert not limiter.acquire()  # one profile at a time
+    limiter.release()
+    assert limiter.acquire()
+    limiter.release()
+    assert not limiter.acquire()  # two per minute
+
+
+def test_streaming_paths_are_not_profiled(client):
+    response = client.get("/results/stream", headers={"X-Profile": "1", **_auth("admin")})
+    assert response.status_code == 400 and "x-profile-id" not in response.headers
+
+
+def test_limiter_is_released_when_sampling_hits_the_cap():
+    limiter = ProfileRateLimiter(per_minute=5)
+    assert limiter.acquire()
+    profiler = SamplingProfiler(0.001, 0.01, on_finish=limiter.release)
+    profiler.start()
+    profiler._thread.join(1)  # the response is still running
+    assert limiter.acquire()
+    profiler.stop()  # must not free the slot taken by the second profile
+    assert not limiter.acquire()
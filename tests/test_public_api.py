@@ -1,6 +1,16 @@
+from datetime import date
+from types import SimpleNamespace
+
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.routes import public
+from app.services.cache_service import CacheService, date_tag
+from app.utils import http_cache
+from app.services.response_builder import (
+    build_public_home, build_public_markets, build_public_offers, build_public_rashi, build_public_results,
+)
 
 
 client = TestClient(app)
@@ -15,3 +25,49 @@ def test_offers():
     resp = client.get("/public/offers")
     assert resp.status_code == 200
 
+
+def test_home_snapshot_matches_the_single_views():
+    today = date(2025, 12, 6)
+    markets = [SimpleNamespace(sr_no=1, game="KALYAN", open_time=None, close_time=None)]
+    results = [SimpleNamespace(market_id=1, result="123-68-459", result_date=today)]
+    rashi = [SimpleNamespace(rashi_name="Mesh", result="12", result_date=today)]
+    offers = [SimpleNamespace(sr_no=1, title="Diwali", description=None, valid_from=today, valid_till=today)]
+    home = build_public_home(markets, results, rashi, offers, today)["data"]
+    assert home["markets"] == build_public_markets(markets)["data"]
+    assert home["results"] == build_public_results(results, today)["data"]
+    assert home["rashi"] == build_public_rashi(rashi, today)["data"]
+    assert home["offers"] == build_public_offers(offers)["data"]
+
+
+def test_home_endpoint_revalidates_and_rebuilds_on_its_tags(monkeypatch):
+    cache = CacheService(redis_client=None)
+    monkeypatch.setattr(http_cache, "cache_service", cache)
+    loads = []
+
+    async def markets(db):
+        loads.append(1)
+        return [SimpleNamespace(sr_no=1, game="KALYAN", open_time=None, close_time=None)]
+
+    async def nothing(db, day):
+        return []
+
+    monkeypatch.setattr(public, "_active_markets", markets)
+    for helper in ("_results_on", "_rashi_on", "_offers_on"):
+        monkeypatch.setattr(public, helper, nothing)
+    home_app = FastAPI()
+    home_app.include_router(public.router, prefix="/public")
+    home = TestClient(home_app)
+
+    first = home.get("/public/home")
+    assert first.status_code == 200 and first.json()["data"]["markets"]["count"] == 1
+    etag = first.headers["etag"]
+    assert home.get("/public/home", headers={"If-None-Match": etag}).status_code == 304
+    assert home.get("/public/home").headers["etag"] == etag
+    assert loads == [1]
+
+    for tag in ("offers", date_tag(public.datetime.now().date())):
+        cache.invalidate_tags([tag])
+        changed = home.get("/public/home", headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        etag = changed.headers["etag"]
+    assert len(loads) == 3
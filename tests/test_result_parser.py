@@ -0,0 +1,26 @@
+from app.core.result_parser import DOUBLE, SINGLE, TRIPLE, parse_result
+from app.utils.helpers import extract_jodi, extract_panna
+
+
+def test_parse_full_result():
+    parsed = parse_result("123-45-677")
+    assert parsed.open_panna == 123
+    assert (parsed.open_ank, parsed.jodi, parsed.close_ank) == (4, 45, 5)
+    assert parsed.close_panna == 677
+    assert parsed.open_panna_type == SINGLE
+    assert parsed.close_panna_type == DOUBLE
+
+
+def test_parse_half_declared_and_placeholders():
+    parsed = parse_result("555-5")
+    assert parsed.open_panna_type == TRIPLE
+    assert parsed.open_ank == 5
+    assert parsed.jodi is None
+    assert parsed.close_panna is None
+    assert parse_result("***-**-***").as_columns() == parse_result("").as_columns()
+
+
+def test_leading_zeros_survive_formatting():
+    assert extract_jodi("100-05-005") == "05"
+    assert extract_panna("100-05-005") == "005"
+    assert extract_panna("100-05-005", "open") == "100"
@@ -0,0 +1,113 @@
+from datetime import date, time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import get_async_db
+from app.core.security import get_current_admin
+from app.models import Game, MarketLiveState, Result
+from app.routes import results
+from app.services import cache_tags, live_state  # noqa: F401 - registers the listeners
+from app.services.event_broker import event_broker
+
+DAY = date(2025, 12, 6)
+
+
+def _next_result_id(mapper, connection, target):
+    if target.sr_no is None:
+        target.sr_no = target.id = connection.scalar(text("SELECT coalesce(max(sr_no), 0) + 1 FROM game_results"))
+
+
+@pytest.fixture
+def bulk(monkeypatch, sync_backed_session):
+    monkeypatch.setattr(cache_tags.cache_service, "invalidate_tags", lambda tags: None)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # MySQL fills the composite key by AUTO_INCREMENT; on sqlite a trigger
+    # does for Core inserts and a mapper event for ORM ones
+    for column in ("id", "sr_no"):
+        monkeypatch.setattr(Result.__table__.c[column], "nullable", True)
+    event.listen(Result, "before_insert", _next_result_id)
+    for model in (Game, Result, MarketLiveState):
+        model.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TRIGGER result_ids AFTER INSERT ON game_results WHEN NEW.sr_no IS NULL BEGIN "
+            "UPDATE game_results SET sr_no = NEW.rowid, id = NEW.rowid WHERE rowid = NEW.rowid; END"
+        ))
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    for n in (1, 2):
+        session.add(Game(id=n, sr_no=n, game=f"M{n}", open_time=time(10), close_time=time(11), status=1))
+    session.add(Result(id=100, sr_no=100, market_id=1, result="123-6", result_date=DAY))
+    session.commit()
+
+    events = []
+    monkeypatch.setattr(event_broker, "publish", events.append)
+    app = FastAPI()
+    app.include_router(results.router, prefix="/results")
+    app.dependency_overrides[get_async_db] = lambda: sync_backed_session(Session())
+    app.dependency_overrides[get_current_admin] = lambda: {"sub": "1", "role": "admin"}
+    yield TestClient(app), session, events
+    session.close()
+    event.remove(Result, "before_insert", _next_result_id)
+
+
+def _row(market_id, result, day=DAY):
+    return {"market_id": market_id, "result": result, "result_date": str(day)}
+
+
+def test_bulk_json_reports_every_outcome(bulk):
+    client, session, events = bulk
+    response = client.post("/results/bulk", json=[
+        _row(1, "456-5"),
+        _row(2, "111-3"),
+        _row(2, "222-6"),
+        _row(99, "100-1"),
+        {"market_id": 1},
+    ])
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [r["status"] for r in data["results"]] == ["updated", "superseded", "created", "market_not_found", "invalid"]
+    assert (data["created"], data["updated"], data["failed"]) == (1, 1, 3)
+
+    stored = dict(session.execute(select(Result.market_id, Result.result)).all())
+    assert stored == {1: "456-5", 2: "222-6"}
+    created = session.scalars(select(Result.sr_no).where(Result.market_id == 2)).one()
+    assert created is not None
+    assert events == [
+        {"type": "updated", "sr_no": 100, "market_id": 1, "result": "456-5", "result_date": str(DAY)},
+        {"type": "created", "sr_no": created, "market_id": 2, "result": "222-6", "result_date": str(DAY)},
+    ]
+
+
+def test_bulk_ndjson(bulk):
+    client, session, events = bulk
+    body = "\n".join(['{"market_id": 2, "result": "111-3", "result_date": "2025-12-06"}', "not json", ""])
+    response = client.post("/results/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["data"]["results"]] == ["created", "invalid"]
+    assert [e["type"] for e in events] == ["created"] and events[0]["sr_no"] is not None
+
+
+def test_bulk_rejects_oversized_and_malformed_bodies(bulk, monkeypatch):
+    client, _, events = bulk
+    monkeypatch.setattr(results, "BULK_MAX_ROWS", 2)
+    assert client.post("/results/bulk", json=[_row(1, "1"), _row(1, "2"), _row(1, "3")]).status_code == 413
+    assert client.post("/results/bulk", json={"market_id": 1}).status_code == 400
+    assert events == []
+
+
+def test_create_result(bulk):
+    client, session, events = bulk
+    response = client.post("/results", json=_row(2, "111-3"))
+    assert response.status_code == 201
+    created = response.json()["data"]["result_id"]
+    assert created is not None
+    assert events == [{"type": "created", "sr_no": created, "market_id": 2, "result": "111-3", "result_date": str(DAY)}]
+    assert client.post("/results", json=_row(2, "222-6")).status_code == 400
+    assert client.post("/results", json=_row(99, "111-3")).status_code == 404
+    assert session.scalar(select(Result.result).where(Result.sr_no == created)) == "111-3"
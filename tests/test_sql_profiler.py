@@ -0,0 +1,81 @@
+from datetime import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.sql_profiler import fingerprint, profile_queries
+from app.middleware.sql_profiler import SQLProfilerMiddleware
+from app.models import Game, MarketLiveState, Result
+from app.services import cache_tags, live_state  # noqa: F401 - registers the listeners
+
+
+@pytest.fixture
+def games_db(monkeypatch):
+    monkeypatch.setattr(cache_tags.cache_service, "invalidate_tags", lambda tags: None)
+    # One shared connection: the TestClient serves requests from another thread
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for model in (Game, Result, MarketLiveState):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for n in range(1, 7):
+        session.add(Game(id=n, sr_no=n, game=f"M{n}", open_time=time(10), close_time=time(11), status=1))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_fingerprint_erases_literals_and_in_list_lengths():
+    assert fingerprint("SELECT * FROM game WHERE sr_no = 7 AND game = 'KALYAN'") == (
+        "SELECT * FROM game WHERE sr_no = ? AND game = ?"
+    )
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (%s, %s, %s)") == fingerprint("SELECT 1 FROM t WHERE id IN (?,?)")
+
+
+def test_per_row_queries_are_flagged(games_db):
+    with profile_queries() as profile:
+        for game in games_db.scalars(select(Game)).all():
+            games_db.scalars(select(Result).where(Result.market_id == game.sr_no)).all()
+    assert profile.count == 7
+    assert list(profile.repeated().values()) == [6]
+
+
+def test_grouped_query_passes(games_db, no_n_plus_one):
+    games = games_db.scalars(select(Game)).all()
+    games_db.scalars(select(Result).where(Result.market_id.in_([g.sr_no for g in games]))).all()
+    assert no_n_plus_one.count == 2
+
+
+def test_server_timing_header(games_db):
+    app = FastAPI()
+    app.add_middleware(SQLProfilerMiddleware, server_timing=True)
+
+    @app.get("/async")
+    async def async_view():
+        return {"n": games_db.execute(text("SELECT count(*) FROM game")).scalar()}
+
+    @app.get("/sync")
+    def sync_view():
+        games_db.execute(text("SELECT 1")).all()
+        return {"n": games_db.execute(text("SELECT 2")).scalar()}
+
+    client = TestClient(app)
+    assert client.get("/async").headers["server-timing"].endswith('desc="1 queries"')
+    # Threadpool views run in a copy of the request context
+    assert client.get("/sync").headers["server-timing"].endswith('desc="2 queries"')
+
+
+def test_failed_statements_do_not_leave_start_times_behind(games_db):
+    from app.core.sql_profiler import _STARTS
+
+    with profile_queries() as profile:
+        for _ in range(3):
+            with pytest.raises(Exception):
+                games_db.execute(text("SELECT * FROM no_such_table"))
+            games_db.rollback()
+        games_db.execute(text("SELECT 1")).all()
+    assert games_db.connection().info.get(_STARTS) == []
+    assert profile.count == 1